@@ -1,44 +1,95 @@
 """
 FastAPI routes for club endpoints.
 """
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from models import ClubResponse, ClubSwimmersResponse
 from services import (
     get_club_by_code,
     get_club_swimmers,
+    iter_club_swimmers,
     ClubNotFoundError,
 )
+from services.executor import ServiceBusyError
+from api.responses import cached_json_response, ndjson_response, NDJSON_RESPONSES
 
 router = APIRouter(prefix="/api/clubs", tags=["clubs"])
 
 
 @router.get("/{club_code}", response_model=ClubResponse)
-async def get_club(club_code: str):
+async def get_club(club_code: str, request: Request):
     """
     Get club information by club code.
     
-    - **club_code**: Club team code (e.g., 'SCSC')
+    - **club_code**: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
     """
     try:
-        return get_club_by_code(club_code.upper())
+        return await cached_json_response(
+            request, "club", ClubResponse, get_club_by_code, club_code.upper()
+        )
     except ClubNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/{club_code}/swimmers", response_model=ClubSwimmersResponse)
-async def get_club_swimmers_list(club_code: str):
+async def get_club_swimmers_list(
+    club_code: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Get the swimmers in a club, youngest first.
+    
+    - **club_code**: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
+    - **limit**: Optional page size (1-1000); all swimmers are returned if omitted
+    - **cursor**: Optional `next_cursor` of the previous page
+    """
+    try:
+        return await cached_json_response(
+            request,
+            "club_swimmers",
+            ClubSwimmersResponse,
+            get_club_swimmers,
+            club_code.upper(),
+            limit=limit,
+            cursor=cursor,
+        )
+    except ClubNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get(
+    "/{club_code}/swimmers/stream",
+    response_class=StreamingResponse,
+    responses=NDJSON_RESPONSES,
+)
+async def stream_club_swimmers(club_code: str):
     """
-    Get all swimmers in a club.
+    Stream the swimmers in a club as newline-delimited JSON, one swimmer per line,
+    in the same order as /{club_code}/swimmers.
     
-    - **club_code**: Club team code (e.g., 'SCSC')
+    - **club_code**: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
     """
     try:
-        return get_club_swimmers(club_code.upper())
+        return await ndjson_response("lookup", iter_club_swimmers, club_code.upper())
     except ClubNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -3,8 +3,17 @@ FastAPI routes for relay generation endpoints.
 """
 from fastapi import APIRouter, HTTPException
 
-from models import RelayGenerationRequest, RelayGenerationResponse
-from services import generate_relays, RelayGenerationError
+from models import (
+    RelayGenerationRequest,
+    RelayGenerationResponse,
+    RelayBatchRequest,
+    RelayBatchResponse,
+    LineupRequest,
+    LineupResponse,
+)
+from services import generate_relays, generate_relays_batch, generate_lineup, RelayGenerationError
+from services.executor import run_service, ServiceBusyError
+from api.responses import json_response
 import datetime
 
 router = APIRouter(prefix="/api/relays", tags=["relays"])
@@ -16,7 +25,7 @@ async def generate_relay_teams(request: RelayGenerationRequest):
     Generate optimal relay teams based on swimmer best times.
     
     **Request body:**
-    - **club_code**: Club team code (e.g., 'SCSC')
+    - **club_code**: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
     - **event_type**: One of '4x50_FREE', '4x50_MEDLEY', '4x100_FREE', '4x100_MEDLEY', '4x200_FREE'
     - **age_range**: Tuple of (min_age, max_age)
     - **sex**: 'F' (Female), 'M' (Male), or 'X' (Mixed)
@@ -24,6 +33,7 @@ async def generate_relay_teams(request: RelayGenerationRequest):
     - **relay_date**: Date for age calculations (YYYY-MM-DD)
     - **num_relays**: Number of relay teams to generate (default: 1)
     - **excluded_swimmer_ids**: Optional list of swimmer IDs to exclude
+    - **objective**: 'greedy' (default), 'total_time', or 'a_first'
     """
     try:
         # Convert relay_date string to date object if needed
@@ -32,7 +42,9 @@ async def generate_relay_teams(request: RelayGenerationRequest):
         else:
             relay_date = request.relay_date
         
-        result = generate_relays(
+        result = await run_service(
+            "relays",
+            generate_relays,
             club_code=request.club_code.upper(),
             event_type=request.event_type,
             age_range=request.age_range,
@@ -41,12 +53,99 @@ async def generate_relay_teams(request: RelayGenerationRequest):
             relay_date=relay_date,
             num_relays=request.num_relays,
             excluded_swimmer_ids=request.excluded_swimmer_ids,
+            objective=request.objective,
         )
-        return result
+        return json_response(RelayGenerationResponse, result)
     except RelayGenerationError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+
+@router.post("/batch", response_model=RelayBatchResponse)
+async def generate_relay_teams_batch(request: RelayBatchRequest):
+    """
+    Generate relay teams for several relay events with the same club, age range,
+    sex and date in one call. Results come back in the order of event_types.
+    
+    **Request body:**
+    - **club_code**: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
+    - **event_types**: List of event types, each at most once ('4x50_FREE', '4x50_MEDLEY', '4x100_FREE', '4x100_MEDLEY', '4x200_FREE')
+    - **age_range**: Tuple of (min_age, max_age)
+    - **sex**: 'F' (Female), 'M' (Male), or 'X' (Mixed)
+    - **course**: 'SCY', 'SCM', or 'LCM'
+    - **relay_date**: Date for age calculations (YYYY-MM-DD)
+    - **num_relays**: Number of relay teams to generate for each event (default: 1)
+    - **excluded_swimmer_ids**: Optional list of swimmer IDs to exclude
+    - **objective**: 'greedy' (default), 'total_time', or 'a_first'
+    """
+    try:
+        result = await run_service(
+            "relays",
+            generate_relays_batch,
+            club_code=request.club_code.upper(),
+            event_types=request.event_types,
+            age_range=request.age_range,
+            sex=request.sex,
+            course=request.course,
+            relay_date=request.relay_date,
+            num_relays=request.num_relays,
+            excluded_swimmer_ids=request.excluded_swimmer_ids,
+            objective=request.objective,
+        )
+        return json_response(RelayBatchResponse, result)
+    except RelayGenerationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/lineup", response_model=LineupResponse)
+async def generate_meet_lineup(request: LineupRequest):
+    """
+    Generate relay teams for every relay entry of a meet at once, filling as many
+    relays as possible with the fastest combined time while respecting limits
+    across entries.
+    
+    **Request body:**
+    - **club_code**: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
+    - **course**: 'SCY', 'SCM', or 'LCM'
+    - **relay_date**: Date for age calculations (YYYY-MM-DD)
+    - **entries**: List of relay entries, each with event_type, age_range, sex and num_relays
+    - **max_relays_per_swimmer**: Optional limit on relays per swimmer
+    - **swimmer_caps**: Optional per-swimmer limits by swimmer ID
+    - **exclusive_entries**: Optional pairs of entry indexes no swimmer may swim both of
+    - **excluded_swimmer_ids**: Optional list of swimmer IDs to exclude
+    - **time_budget_ms**: Search time budget (default: 2000); `optimal` is false if it ran out
+    """
+    try:
+        result = await run_service(
+            "lineup",
+            generate_lineup,
+            club_code=request.club_code.upper(),
+            course=request.course,
+            relay_date=request.relay_date,
+            entries=[entry.model_dump() for entry in request.entries],
+            max_relays_per_swimmer=request.max_relays_per_swimmer,
+            swimmer_caps=request.swimmer_caps,
+            exclusive_entries=request.exclusive_entries,
+            excluded_swimmer_ids=request.excluded_swimmer_ids,
+            time_budget_ms=request.time_budget_ms,
+        )
+        return json_response(LineupResponse, result)
+    except RelayGenerationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
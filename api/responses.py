@@ -0,0 +1,158 @@
+"""
+JSON responses for service payloads, with caching and ETags for read-only
+endpoints.
+
+Service payloads are built by the serializers to match the routes' response models
+exactly, so they are encoded straight to bytes instead of being validated and
+re-encoded by FastAPI. Routes keep their response_model, so the OpenAPI schema is
+unchanged. Set TUNAS_VALIDATE_RESPONSES=1 to validate every payload against its
+response model first (as FastAPI would) while developing.
+"""
+import datetime
+import json
+import os
+from typing import Any, Callable, Iterable, Iterator, Type
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+from services import get_database
+from services.executor import run_service, run_stream
+from services.response_cache import (
+    CachedResponse,
+    get_response_cache,
+    make_cached_response,
+    etag_matches,
+)
+
+VALIDATE_RESPONSES_ENV_VAR = "TUNAS_VALIDATE_RESPONSES"
+validate_responses = os.environ.get(VALIDATE_RESPONSES_ENV_VAR, "0") not in ("", "0")
+
+# Rows encoded per chunk of a streamed NDJSON response
+NDJSON_CHUNK_ROWS = 64
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Encode JSON-compatible content as compact UTF-8 JSON, with orjson if installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_response(response_model: Type[BaseModel], payload: Any) -> bytes:
+    """
+    Encode a service payload for response_model, validating it first if
+    TUNAS_VALIDATE_RESPONSES is set.
+    """
+    if validate_responses:
+        payload = jsonable_encoder(response_model.model_validate(payload))
+    return dump_json(payload)
+
+
+def json_response(response_model: Type[BaseModel], payload: Any) -> Response:
+    """
+    Return a service payload for response_model as a JSON response.
+    """
+    return Response(
+        content=encode_response(response_model, payload), media_type="application/json"
+    )
+
+
+async def cached_json_response(
+    request: Request,
+    endpoint: str,
+    response_model: Type[BaseModel],
+    function: Callable[..., Any],
+    *args,
+    **kwargs,
+) -> Response:
+    """
+    Return function(*args, **kwargs) as a JSON response, served from the response
+    cache when the data has not changed. Responses carry an ETag, and requests whose
+    If-None-Match matches it are answered with 304 Not Modified.
+    
+    Args:
+        request: Incoming request
+        endpoint: Name of the endpoint, used in the cache key with the arguments
+        response_model: Model the result is encoded for
+        function: Service function, run on the lookup lane on a cache miss
+        *args, **kwargs: Arguments for function
+    """
+    cache = get_response_cache()
+    key = (
+        endpoint,
+        args,
+        tuple(sorted(kwargs.items())),
+        get_database().get_data_version(),
+        datetime.date.today(),
+    )
+    entry = cache.get(key)
+    if entry is None:
+        def build() -> CachedResponse:
+            built = make_cached_response(
+                encode_response(response_model, function(*args, **kwargs))
+            )
+            cache.put(key, built)
+            return built
+        entry = await run_service("lookup", build)
+    
+    headers = {"ETag": entry.etag}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def encode_ndjson(
+    function: Callable[..., Iterable[Any]], args: tuple
+) -> Iterator[bytes]:
+    """
+    Encode the JSON-compatible rows of function(*args) as newline-delimited JSON,
+    NDJSON_CHUNK_ROWS rows per chunk.
+    """
+    chunk = []
+    for row in function(*args):
+        chunk.append(dump_json(row))
+        if len(chunk) == NDJSON_CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+async def ndjson_response(
+    lane: str, function: Callable[..., Iterable[Any]], *args
+) -> StreamingResponse:
+    """
+    Stream the rows of function(*args) as newline-delimited JSON. Rows are produced
+    and encoded on lane a chunk at a time as they are sent, and the stream holds a
+    lane worker until it ends, so streams count against the lane like any other
+    call. Errors raised before the first row (e.g. ServiceBusyError or a lookup
+    that finds nothing) are raised here, before the response starts.
+    
+    Args:
+        lane: Lane to run function on
+        function: Service function returning the rows
+        *args: Arguments for function
+    """
+    chunks = await run_stream(lane, encode_ndjson, function, args)
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+
+# OpenAPI description of NDJSON streaming routes
+NDJSON_RESPONSES = {
+    200: {
+        "description": "One JSON object per line",
+        "content": {"application/x-ndjson": {}},
+    }
+}
@@ -1,21 +1,46 @@
 """
 FastAPI routes for database statistics endpoints.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
-from models import DatabaseStatsResponse
+from models import DatabaseStatsResponse, ExecutorStatsResponse, ResponseCacheStatsResponse
 from services.timestandard_service import get_database_stats
+from services.executor import get_executor_metrics, ServiceBusyError
+from services.response_cache import get_response_cache
+from api.responses import cached_json_response
 
 router = APIRouter(prefix="/api/stats", tags=["stats"])
 
 
 @router.get("", response_model=DatabaseStatsResponse)
-async def get_stats():
+async def get_stats(request: Request):
     """
     Get database statistics (counts of clubs, swimmers, meets, and meet results).
     """
     try:
-        return get_database_stats()
+        return await cached_json_response(
+            request, "stats", DatabaseStatsResponse, get_database_stats
+        )
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+
+@router.get("/executor", response_model=ExecutorStatsResponse)
+async def get_executor_stats():
+    """
+    Get queueing metrics for each execution lane (lookup, relays, lineup): worker
+    and queue limits, calls running and waiting, completed, failed and rejected
+    calls, and time spent waiting for a worker and running.
+    """
+    return {"lanes": get_executor_metrics()}
+
+
+@router.get("/cache", response_model=ResponseCacheStatsResponse)
+async def get_response_cache_stats():
+    """
+    Get response cache statistics: cached responses and their size, the byte
+    budget, and cache hits and misses.
+    """
+    return get_response_cache().get_stats()
@@ -1,60 +1,119 @@
 """
 FastAPI routes for swimmer endpoints.
 """
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from models import SwimmerResponse, SwimmerBestTimesResponse, SwimmerTimeHistoryResponse
 from services import (
     get_swimmer_by_id,
     get_swimmer_best_times,
     get_swimmer_time_history,
+    iter_swimmer_time_history,
     SwimmerNotFoundError,
 )
+from services.executor import ServiceBusyError
+from api.responses import cached_json_response, ndjson_response, NDJSON_RESPONSES
 
 router = APIRouter(prefix="/api/swimmers", tags=["swimmers"])
 
 
 @router.get("/{swimmer_id}", response_model=SwimmerResponse)
-async def get_swimmer(swimmer_id: str):
+async def get_swimmer(swimmer_id: str, request: Request):
     """
     Get swimmer information by USA Swimming ID.
     
-    - **swimmer_id**: USA Swimming ID (14 characters, long format)
+    - **swimmer_id**: USA Swimming ID (14 characters, long format, or 12 character short ID)
     """
     try:
-        return get_swimmer_by_id(swimmer_id)
+        return await cached_json_response(
+            request, "swimmer", SwimmerResponse, get_swimmer_by_id, swimmer_id
+        )
     except SwimmerNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/{swimmer_id}/best-times", response_model=SwimmerBestTimesResponse)
-async def get_best_times(swimmer_id: str):
+async def get_best_times(swimmer_id: str, request: Request):
     """
     Get swimmer's best times for each event.
     
-    - **swimmer_id**: USA Swimming ID (14 characters, long format)
+    - **swimmer_id**: USA Swimming ID (14 characters, long format, or 12 character short ID)
     """
     try:
-        return get_swimmer_best_times(swimmer_id)
+        return await cached_json_response(
+            request,
+            "swimmer_best_times",
+            SwimmerBestTimesResponse,
+            get_swimmer_best_times,
+            swimmer_id,
+        )
     except SwimmerNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/{swimmer_id}/times", response_model=SwimmerTimeHistoryResponse)
-async def get_time_history(swimmer_id: str):
+async def get_time_history(
+    swimmer_id: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+):
     """
     Get swimmer's full time history (all meet results).
     
-    - **swimmer_id**: USA Swimming ID (14 characters, long format)
+    - **swimmer_id**: USA Swimming ID (14 characters, long format, or 12 character short ID)
+    - **limit**: Optional page size (1-1000); all meet results are returned if omitted
+    - **cursor**: Optional `next_cursor` of the previous page
+    """
+    try:
+        return await cached_json_response(
+            request,
+            "swimmer_time_history",
+            SwimmerTimeHistoryResponse,
+            get_swimmer_time_history,
+            swimmer_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except SwimmerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get(
+    "/{swimmer_id}/times/stream",
+    response_class=StreamingResponse,
+    responses=NDJSON_RESPONSES,
+)
+async def stream_time_history(swimmer_id: str):
+    """
+    Stream swimmer's full time history as newline-delimited JSON, one meet result
+    per line, in the same order as /{swimmer_id}/times.
+    
+    - **swimmer_id**: USA Swimming ID (14 characters, long format, or 12 character short ID)
     """
     try:
-        return get_swimmer_time_history(swimmer_id)
+        return await ndjson_response("lookup", iter_swimmer_time_history, swimmer_id)
     except SwimmerNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
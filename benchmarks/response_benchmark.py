@@ -0,0 +1,93 @@
+"""
+Measure API response latency with and without the fast JSON response path.
+
+Requests are sent in process with FastAPI's TestClient. For each mode, every
+endpoint is requested repeatedly and the p50 and p99 latencies are reported:
+ - validated: payloads are validated against their response model and re-encoded,
+   as FastAPI does for plain route return values
+ - fast: payloads are encoded directly (the default)
+ - cached: fast, with the response cache enabled
+The response cache is disabled for the first two modes, so every request builds
+its payload.
+
+Usage (from the backend directory):
+    python benchmarks/response_benchmark.py [--club SCSC] [--requests N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BACKEND_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, BACKEND_PATH)
+
+from fastapi.testclient import TestClient
+
+import main
+from api import responses
+from services import get_database
+from services.response_cache import get_response_cache
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def time_requests(client: TestClient, path: str, num_requests: int) -> list[float]:
+    """
+    Return the latency of num_requests GET requests to path, after a warm-up request.
+    """
+    assert client.get(path).status_code == 200
+    latencies = []
+    for _ in range(num_requests):
+        start = time.perf_counter()
+        client.get(path)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main_benchmark(club_code: str, num_requests: int) -> None:
+    db = get_database()
+    club = db.find_club(club_code)
+    assert club is not None, f"Club not found with code: {club_code}"
+    swimmer = max(club.get_swimmers(), key=lambda s: len(s.get_meet_results()))
+    paths = [
+        f"/api/clubs/{club_code}/swimmers",
+        f"/api/swimmers/{swimmer.get_usa_id_long()}/times",
+    ]
+
+    cache = get_response_cache()
+    cache_bytes = cache.max_bytes
+    print(f"Club {club_code}: {len(club.get_swimmers())} swimmers, "
+          + f"encoder: {'orjson' if responses.orjson else 'json'}")
+    print(f"{'mode':<10} {'endpoint':<42} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    with TestClient(main.app) as client:
+        for mode in ["validated", "fast", "cached"]:
+            responses.validate_responses = mode == "validated"
+            cache.max_bytes = cache_bytes if mode == "cached" else 0
+            cache.clear()
+            for path in paths:
+                latencies = time_requests(client, path, num_requests)
+                print(
+                    f"{mode:<10} {path:<42} {percentile(latencies, 0.5) * 1000:>9.3f} "
+                    + f"{percentile(latencies, 0.99) * 1000:>9.3f}"
+                )
+    cache.max_bytes = cache_bytes
+    responses.validate_responses = False
+
+
+def run() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--club", default="SCSC", help="club code to request")
+    arg_parser.add_argument(
+        "--requests", type=int, default=200, help="requests per endpoint and mode"
+    )
+    args = arg_parser.parse_args()
+    main_benchmark(args.club, args.requests)
+
+
+if __name__ == "__main__":
+    run()
@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from api import swimmer_routes, club_routes, relay_routes, stats_routes
 from services.database_service import get_database
+from services.executor import shutdown_executor
 
 
 # Initialize FastAPI app
@@ -43,15 +44,23 @@ async def startup_event():
     try:
         db = get_database()
         print(f"Database loaded successfully!")
-        print(f"  - Clubs: {len(db.get_clubs()):,}")
-        print(f"  - Swimmers: {len(db.get_swimmers()):,}")
-        print(f"  - Meets: {len(db.get_meets()):,}")
-        print(f"  - Meet Results: {len(db.get_meet_results()):,}")
+        print(f"  - Clubs: {db.get_num_clubs():,}")
+        print(f"  - Swimmers: {db.get_num_swimmers():,}")
+        print(f"  - Meets: {db.get_num_meets():,}")
+        print(f"  - Meet Results: {db.get_num_meet_results():,}")
     except Exception as e:
         print(f"Error loading database: {e}")
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop the threads that run service calls.
+    """
+    shutdown_executor()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -64,7 +73,11 @@ async def root():
             "swimmers": "/api/swimmers/{swimmer_id}",
             "clubs": "/api/clubs/{club_code}",
             "relays": "/api/relays/generate",
+            "relay_batches": "/api/relays/batch",
+            "lineups": "/api/relays/lineup",
             "stats": "/api/stats",
+            "executor_stats": "/api/stats/executor",
+            "cache_stats": "/api/stats/cache",
         }
     }
 
@@ -77,8 +90,8 @@ async def health_check():
         return {
             "status": "healthy",
             "database": "loaded",
-            "clubs": len(db.get_clubs()),
-            "swimmers": len(db.get_swimmers()),
+            "clubs": db.get_num_clubs(),
+            "swimmers": db.get_num_swimmers(),
         }
     except Exception as e:
         return {
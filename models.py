@@ -9,7 +9,7 @@ from pydantic import BaseModel, Field
 # Request Models
 class RelayGenerationRequest(BaseModel):
     """Request model for relay generation."""
-    club_code: str = Field(..., description="Club code (e.g., 'SCSC')")
+    club_code: str = Field(..., description="Club code (e.g., 'SCSC' or 'PC-SCSC')")
     age_range: tuple[int, int] = Field(..., description="Age range as (min, max)")
     sex: str = Field(..., description="Sex: 'F' (Female), 'M' (Male), or 'X' (Mixed)")
     course: str = Field(..., description="Course: 'SCY', 'SCM', or 'LCM'")
@@ -20,6 +20,60 @@ class RelayGenerationRequest(BaseModel):
         ..., 
         description="Event type: '4x50_FREE', '4x50_MEDLEY', '4x100_FREE', '4x100_MEDLEY', '4x200_FREE'"
     )
+    objective: str = Field(
+        "greedy",
+        description="Optimization objective: 'greedy', 'total_time' (fastest combined time), or 'a_first' (fastest A relay, then B, ...)"
+    )
+
+
+class RelayBatchRequest(BaseModel):
+    """Request model for generating relays for several events at once."""
+    club_code: str = Field(..., description="Club code (e.g., 'SCSC' or 'PC-SCSC')")
+    age_range: tuple[int, int] = Field(..., description="Age range as (min, max)")
+    sex: str = Field(..., description="Sex: 'F' (Female), 'M' (Male), or 'X' (Mixed)")
+    course: str = Field(..., description="Course: 'SCY', 'SCM', or 'LCM'")
+    relay_date: date = Field(..., description="Date for age calculations")
+    num_relays: int = Field(1, ge=1, description="Number of relay teams to generate for each event")
+    excluded_swimmer_ids: Optional[List[str]] = Field(None, description="List of swimmer IDs to exclude")
+    event_types: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Event types, each at most once: '4x50_FREE', '4x50_MEDLEY', '4x100_FREE', '4x100_MEDLEY', '4x200_FREE'"
+    )
+    objective: str = Field(
+        "greedy",
+        description="Optimization objective: 'greedy', 'total_time' (fastest combined time), or 'a_first' (fastest A relay, then B, ...)"
+    )
+
+
+class LineupEntryRequest(BaseModel):
+    """One relay event of a meet lineup."""
+    event_type: str = Field(
+        ...,
+        description="Event type: '4x50_FREE', '4x50_MEDLEY', '4x100_FREE', '4x100_MEDLEY', '4x200_FREE'"
+    )
+    age_range: tuple[int, int] = Field(..., description="Age range as (min, max)")
+    sex: str = Field(..., description="Sex: 'F' (Female), 'M' (Male), or 'X' (Mixed)")
+    num_relays: int = Field(1, ge=1, description="Number of relay teams to generate")
+
+
+class LineupRequest(BaseModel):
+    """Request model for meet-wide relay lineups."""
+    club_code: str = Field(..., description="Club code (e.g., 'SCSC' or 'PC-SCSC')")
+    course: str = Field(..., description="Course: 'SCY', 'SCM', or 'LCM'")
+    relay_date: date = Field(..., description="Date for age calculations")
+    entries: List[LineupEntryRequest] = Field(..., min_length=1, description="Relay entries of the meet")
+    max_relays_per_swimmer: Optional[int] = Field(None, ge=0, description="Most relays any swimmer may swim")
+    swimmer_caps: Optional[Dict[str, int]] = Field(
+        None, description="Per-swimmer overrides of max_relays_per_swimmer, by swimmer ID"
+    )
+    exclusive_entries: Optional[List[tuple[int, int]]] = Field(
+        None, description="Pairs of entry indexes that no swimmer may swim both of"
+    )
+    excluded_swimmer_ids: Optional[List[str]] = Field(None, description="List of swimmer IDs to exclude")
+    time_budget_ms: int = Field(
+        2000, ge=1, le=30000, description="Search time budget in milliseconds; the best lineup so far is returned when it runs out"
+    )
 
 
 # Response Models
@@ -112,12 +166,14 @@ class SwimmerTimeHistoryResponse(BaseModel):
     """Swimmer full time history response."""
     swimmer: SwimmerResponse
     meet_results: List[MeetResultResponse]
+    next_cursor: Optional[str] = None  # Cursor of the next page, None on the last page
 
 
 class ClubSwimmersResponse(BaseModel):
     """Club roster response."""
     club: ClubResponse
     swimmers: List[SwimmerResponse]
+    next_cursor: Optional[str] = None  # Cursor of the next page, None on the last page
 
 
 class DatabaseStatsResponse(BaseModel):
@@ -128,6 +184,34 @@ class DatabaseStatsResponse(BaseModel):
     num_meet_results: int
 
 
+class ExecutorLaneStats(BaseModel):
+    """Queueing metrics for one execution lane."""
+    max_workers: int
+    max_queued: int
+    active: int
+    queued: int
+    completed: int
+    failed: int
+    rejected: int
+    mean_wait_ms: float
+    max_wait_ms: float
+    mean_run_ms: float
+
+
+class ExecutorStatsResponse(BaseModel):
+    """Execution lane metrics response."""
+    lanes: Dict[str, ExecutorLaneStats]
+
+
+class ResponseCacheStatsResponse(BaseModel):
+    """Response cache statistics response."""
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+
+
 class RelayResponse(BaseModel):
     """Relay team response."""
     event: str
@@ -146,6 +230,35 @@ class RelayGenerationResponse(BaseModel):
     settings: Dict[str, Any]
 
 
+class RelayBatchEventResponse(BaseModel):
+    """Relays generated for one event of a batch."""
+    event_type: str
+    relays: List[RelayResponse]
+
+
+class RelayBatchResponse(BaseModel):
+    """Batch relay generation response."""
+    events: List[RelayBatchEventResponse]
+    settings: Dict[str, Any]
+
+
+class LineupEntryResponse(BaseModel):
+    """Relays for one entry of a meet lineup."""
+    event_type: str
+    age_range: tuple[int, int]
+    sex: str
+    relays: List[RelayResponse]
+
+
+class LineupResponse(BaseModel):
+    """Meet-wide relay lineup response."""
+    entries: List[LineupEntryResponse]
+    num_relays_filled: int
+    total_time: Optional[str]
+    optimal: bool
+    settings: Dict[str, Any]
+
+
 class ErrorResponse(BaseModel):
     """Error response."""
     detail: str
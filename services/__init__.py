@@ -2,9 +2,21 @@
 Services package.
 """
 from .database_service import get_database, reset_database
-from .swimmer_service import get_swimmer_by_id, get_swimmer_best_times, get_swimmer_time_history, SwimmerNotFoundError
-from .club_service import get_club_by_code, get_club_swimmers, ClubNotFoundError
-from .relay_service import generate_relays, RelayGenerationError
+from .swimmer_service import (
+    get_swimmer_by_id,
+    get_swimmer_best_times,
+    get_swimmer_time_history,
+    iter_swimmer_time_history,
+    SwimmerNotFoundError,
+)
+from .club_service import get_club_by_code, get_club_swimmers, iter_club_swimmers, ClubNotFoundError
+from .pagination import InvalidCursorError
+from .relay_service import (
+    generate_relays,
+    generate_relays_batch,
+    generate_lineup,
+    RelayGenerationError,
+)
 from .timestandard_service import get_time_standard_df, get_database_stats
 
 __all__ = [
@@ -13,11 +25,16 @@ __all__ = [
     "get_swimmer_by_id",
     "get_swimmer_best_times",
     "get_swimmer_time_history",
+    "iter_swimmer_time_history",
     "SwimmerNotFoundError",
     "get_club_by_code",
     "get_club_swimmers",
+    "iter_club_swimmers",
     "ClubNotFoundError",
+    "InvalidCursorError",
     "generate_relays",
+    "generate_relays_batch",
+    "generate_lineup",
     "RelayGenerationError",
     "get_time_standard_df",
     "get_database_stats",
@@ -1,7 +1,7 @@
 """
 Service layer for club-related operations.
 """
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 import datetime
 
 import sys
@@ -48,7 +48,8 @@ _setup_tunas_path()
 from database import Database, swim
 
 from .database_service import get_database
-from .serializers import serialize_club, serialize_swimmer
+from .serializers import FragmentCache, serialize_club, serialize_swimmer
+from .pagination import paginate
 
 
 class ClubNotFoundError(Exception):
@@ -56,12 +57,19 @@ class ClubNotFoundError(Exception):
     pass
 
 
+def _find_club(club_code: str, db: Database) -> swim.Club:
+    club = db.find_club(club_code)
+    if club is None:
+        raise ClubNotFoundError(f"Club not found with code: {club_code}")
+    return club
+
+
 def get_club_by_code(club_code: str, db: Optional[Database] = None) -> dict:
     """
     Get club information by club code.
     
     Args:
-        club_code: Club team code (e.g., 'SCSC')
+        club_code: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
         db: Optional database instance
         
     Returns:
@@ -73,42 +81,82 @@ def get_club_by_code(club_code: str, db: Optional[Database] = None) -> dict:
     if db is None:
         db = get_database()
     
-    club = db.find_club(club_code)
-    if club is None:
-        raise ClubNotFoundError(f"Club not found with code: {club_code}")
-    
-    return serialize_club(club)
+    club = _find_club(club_code, db)
+    return serialize_club(club, db)
 
 
-def get_club_swimmers(club_code: str, db: Optional[Database] = None) -> dict:
+def _sort_roster(club: swim.Club, db: Database) -> List[int]:
+    # Sort by birthday (same as CLI - newest first)
+    swimmers = club.get_swimmers()
+    return sorted(
+        range(len(swimmers)),
+        key=lambda i: swimmers[i].get_birthday_range()[0],
+        reverse=True,
+    )
+
+
+# Club -> positions in its roster, in response order. Positions rather than
+# swimmers are cached, since swimmers refer back to their club and would keep it
+# from ever being freed.
+_roster_indexes = FragmentCache(_sort_roster)
+
+
+def get_club_swimmers(
+    club_code: str,
+    db: Optional[Database] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> dict:
     """
-    Get all swimmers in a club.
+    Get the swimmers in a club, youngest first, a page at a time.
     
     Args:
-        club_code: Club team code (e.g., 'SCSC')
+        club_code: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
         db: Optional database instance
+        limit: Most swimmers to return (None for all remaining swimmers)
+        cursor: next_cursor of the previous page (None for the first page)
         
     Returns:
-        Dictionary with club info and list of swimmers
+        Dictionary with club info, list of swimmers and the cursor of the next page
+        (None on the last page)
         
     Raises:
         ClubNotFoundError: If club is not found
+        InvalidCursorError: If cursor is malformed or the data has changed
     """
     if db is None:
         db = get_database()
     
-    club = db.find_club(club_code)
-    if club is None:
-        raise ClubNotFoundError(f"Club not found with code: {club_code}")
-    
+    club = _find_club(club_code, db)
     swimmers = club.get_swimmers()
-    
-    # Sort by birthday (same as CLI - newest first)
-    swimmers.sort(key=lambda s: s.get_birthday_range()[0], reverse=True)
+    positions, next_cursor = paginate(
+        _roster_indexes.get(club, db), db.get_data_version(), limit, cursor
+    )
     
     return {
-        "club": serialize_club(club),
-        "swimmers": [serialize_swimmer(s) for s in swimmers],
+        "club": serialize_club(club, db),
+        "swimmers": [serialize_swimmer(swimmers[i], db) for i in positions],
+        "next_cursor": next_cursor,
     }
 
 
+def iter_club_swimmers(
+    club_code: str, db: Optional[Database] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get an iterator over the serialized swimmers in a club, in the order of
+    get_club_swimmers. Swimmers are serialized as they are iterated.
+    
+    Args:
+        club_code: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
+        db: Optional database instance
+        
+    Raises:
+        ClubNotFoundError: If club is not found (before iteration starts)
+    """
+    if db is None:
+        db = get_database()
+    
+    club = _find_club(club_code, db)
+    swimmers = club.get_swimmers()
+    return (serialize_swimmer(swimmers[i], db) for i in _roster_indexes.get(club, db))
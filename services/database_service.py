@@ -43,12 +43,23 @@ def _setup_tunas_path():
 # Setup tunas path before importing
 _tunas_dir = _setup_tunas_path()
 
-import parser
+import snapshot
 from database import Database
 
+from .response_cache import clear_response_cache
+
 # Singleton database instance
 _db: Optional[Database] = None
 
+# Environment variable overriding the database snapshot location
+SNAPSHOT_PATH_ENV_VAR = "TUNAS_SNAPSHOT_PATH"
+
+# Environment variables selecting the database backend ('memory' or 'sqlite') and
+# overriding the SQLite file location
+BACKEND_ENV_VAR = "TUNAS_DATABASE_BACKEND"
+SQLITE_PATH_ENV_VAR = "TUNAS_SQLITE_PATH"
+BACKENDS = ("memory", "sqlite")
+
 
 def _find_meet_data_path() -> str:
     """
@@ -83,15 +94,53 @@ def _find_meet_data_path() -> str:
     )
 
 
+def _find_snapshot_path(meet_data_path: str) -> str:
+    """
+    Return the database snapshot path. Defaults to tunas/data/cache next to the
+    meet data directory; can be overridden with TUNAS_SNAPSHOT_PATH.
+    """
+    snapshot_path = os.environ.get(SNAPSHOT_PATH_ENV_VAR)
+    if snapshot_path:
+        return snapshot_path
+    return os.path.join(os.path.dirname(meet_data_path), "cache", "database.snapshot")
+
+
+def _find_sqlite_path(meet_data_path: str) -> str:
+    """
+    Return the SQLite database path. Defaults to tunas/data/cache next to the meet
+    data directory; can be overridden with TUNAS_SQLITE_PATH.
+    """
+    sqlite_path = os.environ.get(SQLITE_PATH_ENV_VAR)
+    if sqlite_path:
+        return sqlite_path
+    return os.path.join(os.path.dirname(meet_data_path), "cache", "database.sqlite3")
+
+
 def get_database() -> Database:
     """
     Get or initialize the database singleton.
-    Database is loaded on first access.
+    Database is loaded on first access. The backend is selected with
+    TUNAS_DATABASE_BACKEND:
+    - 'memory' (default): load the on-disk snapshot if it is up to date with the
+      meet data files, otherwise parse them (which refreshes the snapshot)
+    - 'sqlite': open the SQLite file shared by all workers, rebuilding it first if
+      it is out of date with the meet data files
     """
     global _db
     if _db is None:
+        backend = os.environ.get(BACKEND_ENV_VAR, "memory").lower()
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Invalid {BACKEND_ENV_VAR}: {backend}. Must be one of {BACKENDS}"
+            )
         meet_data_path = _find_meet_data_path()
-        _db = parser.read_cl2(meet_data_path)
+        snapshot_path = _find_snapshot_path(meet_data_path)
+        if backend == "sqlite":
+            _db = snapshot.load_sqlite_database(
+                meet_data_path, _find_sqlite_path(meet_data_path), snapshot_path
+            )
+        else:
+            _db = snapshot.load_database(meet_data_path, snapshot_path)
     return _db
 
 
@@ -101,5 +150,6 @@ def reset_database() -> None:
     """
     global _db
     _db = None
+    clear_response_cache()
 
 
@@ -0,0 +1,294 @@
+"""
+Execution layer that runs synchronous service calls off the asyncio event loop.
+
+Service calls are sent to one of several lanes. Each lane is a bounded thread pool
+with its own concurrency limit and queue length, so slow relay optimizations cannot
+hold up cheap lookups, and the event loop stays free for health checks. Every lane
+keeps queueing metrics (see get_executor_metrics). Streamed responses hold a lane
+worker for as long as they are open (see run_stream).
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable
+
+
+class ServiceBusyError(Exception):
+    """Raised when a lane already has as many calls waiting as it may queue."""
+    pass
+
+
+# Lane name -> (concurrent calls, calls that may wait for a worker). Concurrency can
+# be overridden per lane with TUNAS_<LANE>_WORKERS.
+LANES = {
+    # Swimmer, club and stats lookups
+    "lookup": (8, 256),
+    # Single and batch relay generation
+    "relays": (2, 32),
+    # Meet lineups, which may search for up to their time budget
+    "lineup": (1, 8),
+}
+WORKERS_ENV_VAR = "TUNAS_{}_WORKERS"
+
+# Seconds a stream's worker waits for the consumer to ask for the next item before
+# giving up (e.g. a client that stopped reading), so its lane slot is freed
+STREAM_IDLE_TIMEOUT = 60.0
+
+# Marks the end of a stream
+_END_OF_STREAM = object()
+
+
+class ServiceLane:
+    """
+    Bounded thread pool for one kind of service call, with queueing metrics.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queued: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"tunas-{name}"
+        )
+        self.lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    async def run(self, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run function(*args, **kwargs) on the lane and return its result. Raises
+        ServiceBusyError if the lane's queue is full.
+        """
+        with self.lock:
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                raise ServiceBusyError(
+                    f"Server is busy ({self.name}: {self.queued} requests queued), try again shortly"
+                )
+            self.queued += 1
+        try:
+            future = self.executor.submit(
+                self._call, time.perf_counter(), function, args, kwargs
+            )
+        except BaseException:
+            with self.lock:
+                self.queued -= 1
+            raise
+        # A call cancelled before a worker picks it up (e.g. the client disconnected)
+        # never reaches _call, so it leaves the queue here
+        future.add_done_callback(self._dequeue_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    async def stream(
+        self, function: Callable[..., Iterable[Any]], *args, **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Run function(*args, **kwargs), which returns an iterable, on the lane and
+        return an async iterator over its items. The call holds a lane worker until
+        the iterator is exhausted or closed, and items are produced on the worker
+        one at a time, as they are consumed. Raises ServiceBusyError if the lane's
+        queue is full, and any error raised before the first item (e.g. a lookup
+        that finds nothing), before the iterator is returned.
+        """
+        loop = asyncio.get_running_loop()
+        # Futures for the items the consumer is waiting for, or None once it stops
+        requests: queue.SimpleQueue = queue.SimpleQueue()
+
+        def produce() -> None:
+            future = requests.get()
+            try:
+                iterator = iter(function(*args, **kwargs))
+            except BaseException as e:
+                loop.call_soon_threadsafe(_resolve, future, None, e)
+                return
+            while future is not None:
+                try:
+                    item = next(iterator, _END_OF_STREAM)
+                except BaseException as e:
+                    loop.call_soon_threadsafe(_resolve, future, None, e)
+                    return
+                loop.call_soon_threadsafe(_resolve, future, item, None)
+                if item is _END_OF_STREAM:
+                    return
+                try:
+                    future = requests.get(timeout=STREAM_IDLE_TIMEOUT)
+                except queue.Empty:
+                    return
+
+        first = loop.create_future()
+        requests.put(first)
+        running = asyncio.ensure_future(self.run(produce))
+        try:
+            await asyncio.wait([first, running], return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            running.cancel()
+            requests.put(None)
+            raise
+        if not first.done():
+            # The lane was busy, so produce never ran
+            requests.put(None)
+            running.result()
+        if first.exception() is not None:
+            raise first.exception()
+        return _stream_items(loop, requests, first)
+
+    def _dequeue_if_cancelled(self, future: Future) -> None:
+        if future.cancelled():
+            with self.lock:
+                self.queued -= 1
+
+    def _call(
+        self,
+        submitted: float,
+        function: Callable[..., Any],
+        args: tuple,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        with self.lock:
+            self.queued -= 1
+            self.active += 1
+            self.total_wait += started - submitted
+            self.max_wait = max(self.max_wait, started - submitted)
+        succeeded = False
+        try:
+            result = function(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.total_run += time.perf_counter() - started
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "active": self.active,
+                "queued": self.queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "mean_wait_ms": self.total_wait / finished * 1000 if finished else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "mean_run_ms": self.total_run / finished * 1000 if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _resolve(future: asyncio.Future, item: Any, error: BaseException) -> None:
+    if not future.done():
+        if error is None:
+            future.set_result(item)
+        else:
+            future.set_exception(error)
+
+
+async def _stream_items(
+    loop: asyncio.AbstractEventLoop,
+    requests: queue.SimpleQueue,
+    future: asyncio.Future,
+) -> AsyncIterator[Any]:
+    """
+    Yield the items of a ServiceLane.stream, asking its worker for each next item.
+    """
+    try:
+        while True:
+            item = await future
+            if item is _END_OF_STREAM:
+                return
+            yield item
+            future = loop.create_future()
+            requests.put(future)
+    finally:
+        # Lets the worker (and its lane slot) go if the stream is closed early
+        requests.put(None)
+
+
+_lanes: Dict[str, ServiceLane] = {}
+_lanes_lock = threading.Lock()
+
+
+def get_lane(name: str) -> ServiceLane:
+    """
+    Get the lane with name, creating it on first use (so each server worker process
+    starts its own threads).
+    """
+    if name not in LANES:
+        raise ValueError(f"Invalid lane: {name}. Must be one of {list(LANES.keys())}")
+    with _lanes_lock:
+        if name not in _lanes:
+            max_workers, max_queued = LANES[name]
+            workers_override = os.environ.get(WORKERS_ENV_VAR.format(name.upper()))
+            if workers_override:
+                max_workers = int(workers_override)
+            _lanes[name] = ServiceLane(name, max_workers, max_queued)
+        return _lanes[name]
+
+
+async def run_service(lane: str, function: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """
+    Run a synchronous service call on a lane without blocking the event loop.
+
+    Args:
+        lane: One of LANES
+        function: Service function to call
+        *args, **kwargs: Arguments for function
+
+    Returns:
+        The result of function
+    """
+    return await get_lane(lane).run(function, *args, **kwargs)
+
+
+async def run_stream(
+    lane: str, function: Callable[..., Iterable[Any]], /, *args, **kwargs
+) -> AsyncIterator[Any]:
+    """
+    Run a synchronous service call that returns an iterable on a lane, holding a
+    lane worker for as long as its items are consumed.
+
+    Args:
+        lane: One of LANES
+        function: Service function to call
+        *args, **kwargs: Arguments for function
+
+    Returns:
+        Async iterator over the items of the iterable returned by function
+    """
+    return await get_lane(lane).stream(function, *args, **kwargs)
+
+
+def get_executor_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Get queueing metrics for every lane. Lanes that have not been used yet report
+    zero counts.
+    """
+    return {name: get_lane(name).get_metrics() for name in LANES}
+
+
+def shutdown_executor() -> None:
+    """
+    Stop every lane's threads, cancelling calls that have not started.
+    """
+    with _lanes_lock:
+        for lane in _lanes.values():
+            lane.shutdown()
+        _lanes.clear()
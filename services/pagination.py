@@ -0,0 +1,77 @@
+"""
+Cursor pagination over pre-sorted lists.
+
+A cursor records the data version of the database it was issued for and the
+position of the next page. Pages are taken from lists that are always sorted the
+same way for the same data, so following cursors visits every item exactly once.
+Cursors from before a data change are rejected rather than silently skipping or
+repeating items.
+"""
+import base64
+import binascii
+from typing import List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or was issued for different data."""
+    pass
+
+
+def encode_cursor(data_version: int, offset: int) -> str:
+    """Encode a cursor for offset into data with data_version."""
+    return base64.urlsafe_b64encode(f"{data_version}:{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: str, data_version: int) -> int:
+    """
+    Decode cursor and return its offset.
+    
+    Raises:
+        InvalidCursorError: If cursor is malformed or data_version has changed
+    """
+    try:
+        cursor_version, offset = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        )
+        cursor_version, offset = int(cursor_version), int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    if offset < 0:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    if cursor_version != data_version:
+        raise InvalidCursorError(
+            "Cursor has expired because the data changed; start again from the first page"
+        )
+    return offset
+
+
+def paginate(
+    items: Sequence[T],
+    data_version: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Take a page from sorted items.
+    
+    Args:
+        items: Items in a stable order
+        data_version: Data version of the database items come from
+        limit: Most items to return (None for every remaining item)
+        cursor: Cursor returned with the previous page (None for the first page)
+        
+    Returns:
+        Tuple of the page and the cursor of the next page (None on the last page)
+        
+    Raises:
+        InvalidCursorError: If cursor is malformed or data_version has changed
+        ValueError: If limit is less than 1
+    """
+    if limit is not None and limit < 1:
+        raise ValueError(f"Invalid limit: {limit}")
+    start = 0 if cursor is None else decode_cursor(cursor, data_version)
+    end = len(items) if limit is None else min(len(items), start + limit)
+    next_cursor = encode_cursor(data_version, end) if end < len(items) else None
+    return list(items[start:end]), next_cursor
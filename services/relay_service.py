@@ -46,6 +46,7 @@ def _setup_tunas_path():
 _setup_tunas_path()
 
 from database import Database, swim, sdif, dutil, timestandard
+import lineup
 import relaygen
 
 from .database_service import get_database
@@ -57,6 +58,164 @@ class RelayGenerationError(Exception):
     pass
 
 
+SEX_MAP = {
+    'F': sdif.Sex.FEMALE,
+    'M': sdif.Sex.MALE,
+    'X': sdif.Sex.MIXED,
+}
+COURSE_MAP = {
+    'SCY': sdif.Course.SCY,
+    'SCM': sdif.Course.SCM,
+    'LCM': sdif.Course.LCM,
+}
+EVENT_MAP = {
+    '4x50_FREE': (200, sdif.Stroke.FREESTYLE_RELAY),
+    '4x50_MEDLEY': (200, sdif.Stroke.MEDLEY_RELAY),
+    '4x100_FREE': (400, sdif.Stroke.FREESTYLE_RELAY),
+    '4x100_MEDLEY': (400, sdif.Stroke.MEDLEY_RELAY),
+    '4x200_FREE': (800, sdif.Stroke.FREESTYLE_RELAY),
+}
+
+
+def _find_club(db: Database, club_code: str) -> swim.Club:
+    club = db.find_club(club_code)
+    if club is None:
+        raise RelayGenerationError(f"Club not found with code: {club_code}")
+    return club
+
+
+def _parse_sex(sex: str) -> sdif.Sex:
+    if sex not in SEX_MAP:
+        raise RelayGenerationError(f"Invalid sex: {sex}. Must be 'F', 'M', or 'X'")
+    return SEX_MAP[sex]
+
+
+def _parse_course(course: str) -> sdif.Course:
+    if course not in COURSE_MAP:
+        raise RelayGenerationError(f"Invalid course: {course}. Must be 'SCY', 'SCM', or 'LCM'")
+    return COURSE_MAP[course]
+
+
+def _find_event(event_type: str, course: sdif.Course) -> dutil.Event:
+    """
+    Find the relay Event for an event type such as '4x50_FREE' on course.
+    """
+    if event_type not in EVENT_MAP:
+        raise RelayGenerationError(
+            f"Invalid event_type: {event_type}. Must be one of {list(EVENT_MAP.keys())}"
+        )
+    
+    distance, stroke_enum = EVENT_MAP[event_type]
+    
+    # Find the matching Event enum member
+    for e in dutil.Event:
+        if (e.get_distance() == distance and 
+            e.get_stroke() == stroke_enum and 
+            e.get_course() == course):
+            return e
+    
+    raise RelayGenerationError(
+        f"Could not find Event for {event_type} on {course.name} course"
+    )
+
+
+def _find_swimmers(
+    club: swim.Club, club_code: str, swimmer_ids: List[str]
+) -> List[swim.Swimmer]:
+    """
+    Find club swimmers by long (14 character) or short (12 character) ID.
+    """
+    swimmers = []
+    invalid_ids = []
+    for swimmer_id in swimmer_ids:
+        # Try long ID first (14 characters), then short ID (12 characters)
+        swimmer = None
+        if len(swimmer_id) == 14:
+            swimmer = club.find_swimmer_with_long_id(swimmer_id)
+        elif len(swimmer_id) == 12:
+            swimmer = club.find_swimmer_with_short_id(swimmer_id)
+        else:
+            invalid_ids.append(swimmer_id)
+            continue
+        
+        if swimmer:
+            swimmers.append(swimmer)
+        else:
+            invalid_ids.append(swimmer_id)
+    
+    if invalid_ids:
+        raise RelayGenerationError(
+            f"The following swimmer IDs are not valid for club '{club_code}': {', '.join(invalid_ids)}"
+        )
+    return swimmers
+
+
+def _serialize_relays(
+    db: Database,
+    relays: List[List[swim.Swimmer]],
+    event: dutil.Event,
+    age_range: tuple[int, int],
+    sex: sdif.Sex,
+) -> List[Dict[str, Any]]:
+    """
+    Serialize relays with their times and the time standards they meet.
+    """
+    return _serialize_relay_groups(db, [(relays, event)], age_range, sex)[0]
+
+
+def _serialize_relay_groups(
+    db: Database,
+    relay_groups: List[tuple[List[List[swim.Swimmer]], dutil.Event]],
+    age_range: tuple[int, int],
+    sex: sdif.Sex,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Serialize groups of relays, each generated for its own event, with their times
+    and the time standards they meet. Time standards of every group are looked up
+    together.
+    """
+    # Calculate relay times, then time standards for every relay at once
+    time_standard_info = db.get_time_standard_info()
+    group_times = [
+        [relaygen.get_relay_time(relay, event) if relay else None for relay in relays]
+        for relays, event in relay_groups
+    ]
+    timed = [
+        (relay_time, event)
+        for (_, event), relay_times in zip(relay_groups, group_times)
+        for relay_time in relay_times
+        if relay_time is not None
+    ]
+    _, standard_masks = time_standard_info.get_qualified_standards_batch(
+        [relay_time.get_total_hundredths() for relay_time, _ in timed],
+        [event.ordinal for _, event in timed],
+        [age_range[0]] * len(timed),
+        [timestandard.SEX_INDEXES[sex.name]] * len(timed),
+    )
+    standard_masks = iter(standard_masks)
+    
+    serialized_groups = []
+    for (relays, event), relay_times in zip(relay_groups, group_times):
+        serialized_relays = []
+        for relay, relay_time in zip(relays, relay_times):
+            if relay_time is None:
+                serialized_relays.append(serialize_relay(relay, event, None, db))
+                continue
+            standards = timestandard.get_standards_from_mask(next(standard_masks))
+            serialized_relays.append(serialize_relay(relay, event, relay_time, db, standards))
+        serialized_groups.append(serialized_relays)
+    return serialized_groups
+
+
+def _parse_objective(objective: str) -> relaygen.RelayObjective:
+    objective_map = {o.value: o for o in relaygen.RelayObjective}
+    if objective not in objective_map:
+        raise RelayGenerationError(
+            f"Invalid objective: {objective}. Must be one of {list(objective_map.keys())}"
+        )
+    return objective_map[objective]
+
+
 def generate_relays(
     club_code: str,
     event_type: str,
@@ -66,13 +225,14 @@ def generate_relays(
     relay_date: datetime.date,
     num_relays: int = 2,
     excluded_swimmer_ids: Optional[List[str]] = None,
+    objective: str = "greedy",
     db: Optional[Database] = None,
 ) -> Dict[str, Any]:
     """
     Generate optimal relay teams.
     
     Args:
-        club_code: Club team code
+        club_code: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
         event_type: One of '4x50_FREE', '4x50_MEDLEY', '4x100_FREE', '4x100_MEDLEY', '4x200_FREE'
         age_range: Tuple of (min_age, max_age)
         sex: 'F' (Female), 'M' (Male), or 'X' (Mixed)
@@ -80,6 +240,9 @@ def generate_relays(
         relay_date: Date for age calculations
         num_relays: Number of relay teams to generate
         excluded_swimmer_ids: Optional list of swimmer IDs to exclude
+        objective: 'greedy' (relay A first from each leg's top swimmers; mixed
+            relays are solved as 'a_first'), 'total_time' (exact, fastest combined
+            time) or 'a_first' (exact, fastest relay A, then B, ...)
         db: Optional database instance
         
     Returns:
@@ -88,57 +251,13 @@ def generate_relays(
     if db is None:
         db = get_database()
     
-    # Find club
-    club = db.find_club(club_code)
-    if club is None:
-        raise RelayGenerationError(f"Club not found with code: {club_code}")
+    club = _find_club(db, club_code)
     
     # Map string inputs to enums
-    sex_map = {
-        'F': sdif.Sex.FEMALE,
-        'M': sdif.Sex.MALE,
-        'X': sdif.Sex.MIXED,
-    }
-    course_map = {
-        'SCY': sdif.Course.SCY,
-        'SCM': sdif.Course.SCM,
-        'LCM': sdif.Course.LCM,
-    }
-    
-    if sex not in sex_map:
-        raise RelayGenerationError(f"Invalid sex: {sex}. Must be 'F', 'M', or 'X'")
-    if course not in course_map:
-        raise RelayGenerationError(f"Invalid course: {course}. Must be 'SCY', 'SCM', or 'LCM'")
-    
-    # Map event type to distance and stroke
-    event_map = {
-        '4x50_FREE': (200, sdif.Stroke.FREESTYLE_RELAY),
-        '4x50_MEDLEY': (200, sdif.Stroke.MEDLEY_RELAY),
-        '4x100_FREE': (400, sdif.Stroke.FREESTYLE_RELAY),
-        '4x100_MEDLEY': (400, sdif.Stroke.MEDLEY_RELAY),
-        '4x200_FREE': (800, sdif.Stroke.FREESTYLE_RELAY),
-    }
-    
-    if event_type not in event_map:
-        raise RelayGenerationError(
-            f"Invalid event_type: {event_type}. Must be one of {list(event_map.keys())}"
-        )
-    
-    distance, stroke_enum = event_map[event_type]
-    
-    # Find the matching Event enum member
-    event = None
-    for e in dutil.Event:
-        if (e.get_distance() == distance and 
-            e.get_stroke() == stroke_enum and 
-            e.get_course() == course_map[course]):
-            event = e
-            break
-    
-    if event is None:
-        raise RelayGenerationError(
-            f"Could not find Event for {event_type} on {course} course"
-        )
+    sex_enum = _parse_sex(sex)
+    course_enum = _parse_course(course)
+    objective_enum = _parse_objective(objective)
+    event = _find_event(event_type, course_enum)
     
     # Create relay generator
     generator = relaygen.RelayGenerator(
@@ -146,64 +265,102 @@ def generate_relays(
         club=club,
         relay_date=relay_date,
         num_relays=num_relays,
-        sex=sex_map[sex],
-        course=course_map[course],
+        sex=sex_enum,
+        course=course_enum,
         age_range=age_range,
+        objective=objective_enum,
     )
     
     # Exclude swimmers if provided
     if excluded_swimmer_ids:
-        invalid_ids = []
-        for swimmer_id in excluded_swimmer_ids:
-            # Try long ID first (14 characters), then short ID (12 characters)
-            excluded_swimmer = None
-            if len(swimmer_id) == 14:
-                excluded_swimmer = club.find_swimmer_with_long_id(swimmer_id)
-            elif len(swimmer_id) == 12:
-                excluded_swimmer = club.find_swimmer_with_short_id(swimmer_id)
-            else:
-                invalid_ids.append(swimmer_id)
-                continue
-            
-            if excluded_swimmer:
-                generator.exclude_swimmer(excluded_swimmer)
-            else:
-                invalid_ids.append(swimmer_id)
-        
-        if invalid_ids:
-            raise RelayGenerationError(
-                f"The following swimmer IDs are not valid for club '{club_code}': {', '.join(invalid_ids)}"
-            )
+        for swimmer in _find_swimmers(club, club_code, excluded_swimmer_ids):
+            generator.exclude_swimmer(swimmer)
     
     # Generate relays
     generated_relays = generator.generate_relays(event)
     
-    # Calculate relay times and time standards
-    time_standard_info = db.get_time_standard_info()
+    return {
+        "relays": _serialize_relays(db, generated_relays, event, age_range, sex_enum),
+        "settings": {
+            "club_code": club_code,
+            "age_range": age_range,
+            "sex": sex,
+            "course": course,
+            "relay_date": relay_date.isoformat(),
+            "num_relays": num_relays,
+            "event_type": event_type,
+            "objective": objective,
+        },
+    }
+
+
+def generate_relays_batch(
+    club_code: str,
+    event_types: List[str],
+    age_range: tuple[int, int],
+    sex: str,
+    course: str,
+    relay_date: datetime.date,
+    num_relays: int = 2,
+    excluded_swimmer_ids: Optional[List[str]] = None,
+    objective: str = "greedy",
+    db: Optional[Database] = None,
+) -> Dict[str, Any]:
+    """
+    Generate relay teams for several relay events with the same settings. The club,
+    eligible swimmers and their best times are looked up once for all events.
     
-    serialized_relays = []
-    for relay in generated_relays:
-        if not relay:
-            serialized_relays.append(serialize_relay(relay, event, None))
-            continue
-        
-        # Calculate relay time
-        relay_time = relaygen.get_relay_time(relay, event)
-        
-        # Get time standards
-        min_age = age_range[0]
-        sex_enum = sex_map[sex]
-        standards = time_standard_info.get_qualified_standards(
-            relay_time,
-            event,
-            min_age,
-            sex_enum,
-        )
+    Args:
+        club_code: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
+        event_types: Event types as for generate_relays, each at most once
+        age_range: Tuple of (min_age, max_age)
+        sex: 'F' (Female), 'M' (Male), or 'X' (Mixed)
+        course: 'SCY', 'SCM', or 'LCM'
+        relay_date: Date for age calculations
+        num_relays: Number of relay teams to generate for each event
+        excluded_swimmer_ids: Optional list of swimmer IDs to exclude
+        objective: 'greedy', 'total_time' or 'a_first' (see generate_relays)
+        db: Optional database instance
         
-        serialized_relays.append(serialize_relay(relay, event, relay_time, standards))
+    Returns:
+        Dictionary with relays for every event type, in request order, and settings
+    """
+    if db is None:
+        db = get_database()
+    
+    club = _find_club(db, club_code)
+    sex_enum = _parse_sex(sex)
+    course_enum = _parse_course(course)
+    objective_enum = _parse_objective(objective)
+    if not event_types:
+        raise RelayGenerationError("At least one event type is required")
+    if len(set(event_types)) != len(event_types):
+        raise RelayGenerationError(f"Duplicate event types: {event_types}")
+    events = [_find_event(event_type, course_enum) for event_type in event_types]
+    
+    # One generator serves every event, so its candidate pools are shared
+    generator = relaygen.RelayGenerator(
+        db=db,
+        club=club,
+        relay_date=relay_date,
+        num_relays=num_relays,
+        sex=sex_enum,
+        course=course_enum,
+        age_range=age_range,
+        objective=objective_enum,
+    )
+    if excluded_swimmer_ids:
+        for swimmer in _find_swimmers(club, club_code, excluded_swimmer_ids):
+            generator.exclude_swimmer(swimmer)
+    
+    relay_groups = [(generator.generate_relays(event), event) for event in events]
+    serialized_groups = _serialize_relay_groups(db, relay_groups, age_range, sex_enum)
     
     return {
-        "relays": serialized_relays,
+        "events": [
+            {"event_type": event_type, "relays": relays}
+            for event_type, relays in zip(event_types, serialized_groups)
+        ],
         "settings": {
             "club_code": club_code,
             "age_range": age_range,
@@ -211,7 +368,127 @@ def generate_relays(
             "course": course,
             "relay_date": relay_date.isoformat(),
             "num_relays": num_relays,
-            "event_type": event_type,
+            "event_types": event_types,
+            "objective": objective,
         },
     }
 
+
+def generate_lineup(
+    club_code: str,
+    course: str,
+    relay_date: datetime.date,
+    entries: List[Dict[str, Any]],
+    max_relays_per_swimmer: Optional[int] = None,
+    swimmer_caps: Optional[Dict[str, int]] = None,
+    exclusive_entries: Optional[List[tuple[int, int]]] = None,
+    excluded_swimmer_ids: Optional[List[str]] = None,
+    time_budget_ms: int = 2000,
+    db: Optional[Database] = None,
+) -> Dict[str, Any]:
+    """
+    Generate relays for every relay entry of a meet at once, with limits across
+    entries.
+    
+    Args:
+        club_code: Club team code (e.g., 'SCSC') or LSC-qualified code (e.g., 'PC-SCSC')
+        course: 'SCY', 'SCM', or 'LCM'
+        relay_date: Date for age calculations
+        entries: Relay entries, each a dictionary with 'event_type', 'age_range',
+            'sex' and 'num_relays' as for generate_relays
+        max_relays_per_swimmer: Most relays any swimmer may swim (None for no limit)
+        swimmer_caps: Per-swimmer overrides of max_relays_per_swimmer by swimmer ID
+        exclusive_entries: Pairs of entry indexes no swimmer may swim both of
+        excluded_swimmer_ids: Optional list of swimmer IDs to exclude
+        time_budget_ms: Search time budget in milliseconds; the best lineup found
+            so far is returned when it runs out
+        db: Optional database instance
+        
+    Returns:
+        Dictionary with relays for every entry, lineup totals and settings
+    """
+    if db is None:
+        db = get_database()
+    
+    club = _find_club(db, club_code)
+    course_enum = _parse_course(course)
+    if not entries:
+        raise RelayGenerationError("At least one relay entry is required")
+    
+    relay_entries = []
+    for entry in entries:
+        age_range = tuple(entry["age_range"])
+        if len(age_range) != 2 or age_range[0] > age_range[1]:
+            raise RelayGenerationError(f"Invalid age_range: {list(age_range)}")
+        if entry["num_relays"] < 1:
+            raise RelayGenerationError(f"Invalid num_relays: {entry['num_relays']}")
+        relay_entries.append(
+            lineup.RelayEntry(
+                event=_find_event(entry["event_type"], course_enum),
+                sex=_parse_sex(entry["sex"]),
+                age_range=age_range,
+                num_relays=entry["num_relays"],
+            )
+        )
+    
+    exclusive_entries = [tuple(pair) for pair in exclusive_entries or []]
+    for pair in exclusive_entries:
+        if len(pair) != 2 or pair[0] == pair[1] or not all(
+            0 <= i < len(relay_entries) for i in pair
+        ):
+            raise RelayGenerationError(f"Invalid exclusive entry pair: {list(pair)}")
+    if max_relays_per_swimmer is not None and max_relays_per_swimmer < 0:
+        raise RelayGenerationError(
+            f"Invalid max_relays_per_swimmer: {max_relays_per_swimmer}"
+        )
+    if time_budget_ms <= 0:
+        raise RelayGenerationError(f"Invalid time_budget_ms: {time_budget_ms}")
+    
+    optimizer = lineup.LineupOptimizer(
+        db=db,
+        club=club,
+        entries=relay_entries,
+        relay_date=relay_date,
+        max_relays_per_swimmer=max_relays_per_swimmer,
+        exclusive_entries=exclusive_entries,
+        time_budget=time_budget_ms / 1000,
+    )
+    if excluded_swimmer_ids:
+        for swimmer in _find_swimmers(club, club_code, excluded_swimmer_ids):
+            optimizer.exclude_swimmer(swimmer)
+    if swimmer_caps:
+        swimmer_ids = list(swimmer_caps)
+        swimmers = _find_swimmers(club, club_code, swimmer_ids)
+        for swimmer_id, swimmer in zip(swimmer_ids, swimmers):
+            if swimmer_caps[swimmer_id] < 0:
+                raise RelayGenerationError(
+                    f"Invalid relay cap for swimmer {swimmer_id}: {swimmer_caps[swimmer_id]}"
+                )
+            optimizer.set_swimmer_cap(swimmer, swimmer_caps[swimmer_id])
+    
+    result = optimizer.optimize()
+    
+    serialized_entries = []
+    for entry, request_entry, relays in zip(relay_entries, entries, result.relays):
+        serialized_entries.append({
+            "event_type": request_entry["event_type"],
+            "age_range": entry.age_range,
+            "sex": request_entry["sex"],
+            "relays": _serialize_relays(db, relays, entry.event, entry.age_range, entry.sex),
+        })
+    
+    return {
+        "entries": serialized_entries,
+        "num_relays_filled": result.num_filled,
+        "total_time": str(result.total_time) or None,
+        "optimal": result.optimal,
+        "settings": {
+            "club_code": club_code,
+            "course": course,
+            "relay_date": relay_date.isoformat(),
+            "max_relays_per_swimmer": max_relays_per_swimmer,
+            "swimmer_caps": swimmer_caps or {},
+            "exclusive_entries": [list(pair) for pair in exclusive_entries],
+            "time_budget_ms": time_budget_ms,
+        },
+    }
@@ -0,0 +1,125 @@
+"""
+Cache of encoded API responses.
+
+Responses are keyed by endpoint, request parameters, the database data version and
+the date (ages in responses depend on it), so entries never go stale: changed data
+simply stops matching old keys, which are evicted least recently used once the
+cache grows past its byte budget.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+CACHE_BYTES_ENV_VAR = "TUNAS_RESPONSE_CACHE_BYTES"
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    """Encoded response body with its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def make_cached_response(body: bytes) -> CachedResponse:
+    """
+    Wrap body with an ETag derived from its content, so identical bodies get the
+    same ETag in every worker process.
+    """
+    return CachedResponse(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Return whether an If-None-Match header value matches etag (weak comparison,
+    as used for If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of encoded responses with a byte budget.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: CachedResponse) -> None:
+        """
+        Store entry under key, evicting the least recently used entries to stay
+        within the byte budget. Entries larger than the whole budget are not stored.
+        """
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.num_bytes -= len(previous.body)
+            self.entries[key] = entry
+            self.num_bytes += size
+            while self.num_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.num_bytes -= len(evicted.body)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.num_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.num_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_response_cache = ResponseCache(
+    int(os.environ.get(CACHE_BYTES_ENV_VAR, DEFAULT_CACHE_BYTES))
+)
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the response cache singleton. Its byte budget is read from
+    TUNAS_RESPONSE_CACHE_BYTES (default 64 MiB).
+    """
+    return _response_cache
+
+
+def clear_response_cache() -> None:
+    """
+    Drop every cached response (used when the database is reset).
+    """
+    _response_cache.clear()
@@ -2,7 +2,10 @@
 Serialization functions to convert tunas domain objects to JSON-serializable dicts.
 """
 import datetime
-from typing import Optional, Dict, Any, List
+import functools
+import threading
+import weakref
+from typing import Optional, Dict, Any, List, Callable
 
 import sys
 import os
@@ -45,14 +48,64 @@ def _setup_tunas_path():
 # Setup tunas path before importing
 _setup_tunas_path()
 
-from database import swim, stime, sdif, dutil, timestandard
+from database import Database, swim, stime, sdif, dutil, timestandard
 
 
-def serialize_club(club: Optional[swim.Club]) -> Optional[Dict[str, Any]]:
-    """Serialize a Club object to a dictionary."""
-    if club is None:
-        return None
-    
+class FragmentCache:
+    """
+    Serialized fragments (or other values derived from the data, such as sorted
+    indexes) of domain objects, held weakly by object. Fragments are valid for one
+    database, data version and date (ages depend on it), and the whole cache is
+    dropped when any of them changes. The database is referenced weakly, so the
+    cache never keeps it alive.
+    """
+
+    def __init__(self, build: Callable[[Any, Database], Any]) -> None:
+        self.build = build
+        self.lock = threading.Lock()
+        self.token: Optional[tuple] = None
+        self.fragments: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get(self, obj: Any, db: Database) -> Any:
+        """
+        Get the fragment of obj, which belongs to db, building it if needed.
+        Fragments are shared, so callers must not modify them (see copy_fragment).
+        """
+        token = (weakref.ref(db), db.get_data_version(), datetime.date.today())
+        with self.lock:
+            if token != self.token:
+                self.fragments.clear()
+                self.token = token
+            fragment = self.fragments.get(obj)
+        if fragment is None:
+            fragment = self.build(obj, db)
+            with self.lock:
+                if token == self.token:
+                    self.fragments[obj] = fragment
+        return fragment
+
+    def clear(self) -> None:
+        with self.lock:
+            self.fragments.clear()
+            self.token = None
+
+
+def copy_fragment(
+    fragment: Dict[str, Any], nested_keys: tuple[str, ...] = ()
+) -> Dict[str, Any]:
+    """
+    Return a copy of a shared fragment that callers may modify. The dicts nested
+    under nested_keys (ex. the meet of a meet result) are copied too.
+    """
+    copy = dict(fragment)
+    for key in nested_keys:
+        value = copy[key]
+        if value is not None:
+            copy[key] = dict(value)
+    return copy
+
+
+def _build_club(club: swim.Club, db: Database) -> Dict[str, Any]:
     lsc = club.get_lsc()
     club_code = club.get_team_code()
     
@@ -68,8 +121,7 @@ def serialize_club(club: Optional[swim.Club]) -> Optional[Dict[str, Any]]:
     }
 
 
-def serialize_swimmer(swimmer: swim.Swimmer) -> Dict[str, Any]:
-    """Serialize a Swimmer object to a dictionary."""
+def _build_swimmer(swimmer: swim.Swimmer, db: Database) -> Dict[str, Any]:
     club = swimmer.get_club()
     today = datetime.date.today()
     age_range = swimmer.get_age_range(today)
@@ -93,13 +145,12 @@ def serialize_swimmer(swimmer: swim.Swimmer) -> Dict[str, Any]:
             "min": age_range[0],
             "max": age_range[1],
         },
-        "club": serialize_club(club),
+        "club": serialize_club(club, db),
         "citizenship": swimmer.get_citizenship().value if swimmer.get_citizenship() else None,
     }
 
 
-def serialize_meet(meet: swim.Meet) -> Dict[str, Any]:
-    """Serialize a Meet object to a dictionary."""
+def _build_meet(meet: swim.Meet, db: Database) -> Dict[str, Any]:
     return {
         "name": meet.get_name(),
         "city": meet.get_city(),
@@ -111,19 +162,50 @@ def serialize_meet(meet: swim.Meet) -> Dict[str, Any]:
     }
 
 
-def serialize_meet_result(mr: swim.IndividualMeetResult) -> Dict[str, Any]:
-    """Serialize an IndividualMeetResult object to a dictionary."""
-    event = mr.get_event()
+# Keys of swimmer and meet result fragments that hold shared dicts
+SWIMMER_NESTED_KEYS = ("birthday_range", "age_range", "club")
+MEET_RESULT_NESTED_KEYS = ("meet",)
+
+_club_fragments = FragmentCache(_build_club)
+_swimmer_fragments = FragmentCache(_build_swimmer)
+_meet_fragments = FragmentCache(_build_meet)
+
+
+def serialize_club(club: Optional[swim.Club], db: Database) -> Optional[Dict[str, Any]]:
+    """Serialize a Club object of db to a dictionary."""
+    if club is None:
+        return None
+    return copy_fragment(_club_fragments.get(club, db))
+
+
+def serialize_swimmer(swimmer: swim.Swimmer, db: Database) -> Dict[str, Any]:
+    """Serialize a Swimmer object of db to a dictionary."""
+    return copy_fragment(_swimmer_fragments.get(swimmer, db), SWIMMER_NESTED_KEYS)
+
+
+def serialize_meet(meet: swim.Meet, db: Database) -> Dict[str, Any]:
+    """Serialize a Meet object of db to a dictionary."""
+    return copy_fragment(_meet_fragments.get(meet, db))
+
+
+@functools.lru_cache(maxsize=None)
+def _event_fields(event: dutil.Event) -> tuple[str, int, str, str]:
+    return str(event), event.get_distance(), str(event.get_stroke()), str(event.get_course())
+
+
+def _build_meet_result(mr: swim.IndividualMeetResult, db: Database) -> Dict[str, Any]:
+    event, distance, stroke, course = _event_fields(mr.get_event())
     
     return {
-        "event": str(event),
-        "event_distance": event.get_distance(),
-        "event_stroke": str(event.get_stroke()),
-        "event_course": str(event.get_course()),
+        "event": event,
+        "event_distance": distance,
+        "event_stroke": stroke,
+        "event_course": course,
         "time": str(mr.get_final_time()),
         "session": mr.get_session().value,
         "date": mr.get_date_of_swim().isoformat(),
-        "meet": serialize_meet(mr.get_meet()),
+        # Shared with every other result from the meet (copied on output)
+        "meet": _meet_fragments.get(mr.get_meet(), db),
         "heat": mr.get_heat(),
         "lane": mr.get_lane(),
         "rank": mr.get_rank(),
@@ -131,9 +213,47 @@ def serialize_meet_result(mr: swim.IndividualMeetResult) -> Dict[str, Any]:
         "age_class": mr.get_swimmer_age_class(),
         "team_code": mr.get_team_code(),
         "lsc": mr.get_lsc().value if mr.get_lsc() else None,
+        "time_standards": None,
+    }
+
+
+def _build_swimmer_meet_results(swimmer: swim.Swimmer, db: Database) -> Dict[int, tuple]:
+    # Results are keyed by id and kept alongside their fragment, so an id is never
+    # reused while its entry exists
+    return {
+        id(mr): (mr, _build_meet_result(mr, db))
+        for mr in swimmer.get_meet_results()
+        if isinstance(mr, swim.IndividualMeetResult)
     }
 
 
+_swimmer_meet_result_fragments = FragmentCache(_build_swimmer_meet_results)
+
+
+def serialize_meet_result(mr: swim.IndividualMeetResult, db: Database) -> Dict[str, Any]:
+    """Serialize an IndividualMeetResult object of db to a dictionary."""
+    return copy_fragment(_build_meet_result(mr, db), MEET_RESULT_NESTED_KEYS)
+
+
+def serialize_swimmer_meet_results(
+    swimmer: swim.Swimmer, meet_results: List[swim.IndividualMeetResult], db: Database
+) -> List[Dict[str, Any]]:
+    """
+    Serialize meet results of swimmer (a swimmer of db), reusing the swimmer's
+    cached result fragments. Results that swimmer does not hold are serialized
+    directly.
+    """
+    fragments = _swimmer_meet_result_fragments.get(swimmer, db)
+    serialized = []
+    for mr in meet_results:
+        entry = fragments.get(id(mr))
+        if entry is not None and entry[0] is mr:
+            serialized.append(copy_fragment(entry[1], MEET_RESULT_NESTED_KEYS))
+        else:
+            serialized.append(serialize_meet_result(mr, db))
+    return serialized
+
+
 def serialize_time_standard(time_standard: timestandard.TimeStandard) -> str:
     """Serialize a TimeStandard enum to its string value."""
     return time_standard.value if hasattr(time_standard, 'value') else str(time_standard)
@@ -142,13 +262,14 @@ def serialize_time_standard(time_standard: timestandard.TimeStandard) -> str:
 def serialize_relay_swimmer(
     swimmer: swim.Swimmer, 
     leg_event: dutil.Event,
-    relay_date: datetime.date
+    relay_date: datetime.date,
+    db: Database,
 ) -> Dict[str, Any]:
-    """Serialize a swimmer for relay display."""
+    """Serialize a swimmer of db for relay display."""
     best_mr = swimmer.get_best_meet_result(leg_event)
     age_range = swimmer.get_age_range(relay_date)
     
-    result = serialize_swimmer(swimmer)
+    result = serialize_swimmer(swimmer, db)
     result.update({
         "best_time": str(best_mr.get_final_time()) if best_mr else None,
         "age_at_relay": age_range[0] if age_range[0] == age_range[1] else age_range,
@@ -161,9 +282,10 @@ def serialize_relay(
     relay: List[swim.Swimmer],
     event: dutil.Event,
     relay_time: Optional[stime.Time],
+    db: Database,
     time_standards: Optional[List[Any]] = None
 ) -> Dict[str, Any]:
-    """Serialize a relay team."""
+    """Serialize a relay team of swimmers of db."""
     # Import here to avoid circular dependencies
     import relaygen
     
@@ -177,7 +299,7 @@ def serialize_relay(
         "total_time": str(relay_time) if relay_time else None,
         "time_standards": [str(ts) for ts in time_standards] if time_standards else [],
         "swimmers": [
-            serialize_swimmer(swimmer) for swimmer in relay
+            serialize_swimmer(swimmer, db) for swimmer in relay
         ] if relay else [],
         "leg_events": [str(le) for le in leg_events],
     }
@@ -1,7 +1,7 @@
 """
 Service layer for swimmer-related operations.
 """
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 import datetime
 
 import sys
@@ -48,7 +48,12 @@ _setup_tunas_path()
 from database import Database, swim
 
 from .database_service import get_database
-from .serializers import serialize_swimmer, serialize_meet_result
+from .serializers import (
+    FragmentCache,
+    serialize_swimmer,
+    serialize_swimmer_meet_results,
+)
+from .pagination import paginate
 
 
 class SwimmerNotFoundError(Exception):
@@ -56,12 +61,37 @@ class SwimmerNotFoundError(Exception):
     pass
 
 
+def _find_swimmer(swimmer_id: str, db: Database) -> swim.Swimmer:
+    """
+    Find swimmer by USA Swimming ID using the database id indexes.
+    
+    Args:
+        swimmer_id: Long (14 characters) or short (12 characters) USA Swimming ID
+        db: Database instance
+        
+    Returns:
+        Swimmer with the given ID
+        
+    Raises:
+        SwimmerNotFoundError: If swimmer is not found
+    """
+    swimmer = None
+    if len(swimmer_id) == 14:
+        swimmer = db.find_swimmer_with_long_id(swimmer_id)
+    elif len(swimmer_id) == 12:
+        swimmer = db.find_swimmer_with_short_id(swimmer_id)
+    if swimmer is None:
+        raise SwimmerNotFoundError(f"Swimmer not found with ID: {swimmer_id}")
+    return swimmer
+
+
 def get_swimmer_by_id(swimmer_id: str, db: Optional[Database] = None) -> dict:
     """
-    Get swimmer information by USA Swimming ID (long format, 14 characters).
+    Get swimmer information by USA Swimming ID (long format, 14 characters, or
+    short format, 12 characters).
     
     Args:
-        swimmer_id: USA Swimming ID (14 characters)
+        swimmer_id: USA Swimming ID (14 characters, or 12 character short ID)
         db: Optional database instance (uses singleton if not provided)
         
     Returns:
@@ -73,11 +103,9 @@ def get_swimmer_by_id(swimmer_id: str, db: Optional[Database] = None) -> dict:
     if db is None:
         db = get_database()
     
-    swimmer = db.find_swimmer_with_long_id(swimmer_id)
-    if swimmer is None:
-        raise SwimmerNotFoundError(f"Swimmer not found with ID: {swimmer_id}")
+    swimmer = _find_swimmer(swimmer_id, db)
     
-    return serialize_swimmer(swimmer)
+    return serialize_swimmer(swimmer, db)
 
 
 def get_swimmer_best_times(swimmer_id: str, db: Optional[Database] = None) -> dict:
@@ -85,7 +113,7 @@ def get_swimmer_best_times(swimmer_id: str, db: Optional[Database] = None) -> di
     Get swimmer's best times for each event.
     
     Args:
-        swimmer_id: USA Swimming ID (14 characters)
+        swimmer_id: USA Swimming ID (14 characters, or 12 character short ID)
         db: Optional database instance
         
     Returns:
@@ -94,56 +122,99 @@ def get_swimmer_best_times(swimmer_id: str, db: Optional[Database] = None) -> di
     if db is None:
         db = get_database()
     
-    swimmer = db.find_swimmer_with_long_id(swimmer_id)
-    if swimmer is None:
-        raise SwimmerNotFoundError(f"Swimmer not found with ID: {swimmer_id}")
-    
-    from database import dutil
+    swimmer = _find_swimmer(swimmer_id, db)
     
-    best_times = []
-    for event in dutil.Event:
-        best_mr = swimmer.get_best_meet_result(event)
-        if best_mr is not None:
-            best_times.append(serialize_meet_result(best_mr))
+    best_times = serialize_swimmer_meet_results(
+        swimmer, db.get_best_meet_results(swimmer), db
+    )
     
     return {
-        "swimmer": serialize_swimmer(swimmer),
+        "swimmer": serialize_swimmer(swimmer, db),
         "best_times": best_times,
     }
 
 
-def get_swimmer_time_history(swimmer_id: str, db: Optional[Database] = None) -> dict:
+def _sort_meet_results(swimmer: swim.Swimmer, db: Database) -> List[int]:
+    # Sort by event, date, and session (same as CLI)
+    meet_results = swimmer.get_meet_results()
+    return sorted(
+        range(len(meet_results)),
+        key=lambda i: (
+            meet_results[i].get_event().ordinal,
+            meet_results[i].get_date_of_swim(),
+            meet_results[i].get_session().ordinal,
+        ),
+    )
+
+
+# Swimmer -> positions in its meet results, in response order. Like roster
+# indexes, only positions are cached, so nothing in the index refers back to the
+# swimmer and keeps it alive.
+_meet_result_indexes = FragmentCache(_sort_meet_results)
+
+
+def get_swimmer_time_history(
+    swimmer_id: str,
+    db: Optional[Database] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> dict:
     """
-    Get swimmer's full time history.
+    Get swimmer's full time history, a page at a time.
     
     Args:
-        swimmer_id: USA Swimming ID (14 characters)
+        swimmer_id: USA Swimming ID (14 characters, or 12 character short ID)
         db: Optional database instance
+        limit: Most meet results to return (None for all remaining results)
+        cursor: next_cursor of the previous page (None for the first page)
         
     Returns:
-        Dictionary with swimmer info and meet results list
+        Dictionary with swimmer info, meet results list and the cursor of the next
+        page (None on the last page)
+        
+    Raises:
+        SwimmerNotFoundError: If swimmer is not found
+        InvalidCursorError: If cursor is malformed or the data has changed
     """
     if db is None:
         db = get_database()
     
-    swimmer = db.find_swimmer_with_long_id(swimmer_id)
-    if swimmer is None:
-        raise SwimmerNotFoundError(f"Swimmer not found with ID: {swimmer_id}")
-    
+    swimmer = _find_swimmer(swimmer_id, db)
     meet_results = swimmer.get_meet_results()
-    
-    # Sort by event, date, and session (same as CLI)
-    meet_results.sort(
-        key=lambda mr: (
-            mr.get_event(),
-            mr.get_date_of_swim(),
-            mr.get_session(),
-        )
+    positions, next_cursor = paginate(
+        _meet_result_indexes.get(swimmer, db), db.get_data_version(), limit, cursor
     )
     
     return {
-        "swimmer": serialize_swimmer(swimmer),
-        "meet_results": [serialize_meet_result(mr) for mr in meet_results],
+        "swimmer": serialize_swimmer(swimmer, db),
+        "meet_results": serialize_swimmer_meet_results(
+            swimmer, [meet_results[i] for i in positions], db
+        ),
+        "next_cursor": next_cursor,
     }
 
 
+def iter_swimmer_time_history(
+    swimmer_id: str, db: Optional[Database] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get an iterator over swimmer's serialized meet results, in the order of
+    get_swimmer_time_history.
+    
+    Args:
+        swimmer_id: USA Swimming ID (14 characters, or 12 character short ID)
+        db: Optional database instance
+        
+    Raises:
+        SwimmerNotFoundError: If swimmer is not found (before iteration starts)
+    """
+    if db is None:
+        db = get_database()
+    
+    swimmer = _find_swimmer(swimmer_id, db)
+    meet_results = swimmer.get_meet_results()
+    return (
+        serialized
+        for i in _meet_result_indexes.get(swimmer, db)
+        for serialized in serialize_swimmer_meet_results(swimmer, [meet_results[i]], db)
+    )
@@ -125,10 +125,10 @@ def get_database_stats(db: Optional[Database] = None) -> Dict[str, int]:
         db = get_database()
     
     return {
-        "num_clubs": len(db.get_clubs()),
-        "num_swimmers": len(db.get_swimmers()),
-        "num_meets": len(db.get_meets()),
-        "num_meet_results": len(db.get_meet_results()),
+        "num_clubs": db.get_num_clubs(),
+        "num_swimmers": db.get_num_swimmers(),
+        "num_meets": db.get_num_meets(),
+        "num_meet_results": db.get_num_meet_results(),
     }
 
 
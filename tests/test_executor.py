@@ -0,0 +1,83 @@
+"""
+Tests for services/executor.py
+"""
+
+import asyncio
+import itertools
+import threading
+
+import pytest
+
+from services.executor import ServiceBusyError, ServiceLane
+
+
+def test_cancelled_queued_call_leaves_queue():
+    lane = ServiceLane("test", max_workers=1, max_queued=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(lane.run(release.wait, 5))
+        while lane.get_metrics()["active"] == 0:
+            await asyncio.sleep(0.001)
+
+        # Cancel a call while it waits for the only worker
+        queued = asyncio.create_task(lane.run(lambda: None))
+        await asyncio.sleep(0)
+        assert lane.get_metrics()["queued"] == 1
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert lane.get_metrics()["queued"] == 0
+
+        # The lane still accepts calls once the worker is free
+        release.set()
+        assert await running
+        assert await lane.run(lambda: 42) == 42
+        assert lane.get_metrics()["queued"] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        lane.shutdown()
+
+
+def test_stream_holds_worker_until_closed():
+    lane = ServiceLane("test", max_workers=1, max_queued=1)
+
+    async def scenario():
+        items = await lane.stream(lambda: iter(range(3)))
+        assert await items.__anext__() == 0
+        assert lane.get_metrics()["active"] == 1
+
+        # The open stream keeps the only worker, so the next call waits and a
+        # stream after it is rejected
+        queued = asyncio.create_task(lane.run(lambda: 42))
+        await asyncio.sleep(0)
+        assert lane.get_metrics()["queued"] == 1
+        with pytest.raises(ServiceBusyError):
+            await lane.stream(lambda: iter(range(3)))
+        assert not queued.done()
+
+        assert [item async for item in items] == [1, 2]
+        assert await queued == 42
+
+        # Closing a stream early frees its worker
+        items = await lane.stream(itertools.count)
+        assert await items.__anext__() == 0
+        await items.aclose()
+        assert await lane.run(lambda: 7) == 7
+        assert lane.get_metrics()["active"] == 0
+
+        # Errors before the first item are raised before the stream is returned
+        def missing():
+            raise KeyError("missing")
+            yield
+
+        with pytest.raises(KeyError):
+            await lane.stream(missing)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        lane.shutdown()
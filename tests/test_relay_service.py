@@ -0,0 +1,143 @@
+"""
+Tests for services/relay_service.py
+"""
+
+import datetime
+
+from services import relay_service
+
+import database
+
+RELAY_DATE = datetime.date(2025, 6, 8)
+LEG_EVENTS = [
+    database.dutil.Event.BACK_50_SCY,
+    database.dutil.Event.BREAST_50_SCY,
+    database.dutil.Event.FLY_50_SCY,
+    database.dutil.Event.FREE_50_SCY,
+]
+
+# Best times (seconds) of four male and four female swimmers in each leg of a
+# 4x50 medley relay, or None if they have not swum it. Only two swimmers swim
+# breaststroke, so a second mixed relay needs relay A to leave one of them.
+MIXED_TIMES = [
+    (database.sdif.Sex.MALE, [28, None, 27, 37]),
+    (database.sdif.Sex.MALE, [34, None, None, 42]),
+    (database.sdif.Sex.MALE, [30, None, 25, None]),
+    (database.sdif.Sex.MALE, [None, None, 34, 36]),
+    (database.sdif.Sex.FEMALE, [44, 37, 30, 33]),
+    (database.sdif.Sex.FEMALE, [42, None, 34, 34]),
+    (database.sdif.Sex.FEMALE, [None, 38, 34, 30]),
+    (database.sdif.Sex.FEMALE, [33, None, 26, 33]),
+]
+
+
+def make_club_database(swimmer_times):
+    """
+    Return a database with one club whose swimmers have the given best times.
+    """
+    db = database.Database()
+    club = database.swim.Club(
+        database.sdif.Organization.USA_SWIMMING,
+        "TEST",
+        database.sdif.LSC.PACIFIC,
+        "Test Swim Club",
+        "Test",
+        "1 Pool Road",
+        None,
+        "Santa Clara",
+        database.sdif.State.CALIFORNIA,
+        "95050",
+        database.sdif.Country.UNITED_STATES,
+        database.sdif.Region.REGION_1,
+    )
+    meet = database.swim.Meet(
+        database.sdif.Organization.USA_SWIMMING,
+        "Test Meet",
+        "Santa Clara",
+        "1 Pool Road",
+        datetime.date(2025, 5, 1),
+        datetime.date(2025, 5, 1),
+    )
+    db.add_club(club)
+    db.add_meet(meet)
+    for i, (sex, times) in enumerate(swimmer_times):
+        short_id = f"TESTSWIMMR{i:02d}"
+        swimmer = database.swim.Swimmer(
+            f"Swimmer{chr(ord('A') + i)}",
+            "Test",
+            sex,
+            short_id,
+            club,
+            birthday=datetime.date(2012, 1, 1),
+        )
+        club.add_swimmer(swimmer)
+        db.add_swimmer(swimmer)
+        for event, seconds in zip(LEG_EVENTS, times):
+            if seconds is None:
+                continue
+            mr = database.swim.IndividualMeetResult(
+                meet,
+                database.sdif.Organization.USA_SWIMMING,
+                "TEST",
+                database.sdif.LSC.PACIFIC,
+                database.sdif.Session.FINALS,
+                datetime.date(2025, 5, 1),
+                event,
+                11,
+                14,
+                "1",
+                sex,
+                1,
+                1,
+                database.stime.Time.from_hundredths(seconds * 100),
+                swimmer.get_first_name(),
+                "Test",
+                sex,
+                short_id,
+                database.sdif.AttachStatus.ATTACHED,
+            )
+            swimmer.add_meet_result(mr)
+            meet.add_meet_result(mr)
+            club.add_meet_result(mr)
+            db.add_meet_result(mr, swimmer)
+    return db
+
+
+def test_default_mixed_relays_are_exact():
+    db = make_club_database(MIXED_TIMES)
+    result = relay_service.generate_relays(
+        "TEST", "4x50_MEDLEY", (11, 14), "X", "SCY", RELAY_DATE, num_relays=2, db=db
+    )
+    relays = result["relays"]
+    assert result["settings"]["objective"] == "greedy"
+
+    # Filling relay A from each leg's top two swimmers of each sex (120.00) uses
+    # both breaststrokers; the exact lineup fills both relays
+    club = db.find_club("TEST")
+    names = {s.get_first_name(): s for s in club.get_swimmers()}
+    lineup = [[names[leg["first_name"]] for leg in relay["swimmers"]] for relay in relays]
+    times = [
+        sum(
+            s.get_best_meet_result(e).get_final_time().get_total_hundredths()
+            for s, e in zip(relay, LEG_EVENTS)
+        )
+        for relay in lineup
+    ]
+    assert times == [12300, 14000]
+    for relay in lineup:
+        assert sorted(s.get_sex().name for s in relay) == ["FEMALE"] * 2 + ["MALE"] * 2
+
+    # The lineup uses swimmers outside their leg's top two of their sex
+    outside = 0
+    for l, event in enumerate(LEG_EVENTS):
+        for relay in lineup:
+            faster = [
+                s
+                for s in club.get_swimmers()
+                if s.get_sex() == relay[l].get_sex()
+                and s.get_best_meet_result(event) is not None
+                and s.get_best_meet_result(event).get_final_time()
+                < relay[l].get_best_meet_result(event).get_final_time()
+            ]
+            outside += len(faster) >= 2
+    assert outside >= 3
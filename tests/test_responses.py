@@ -0,0 +1,50 @@
+"""
+Tests for api/responses.py
+"""
+
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from services import executor
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_streams_are_rejected_when_lookup_lane_is_full(monkeypatch):
+    lane = executor.ServiceLane("lookup", max_workers=1, max_queued=1)
+    monkeypatch.setitem(executor._lanes, "lookup", lane)
+    release = threading.Event()
+
+    # Occupy the only worker, then the only queue slot
+    running = threading.Thread(target=asyncio.run, args=(lane.run(release.wait, 5),))
+    running.start()
+    wait_for(lambda: lane.get_metrics()["active"] == 1)
+    queued = threading.Thread(target=asyncio.run, args=(lane.run(lambda: None),))
+    queued.start()
+    wait_for(lambda: lane.get_metrics()["queued"] == 1)
+
+    try:
+        # No lifespan, so the database is not loaded
+        client = TestClient(main.app)
+        for path in [
+            "/api/clubs/SCSC/swimmers/stream",
+            "/api/swimmers/ABCDEFGHIJKL/times/stream",
+        ]:
+            response = client.get(path)
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "1"
+        assert lane.get_metrics()["rejected"] == 2
+    finally:
+        release.set()
+        running.join()
+        queued.join()
+        lane.shutdown()
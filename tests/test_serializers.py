@@ -0,0 +1,41 @@
+"""
+Tests for services/serializers.py
+"""
+
+from services import database_service, serializers
+
+from tests.test_relay_service import MIXED_TIMES, make_club_database
+
+
+def test_fragments_are_keyed_on_the_given_database(monkeypatch):
+    db = make_club_database(MIXED_TIMES)
+    other_db = make_club_database(MIXED_TIMES)
+    monkeypatch.setattr(database_service, "_db", other_db)
+    swimmer = db.find_club("TEST").get_swimmers()[0]
+    assert serializers.serialize_swimmer(swimmer, db)["preferred_first_name"] is None
+
+    # A change to db is seen even though the loaded database did not change
+    swimmer.set_preferred_first_name("Sam")
+    db.set_meets(db.get_meets())
+    assert serializers.serialize_swimmer(swimmer, db)["preferred_first_name"] == "Sam"
+    other_swimmer = other_db.find_club("TEST").get_swimmers()[0]
+    serialized = serializers.serialize_swimmer(other_swimmer, other_db)
+    assert serialized["preferred_first_name"] is None
+
+
+def test_serialized_fragments_are_copies():
+    db = make_club_database(MIXED_TIMES)
+    swimmer = db.find_club("TEST").get_swimmers()[0]
+    meet_results = swimmer.get_meet_results()
+
+    serialized = serializers.serialize_swimmer(swimmer, db)
+    serialized["club"]["team_code"] = "XXXX"
+    serialized["age_range"]["min"] = -1
+    results = serializers.serialize_swimmer_meet_results(swimmer, meet_results, db)
+    results[0]["meet"]["name"] = "Changed"
+
+    serialized = serializers.serialize_swimmer(swimmer, db)
+    assert serialized["club"]["team_code"] == "TEST"
+    assert serialized["age_range"]["min"] != -1
+    results = serializers.serialize_swimmer_meet_results(swimmer, meet_results, db)
+    assert all(result["meet"]["name"] == "Test Meet" for result in results)
@@ -0,0 +1,104 @@
+"""
+Compare serial and multi-process cl2 ingest.
+
+The meet data directory is loaded with parser.read_cl2 once per worker count, and
+each load is checked against the serial load. The report shows the best load time
+of each worker count, and how many bytes a parsed file takes to send back from a
+worker as typed records and as the plain-value rows workers actually return.
+
+Usage (from the tunas project directory):
+    python benchmarks/ingest_benchmark.py [--path DIR] [--workers N ...] [--repeat N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import pickle
+import sys
+import time
+
+TUNAS_DIRECTORY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "tunas"
+)
+sys.path.insert(0, TUNAS_DIRECTORY_PATH)
+
+import parser
+
+TUNAS_PROJECT_PATH = os.path.dirname(TUNAS_DIRECTORY_PATH)
+MEET_DATA_PATH = os.path.join(TUNAS_PROJECT_PATH, "data", "meetData")
+
+
+def describe(db) -> tuple[int, int, int, int]:
+    return (
+        db.get_num_clubs(),
+        db.get_num_swimmers(),
+        db.get_num_meets(),
+        db.get_num_meet_results(),
+    )
+
+
+def benchmark_transfer(path: str) -> None:
+    """
+    Print pickled size of every parsed file as records and as encoded rows.
+    """
+    record_bytes = 0
+    row_bytes = 0
+    for source in parser.find_cl2_sources(path):
+        _, records = parser.read_records(source)
+        _, _, rows = parser.read_partial(source)
+        record_bytes += len(pickle.dumps(records, pickle.HIGHEST_PROTOCOL))
+        row_bytes += len(pickle.dumps(rows, pickle.HIGHEST_PROTOCOL))
+    print(f"Pickled records: {record_bytes / 1e6:.2f} MB")
+    print(f"Pickled rows:    {row_bytes / 1e6:.2f} MB")
+    print()
+
+
+def benchmark_load(path: str, workers: list[int], repeat: int) -> None:
+    """
+    Print best load time of path for every worker count.
+    """
+    expected = None
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'workers':>7} {'load (s)':>9} {'speedup':>8}")
+    serial_time = None
+    for num_workers in workers:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                db = parser.read_cl2(path, workers=num_workers)
+            times.append(time.perf_counter() - start)
+            if expected is None:
+                expected = describe(db)
+            assert describe(db) == expected, "loads differ"
+        best = min(times)
+        if serial_time is None:
+            serial_time = best
+        print(f"{num_workers:>7} {best:>9.2f} {serial_time / best:>7.2f}x")
+    print()
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "--path", default=MEET_DATA_PATH, help="meet data directory to load"
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, os.cpu_count() or 1}),
+        help="worker counts to compare (the first is the baseline)",
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=3, help="loads per worker count"
+    )
+    args = arg_parser.parse_args()
+
+    benchmark_transfer(args.path)
+    benchmark_load(args.path, args.workers, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
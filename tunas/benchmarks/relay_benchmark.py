@@ -0,0 +1,174 @@
+"""
+Compare greedy and exact relay generation on the local meet data.
+
+For every club, relay event, sex, age range, and relay count, relays are generated
+with every RelayObjective. The report shows how often the exact solvers fill more
+relays or find a faster combined time than the greedy generator, and how long each
+objective takes. A synthetic 200-swimmer club is timed as well.
+
+Usage (from the tunas project directory):
+    python benchmarks/relay_benchmark.py [--clubs N]
+"""
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+
+TUNAS_DIRECTORY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "tunas"
+)
+sys.path.insert(0, TUNAS_DIRECTORY_PATH)
+
+import database
+import relaygen
+import snapshot
+
+TUNAS_PROJECT_PATH = os.path.dirname(TUNAS_DIRECTORY_PATH)
+MEET_DATA_PATH = os.path.join(TUNAS_PROJECT_PATH, "data", "meetData")
+SNAPSHOT_PATH = os.path.join(TUNAS_PROJECT_PATH, "data", "cache", "database.snapshot")
+
+RELAY_DATE = datetime.date(2025, 6, 8)
+AGE_RANGES = [(1, 10), (11, 12), (13, 14), (15, 18), (1, 99)]
+SEXES = [database.sdif.Sex.FEMALE, database.sdif.Sex.MALE, database.sdif.Sex.MIXED]
+NUM_RELAYS = [1, 2, 3, 4]
+RELAY_EVENTS = [
+    event
+    for event in database.dutil.Event
+    if event.get_stroke()
+    in (database.sdif.Stroke.FREESTYLE_RELAY, database.sdif.Stroke.MEDLEY_RELAY)
+]
+
+
+def total_hundredths(
+    relays: list[list[database.swim.Swimmer]], event: database.dutil.Event
+) -> int:
+    """
+    Return combined time of the full relays in relays.
+    """
+    return sum(
+        relaygen.get_relay_time(relay, event).get_total_hundredths()
+        for relay in relays
+        if relay
+    )
+
+
+def count_full(relays: list[list[database.swim.Swimmer]]) -> int:
+    return sum(1 for relay in relays if relay)
+
+
+def benchmark_clubs(db: database.Database, num_clubs: int) -> None:
+    """
+    Run every objective over the largest num_clubs clubs and print a comparison
+    against the greedy generator.
+    """
+    clubs = sorted(db.get_clubs(), key=lambda c: len(c.get_swimmers()), reverse=True)
+    timings = {objective: [] for objective in relaygen.RelayObjective}
+    cases = 0
+    more_relays = {objective: 0 for objective in relaygen.RelayObjective}
+    faster = {objective: 0 for objective in relaygen.RelayObjective}
+    saved = {objective: 0 for objective in relaygen.RelayObjective}
+
+    for club in clubs[:num_clubs]:
+        generator = relaygen.RelayGenerator(db, club, RELAY_DATE)
+        for event in RELAY_EVENTS:
+            generator.set_course(event.get_course())
+            for sex in SEXES:
+                generator.set_sex(sex)
+                for age_range in AGE_RANGES:
+                    generator.set_age_range(age_range)
+                    for num_relays in NUM_RELAYS:
+                        generator.set_num_relays(num_relays)
+                        results = dict()
+                        for objective in relaygen.RelayObjective:
+                            generator.set_objective(objective)
+                            start = time.perf_counter()
+                            relays = generator.generate_relays(event)
+                            timings[objective].append(time.perf_counter() - start)
+                            results[objective] = relays
+                        greedy = results[relaygen.RelayObjective.GREEDY]
+                        if count_full(greedy) == 0:
+                            continue
+                        cases += 1
+                        for objective, relays in results.items():
+                            if count_full(relays) > count_full(greedy):
+                                more_relays[objective] += 1
+                            elif count_full(relays) == count_full(greedy):
+                                difference = total_hundredths(
+                                    greedy, event
+                                ) - total_hundredths(relays, event)
+                                if difference > 0:
+                                    faster[objective] += 1
+                                    saved[objective] += difference
+
+    print(f"Clubs: {min(num_clubs, len(clubs))}, cases with a greedy relay: {cases}")
+    print(
+        f"{'objective':<12} {'more relays':>12} {'faster':>8} {'saved (s)':>10} "
+        + f"{'mean (ms)':>10} {'max (ms)':>10}"
+    )
+    for objective in relaygen.RelayObjective:
+        print(
+            f"{objective.value:<12} {more_relays[objective]:>12} "
+            + f"{faster[objective]:>8} {saved[objective] / 100:>10.2f} "
+            + f"{statistics.mean(timings[objective]) * 1000:>10.3f} "
+            + f"{max(timings[objective]) * 1000:>10.3f}"
+        )
+    print()
+
+
+def benchmark_synthetic(num_swimmers: int = 200, mixed: bool = False) -> None:
+    """
+    Time the exact solvers on a synthetic club where every swimmer swims every leg.
+    Half of the swimmers are male for mixed relays.
+    """
+    rng = random.Random(0)
+    sexes = [database.sdif.Sex.FEMALE, database.sdif.Sex.MALE]
+    swimmers = [
+        database.swim.Swimmer(
+            f"Swimmer{i}", "Synthetic", sexes[i % 2 if mixed else 0], None, None
+        )
+        for i in range(num_swimmers)
+    ]
+    leg_candidates = []
+    for _ in range(4):
+        candidates = [
+            (s, database.stime.Time.from_hundredths(rng.randint(2500, 4500)))
+            for s in swimmers
+        ]
+        candidates.sort(key=lambda x: x[1])
+        leg_candidates.append(candidates)
+
+    solve = relaygen.solve_mixed_relays if mixed else relaygen.solve_relays
+    print(f"Synthetic {'mixed ' if mixed else ''}club with {num_swimmers} swimmers")
+    print(f"{'relays':>6} {'total_time (ms)':>16} {'a_first (ms)':>13}")
+    for num_relays in [1, 2, 4, 8]:
+        row = f"{num_relays:>6}"
+        for objective, width in [
+            (relaygen.RelayObjective.TOTAL_TIME, 16),
+            (relaygen.RelayObjective.A_FIRST, 13),
+        ]:
+            start = time.perf_counter()
+            solve(leg_candidates, num_relays, objective)
+            row += f" {(time.perf_counter() - start) * 1000:>{width}.2f}"
+        print(row)
+    print()
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "--clubs", type=int, default=20, help="number of largest clubs to benchmark"
+    )
+    args = arg_parser.parse_args()
+
+    db = snapshot.load_database(MEET_DATA_PATH, SNAPSHOT_PATH)
+    benchmark_clubs(db, args.clubs)
+    benchmark_synthetic()
+    benchmark_synthetic(mixed=True)
+
+
+if __name__ == "__main__":
+    main()
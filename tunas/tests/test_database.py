@@ -2,6 +2,7 @@
 Tests for database package
 """
 
+import os
 import datetime
 import pytest
 
@@ -143,6 +144,26 @@ class TestTime:
         t5 = t1 + t2
         assert t5 == database.stime.Time(3, 30, 94)
 
+    def test_time_over_an_hour(self):
+        t = database.stime.Time(75, 2, 5)
+        assert str(t) == "75:02.05"
+        assert repr(t) == "Time(75, 2, 5)"
+        assert database.stime.create_time_from_str("75:02.05") == t
+        assert database.stime.create_time_from_str("1:15:02.05") == t
+        assert database.stime.Time(59, 59, 99) + database.stime.Time(0, 0, 1) == (
+            database.stime.Time(60, 0, 0)
+        )
+
+    def test_time_value_semantics(self):
+        t = database.stime.Time(1, 15, 23)
+        assert t.get_total_hundredths() == 7523
+        assert database.stime.Time.from_hundredths(7523) == t
+        assert hash(database.stime.Time.from_hundredths(7523)) == hash(t)
+        assert len({database.stime.Time(0, s, 0) for s in range(60)}) == 60
+        assert sorted([t, database.stime.Time(0, 59, 99)])[0].get_minute() == 0
+        with pytest.raises(AttributeError):
+            t.hundredths = 0
+
     def test_create_time_from_string_basic1(self):
         t_str = "1:52.65"
         t = database.stime.create_time_from_str(t_str)
@@ -175,6 +196,20 @@ class TestUtil:
         assert e1.get_distance() == 100
         assert e1.get_stroke() == database.sdif.Stroke.BACKSTROKE
 
+    def test_enum_ordinals(self):
+        Event = database.dutil.Event
+        Session = database.sdif.Session
+        TimeStandard = database.timestandard.TimeStandard
+        for enum_type in [Event, Session, TimeStandard]:
+            members = list(enum_type)
+            assert [m.ordinal for m in members] == list(range(len(members)))
+            assert sorted(reversed(members)) == members
+            assert len({m: None for m in members}) == len(members)
+        assert Event.FREE_50_SCY < Event.FREE_100_SCY
+        assert Session.FINALS > Session.PRELIMS
+        assert TimeStandard.B < TimeStandard.OT
+        assert Event.FREE_50_SCY != None
+
     def test_calculate_age_basic(self):
         birthday1 = datetime.date(2010, 1, 1)
         on_date1 = datetime.date(2025, 8, 14)
@@ -187,3 +222,314 @@ class TestUtil:
         birthday3 = datetime.date(2010, 2, 4)
         on_date3 = datetime.date(2025, 2, 4)
         assert database.dutil.calculate_age(birthday3, on_date3) == 15
+
+
+class TestSwimmerIndex:
+    """
+    Swimmer identity index tests in swim.py.
+    """
+
+    def create_swimmer(self, first_name, last_name, short_id=None, birthday=None):
+        return database.swim.Swimmer(
+            first_name,
+            last_name,
+            database.sdif.Sex.FEMALE,
+            short_id,
+            None,
+            birthday=birthday,
+        )
+
+    def test_find_with_birthday_matches_linear_scan(self):
+        birthday = datetime.date(2012, 3, 4)
+        db = database.Database()
+        jane = self.create_swimmer("Jane", "Smith", birthday=birthday)
+        janet = self.create_swimmer("Janet", "Smithers", birthday=birthday)
+        jake = self.create_swimmer("Jake", "Smith", birthday=birthday)
+        other_day = self.create_swimmer("Jane", "Smith", birthday=datetime.date(2012, 3, 5))
+        for s in [other_day, jane, janet, jake]:
+            db.add_swimmer(s)
+
+        # Exact and hamming distance 1 matches return the earliest added swimmer
+        assert db.find_swimmer_with_birthday("Jane", None, "Smith", birthday) == jane
+        assert db.find_swimmer_with_birthday("Jana", None, "Smith", birthday) == jane
+        assert db.find_swimmer_with_birthday("Jake", None, "Smith", birthday) == jane
+        assert db.find_swimmer_with_birthday("Jill", None, "Smyth", birthday) is None
+        assert db.find_swimmer_with_birthday("Bob", "A", "Jones", birthday) is None
+
+    def test_index_tracks_attribute_changes(self):
+        birthday = datetime.date(2012, 3, 4)
+        db = database.Database()
+        swimmer = self.create_swimmer("Jane", "Smith")
+        db.add_swimmer(swimmer)
+        assert db.find_swimmer_with_birthday("Jane", None, "Smith", birthday) is None
+        assert db.find_swimmer_with_short_id("ABCDEFGHIJKL") is None
+
+        swimmer.set_birthday(birthday)
+        swimmer.set_usa_id_short("ABCDEFGHIJKL")
+        assert db.find_swimmer_with_birthday("Jane", None, "Smith", birthday) == swimmer
+        assert db.find_swimmer_with_short_id("ABCDEFGHIJKL") == swimmer
+
+        # Changing two characters of the old id moves swimmer out of range
+        swimmer.set_middle_initial("Q")
+        assert db.find_swimmer_with_birthday("Jane", None, "Smith", birthday) == swimmer
+        swimmer.set_last_name("Smyth")
+        assert db.find_swimmer_with_birthday("Jane", None, "Smith", birthday) is None
+
+    def test_club_index_follows_club_changes(self):
+        club_args = (database.sdif.Organization.USA_SWIMMING,)
+        club1 = database.swim.Club(*club_args, "AAAA", None, "Club One")
+        club2 = database.swim.Club(*club_args, "BBBB", None, "Club Two")
+        swimmer = self.create_swimmer("Jane", "Smith", short_id="ABCDEFGHIJKL")
+        swimmer.update_club(club1)
+        assert club1.find_swimmer_with_short_id("ABCDEFGHIJKL") == swimmer
+
+        swimmer.update_club(club2)
+        assert club1.find_swimmer_with_short_id("ABCDEFGHIJKL") is None
+        assert club2.find_swimmer_with_short_id("ABCDEFGHIJKL") == swimmer
+        assert club1.get_swimmers() == [] and club2.get_swimmers() == [swimmer]
+
+    def test_databases_do_not_share_storage(self):
+        db1 = database.Database()
+        db1.add_swimmer(self.create_swimmer("Jane", "Smith"))
+        assert database.Database().get_swimmers() == []
+
+
+def test_find_club_by_lsc():
+    org = database.sdif.Organization.USA_SWIMMING
+    pacific = database.swim.Club(org, "SCSC", database.sdif.LSC.PACIFIC, "Pacific Club")
+    sierra = database.swim.Club(
+        org, "SCSC", database.sdif.LSC.SIERRA_NEVADA, "Sierra Nevada Club"
+    )
+    no_lsc = database.swim.Club(org, "ABC", None, "No LSC Club")
+    db = database.Database(clubs=[pacific])
+    db.add_club(sierra)
+    db.add_club(no_lsc)
+
+    assert db.find_club("SCSC") == pacific
+    assert db.find_club("PC-SCSC") == pacific
+    assert db.find_club("SN-SCSC") == sierra
+    assert db.find_club("ZZ-SCSC") is None
+    assert db.find_club("NONE") is None
+    assert db.find_club("ABC") == no_lsc
+    assert db.find_club_with_lsc("SCSC", database.sdif.LSC.SIERRA_NEVADA) == sierra
+    assert db.find_club_with_lsc("ABC", None) == no_lsc
+    assert db.find_clubs_with_team_code("SCSC") == [pacific, sierra]
+
+
+def test_find_swimmer_with_long_id():
+    db = database.Database()
+    club = database.swim.Club(
+        database.sdif.Organization.USA_SWIMMING, "SCSC", database.sdif.LSC.PACIFIC, "SCSC"
+    )
+    db.add_club(club)
+    swimmer = database.swim.Swimmer("Jane", "Smith", database.sdif.Sex.FEMALE, None, club)
+    db.add_swimmer(swimmer)
+    club.add_swimmer(swimmer)
+    assert db.find_swimmer_with_long_id("ABCDEFGHIJKLMN") is None
+
+    swimmer.set_usa_id_long("ABCDEFGHIJKLMN")
+    assert db.find_swimmer_with_long_id("ABCDEFGHIJKLMN") == swimmer
+    assert club.find_swimmer_with_long_id("ABCDEFGHIJKLMN") == swimmer
+
+    # Moving swimmer to a new club moves it between club indexes
+    new_club = database.swim.Club(
+        database.sdif.Organization.USA_SWIMMING, "ABC", database.sdif.LSC.PACIFIC, "ABC"
+    )
+    swimmer.update_club(new_club)
+    assert club.find_swimmer_with_long_id("ABCDEFGHIJKLMN") is None
+    assert new_club.find_swimmer_with_long_id("ABCDEFGHIJKLMN") == swimmer
+    assert db.find_swimmer_with_long_id("ABCDEFGHIJKLMN") == swimmer
+
+
+def test_best_meet_results_match_scan():
+    from tunas import parser
+    from tests.test_parser import MEET_DATA_PATH
+
+    db = parser.read_cl2(MEET_DATA_PATH)
+    for swimmer in db.get_swimmers():
+        expected = []
+        for event in parser.database.dutil.Event:
+            results = [
+                mr for mr in swimmer.get_meet_results() if mr.get_event() == event
+            ]
+            best = None
+            if len(results) > 0:
+                best = min(results, key=lambda mr: mr.get_final_time())
+                expected.append(best)
+            assert swimmer.get_best_meet_result(event) is best
+        assert swimmer.get_best_meet_results() == expected
+
+        # Rebuilding from the result list gives the same bests
+        swimmer.set_meet_results(list(swimmer.get_meet_results()))
+        assert swimmer.get_best_meet_results() == expected
+
+
+def test_compiled_time_standards(tmp_path):
+    timestandard = database.timestandard
+    cache_path = str(tmp_path / "time_standards.npz")
+    info = timestandard.TimeStandardInfo(cache_path)
+    assert os.listdir(tmp_path) == ["time_standards.npz"]
+
+    # Cache is reused while the xlsx files are unchanged
+    manifest = timestandard.build_time_standard_manifest()
+    assert timestandard.load_compiled_time_standards(cache_path, manifest) is not None
+    stale_manifest = dict(manifest, files=manifest["files"][1:])
+    assert timestandard.load_compiled_time_standards(cache_path, stale_manifest) is None
+    cached_info = timestandard.TimeStandardInfo(cache_path)
+    assert (cached_info.table == info.table).all()
+
+    # Qualifying times match the sheets
+    event = database.dutil.Event.FREE_50_SCY
+    for standard in timestandard.TimeStandard:
+        age_group = timestandard.TimeStandardInfo.get_age_groups(standard)[-1]
+        age = age_group.value[0]
+        df = cached_info.get_time_standard_df(standard, age_group)
+        qual_time = df.loc["50 FR", "SCY-F"]
+        sex = database.sdif.Sex.FEMALE
+        slower = qual_time + database.stime.Time(0, 0, 1)
+        assert standard in cached_info.get_qualified_standards(qual_time, event, age, sex)
+        assert standard not in cached_info.get_qualified_standards(slower, event, age, sex)
+    assert cached_info.get_qualified_standards(slower, event, 150, sex) == []
+
+
+def test_qualified_standards_batch():
+    import numpy as np
+
+    timestandard = database.timestandard
+    info = timestandard.TimeStandardInfo()
+    rng = np.random.default_rng(0)
+    n = 2000
+    events = rng.integers(0, len(database.dutil.Event), n)
+    ages = rng.integers(-1, 102, n)
+    sexes = rng.integers(0, len(timestandard.SEXES), n)
+    times = rng.integers(1500, 120000, n)
+
+    fastest, masks = info.get_qualified_standards_batch(times, events, ages, sexes)
+    all_events = list(database.dutil.Event)
+    for i in range(n):
+        expected = info.get_qualified_standards(
+            database.stime.Time.from_hundredths(int(times[i])),
+            all_events[events[i]],
+            int(ages[i]),
+            timestandard.SEXES[sexes[i]],
+        )
+        assert timestandard.get_standards_from_mask(masks[i]) == expected
+        if len(expected) > 0:
+            assert fastest[i] == expected[-1].ordinal
+        else:
+            assert fastest[i] == timestandard.NO_STANDARD
+    assert masks.any()
+
+    fastest, masks = info.get_qualified_standards_batch([], [], [], [])
+    assert len(fastest) == 0 and len(masks) == 0
+
+
+def detached_copy(mr):
+    """
+    Return a copy of individual meet result mr that is not in a result store.
+    """
+    return type(mr)(
+        mr.get_meet(),
+        mr.get_organization(),
+        mr.get_team_code(),
+        mr.get_lsc(),
+        mr.get_session(),
+        mr.get_date_of_swim(),
+        mr.get_event(),
+        mr.get_event_min_age(),
+        mr.get_event_max_age(),
+        mr.get_event_number(),
+        mr.get_event_sex(),
+        mr.get_heat(),
+        mr.get_lane(),
+        mr.get_final_time(),
+        mr.get_swimmer_first_name(),
+        mr.get_swimmer_last_name(),
+        mr.get_swimmer_sex(),
+        mr.get_swimmer_usa_id_short(),
+        mr.get_swimmer_attach_status(),
+        mr.get_rank(),
+        mr.get_points(),
+        mr.get_seed_time(),
+        mr.get_seed_course(),
+        mr.get_event_min_time_class(),
+        mr.get_event_max_time_class(),
+        mr.get_swimmer_middle_initial(),
+        mr.get_swimmer_age_class(),
+        mr.get_swimmer_birthday(),
+        mr.get_swimmer_usa_id_long(),
+        mr.get_swimmer_citizenship(),
+        dict(mr.get_splits()),
+    )
+
+
+def test_result_store_matches_objects():
+    import tracemalloc
+    from tunas import parser
+    from tests.test_parser import MEET_DATA_PATH
+
+    db = parser.read_cl2(MEET_DATA_PATH)
+    results = parser.database.results
+    store = db.get_result_store()
+    assert len(store) == len(db.get_meet_results())
+
+    # Results are views of the store, and read the same values as a copy
+    for mr in db.get_meet_results()[:200]:
+        assert mr.store is store and mr.values is None
+        copy = detached_copy(mr)
+        assert copy.store is None
+        for field in results.FIELDS:
+            assert field.__get__(copy) == field.__get__(mr), field.name
+
+    # Writes go to the store
+    mr = db.get_meet_results()[0]
+    mr.set_heat(7)
+    assert store.column("heat")[mr.row] == 7 and mr.get_heat() == 7
+    mr.set_swimmer_age_class("12")
+    assert store.column("age_class")[mr.row] == 12
+
+    # Views take less than half the memory per result of detached results
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    copies = [detached_copy(mr) for mr in db.get_meet_results()]
+    detached_bytes = (tracemalloc.get_traced_memory()[0] - start) / len(copies)
+    copy_store = results.ResultStore()
+    for copy in copies:
+        copy_store.add(copy, None, None)
+    view_bytes = (tracemalloc.get_traced_memory()[0] - start) / len(copies)
+    tracemalloc.stop()
+    assert view_bytes * 2 < detached_bytes, (view_bytes, detached_bytes)
+    assert all(copy.store is copy_store for copy in copies)
+
+    # Vectorized bests match Swimmer.get_best_meet_result
+    for swimmer in db.get_swimmers():
+        expected = []
+        for event in results.EVENTS:
+            best = swimmer.get_best_meet_result(event)
+            if best is not None:
+                expected.append(best)
+        assert db.get_best_meet_results(swimmer) == expected
+        assert store.get_best_meet_results(swimmer) == store.get_meet_results(
+            store.best_rows(store.select(swimmer=swimmer))
+        )
+
+    # Rankings hold the best result of every swimmer in the event, fastest first
+    for event in results.EVENTS:
+        ranking = db.rank_event(event)
+        expected = [
+            s.get_best_meet_result(event)
+            for s in db.get_swimmers()
+            if s.get_best_meet_result(event) is not None
+        ]
+        assert sorted(ranking, key=id) == sorted(expected, key=id)
+        times = [mr.get_final_time() for mr in ranking]
+        assert times == sorted(times)
+
+    # Counts match counting the objects
+    event_counts = db.count_meet_results("event")
+    for i, event in enumerate(results.EVENTS):
+        num_results = sum(1 for mr in db.get_meet_results() if mr.get_event() == event)
+        assert event_counts[i] == num_results
+    assert sum(db.count_meet_results("swimmer")) == sum(
+        len(s.get_meet_results()) for s in db.get_swimmers()
+    )
@@ -0,0 +1,152 @@
+"""
+Tests for lineup.py
+"""
+
+import datetime
+import itertools
+import random
+
+from tunas import lineup
+
+database = lineup.database
+relaygen = lineup.relaygen
+
+
+def make_entry_candidates(rng, swimmers, num_entries, coverage=0.8):
+    entry_candidates = []
+    for _ in range(num_entries):
+        legs = []
+        for _ in range(4):
+            leg = [
+                (s, database.stime.Time.from_hundredths(rng.randint(2500, 4000)))
+                for s in swimmers
+                if rng.random() < coverage
+            ]
+            leg.sort(key=lambda x: x[1])
+            legs.append(leg)
+        entry_candidates.append(legs)
+    return entry_candidates
+
+
+def brute_force_key(entry_candidates, cap, exclusive_entries):
+    """
+    Return (empty relays, combined time) of the best single-relay-per-entry lineup.
+    """
+    options = []
+    for legs in entry_candidates:
+        leg_times = [{s: t.get_total_hundredths() for s, t in leg} for leg in legs]
+        entry_options = [((1, 0), ())]
+        for relay in itertools.product(*(list(times) for times in leg_times)):
+            if len(set(relay)) == 4:
+                time = sum(times[s] for times, s in zip(leg_times, relay))
+                entry_options.append(((0, time), relay))
+        options.append(entry_options)
+
+    best = None
+    for combination in itertools.product(*options):
+        counts = dict()
+        for _, relay in combination:
+            for s in relay:
+                counts[s] = counts.get(s, 0) + 1
+        if any(count > cap for count in counts.values()):
+            continue
+        if any(
+            set(combination[i][1]) & set(combination[j][1])
+            for i, j in exclusive_entries
+        ):
+            continue
+        key = (sum(k[0] for k, _ in combination), sum(k[1] for k, _ in combination))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def check_rules(result, cap, exclusive_entries):
+    counts = dict()
+    for entry_relays in result.relays:
+        for relay in entry_relays:
+            for s in relay:
+                counts[s] = counts.get(s, 0) + 1
+    assert all(count <= cap for count in counts.values())
+    for i, j in exclusive_entries:
+        swimmers_i = {s for relay in result.relays[i] for s in relay}
+        swimmers_j = {s for relay in result.relays[j] for s in relay}
+        assert not swimmers_i & swimmers_j
+
+
+def test_optimize_lineup_matches_brute_force():
+    rng = random.Random(0)
+    sex = database.sdif.Sex.FEMALE
+    entry = lineup.RelayEntry(database.dutil.Event.FREE_200_RELAY_SCY, sex, (1, 99), 1)
+    for _ in range(20):
+        swimmers = [
+            database.swim.Swimmer(f"Swimmer{i}", "Test", sex, None, None)
+            for i in range(rng.randint(4, 7))
+        ]
+        entry_candidates = make_entry_candidates(rng, swimmers, 2)
+        cap = rng.choice([0, 1, 2])
+        exclusive_entries = rng.choice([[], [(0, 1)]])
+        result = lineup.optimize_lineup(
+            [entry, entry],
+            entry_candidates,
+            lambda s: cap,
+            exclusive_entries,
+            time_budget=10.0,
+        )
+        assert result.optimal
+        check_rules(result, cap, exclusive_entries)
+        expected = brute_force_key(entry_candidates, cap, exclusive_entries)
+        assert (2 - result.num_filled, result.total_time.get_total_hundredths()) == (
+            expected
+        )
+
+
+def test_optimize_lineup_time_budget():
+    rng = random.Random(1)
+    sex = database.sdif.Sex.FEMALE
+    swimmers = [
+        database.swim.Swimmer(f"Swimmer{i}", "Test", sex, None, None)
+        for i in range(12)
+    ]
+    entry = lineup.RelayEntry(database.dutil.Event.FREE_200_RELAY_SCY, sex, (1, 99), 2)
+    result = lineup.optimize_lineup(
+        [entry] * 4,
+        make_entry_candidates(rng, swimmers, 4, coverage=1.0),
+        lambda s: 2,
+        [(0, 1)],
+        time_budget=1e-9,
+    )
+    # The greedy lineup is returned when the budget runs out straight away
+    assert not result.optimal
+    assert result.nodes == 0
+    check_rules(result, 2, [(0, 1)])
+
+
+def test_lineup_optimizer():
+    from tunas import parser
+    from tests.test_parser import MEET_DATA_PATH
+
+    db = parser.read_cl2(MEET_DATA_PATH)
+    club = max(db.get_clubs(), key=lambda c: len(c.get_swimmers()))
+    sex = database.sdif.Sex.FEMALE
+    entries = [
+        lineup.RelayEntry(database.dutil.Event.FREE_200_RELAY_SCY, sex, (1, 99), 2),
+        lineup.RelayEntry(database.dutil.Event.MEDLEY_200_RELAY_SCY, sex, (1, 99), 2),
+        lineup.RelayEntry(database.dutil.Event.FREE_400_RELAY_SCY, sex, (1, 99), 1),
+    ]
+    optimizer = lineup.LineupOptimizer(
+        db,
+        club,
+        entries,
+        datetime.date(2025, 6, 8),
+        max_relays_per_swimmer=2,
+        exclusive_entries=[(0, 1)],
+    )
+    result = optimizer.optimize()
+    check_rules(result, 2, [(0, 1)])
+    assert len(result.relays) == len(entries)
+    for entry, entry_relays in zip(entries, result.relays):
+        assert len(entry_relays) == entry.num_relays
+        for relay in entry_relays:
+            if relay:
+                assert all(s.get_sex() == sex for s in relay)
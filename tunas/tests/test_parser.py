@@ -0,0 +1,188 @@
+"""
+Tests for parser.py
+"""
+
+import contextlib
+import os
+import zipfile
+
+from tunas import parser
+
+MEET_DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "data", "meetData"
+)
+
+
+def describe_database(db) -> list:
+    """
+    Return a comparable description of every club, swimmer, and meet in db.
+    """
+
+    def club_key(club):
+        if club is None:
+            return None
+        return (club.get_team_code(), club.get_lsc())
+
+    description = []
+    for c in db.get_clubs():
+        description.append(
+            (
+                club_key(c),
+                c.get_full_name(),
+                c.get_city(),
+                [s.get_full_name() for s in c.get_swimmers()],
+                len(c.get_meets()),
+                len(c.get_meet_results()),
+            )
+        )
+    for s in db.get_swimmers():
+        description.append(
+            (
+                s.get_full_name(),
+                s.get_usa_id_short(),
+                s.get_usa_id_long(),
+                s.get_birthday(),
+                s.get_preferred_first_name(),
+                club_key(s.get_club()),
+                [
+                    (
+                        mr.get_event(),
+                        mr.get_final_time(),
+                        mr.get_session(),
+                        mr.get_date_of_swim(),
+                        mr.get_meet().get_name(),
+                    )
+                    for mr in s.get_meet_results()
+                ],
+            )
+        )
+    for m in db.get_meets():
+        description.append((m.get_name(), m.get_start_date(), len(m.get_meet_results())))
+    return description
+
+
+def test_read_cl2_parallel_matches_serial():
+    serial_db = parser.read_cl2(MEET_DATA_PATH)
+    parallel_db = parser.read_cl2(MEET_DATA_PATH, workers=3)
+
+    assert len(serial_db.get_meet_results()) > 0
+    assert len(parallel_db.get_meet_results()) == len(serial_db.get_meet_results())
+    assert describe_database(parallel_db) == describe_database(serial_db)
+
+
+class StreamOnlyFile:
+    """
+    Wrapper of a binary file that fails if the whole file is read at once.
+    """
+
+    def __init__(self, file):
+        self.file = file
+
+    def __iter__(self):
+        return iter(self.file)
+
+    def read(self, size=-1):
+        assert size is not None and size >= 0, "whole file read"
+        return self.file.read(size)
+
+
+def test_cl2_files_are_streamed_once(monkeypatch):
+    import parser as database_parser  # Module imported by Database.ingest_file
+
+    opens = []
+
+    def stream_only_open_cl2(open_cl2):
+        @contextlib.contextmanager
+        def wrapper(path, member=None):
+            opens.append((path, member))
+            with open_cl2(path, member) as file:
+                yield StreamOnlyFile(file)
+
+        return wrapper
+
+    for module in {parser, database_parser}:
+        monkeypatch.setattr(module, "open_cl2", stream_only_open_cl2(module.open_cl2))
+    sources = parser.find_cl2_sources(MEET_DATA_PATH)
+    expected_opens = sorted(tuple(source) for source in sources)
+
+    # Serial loads and incremental ingests open each file once and stream it
+    db = parser.read_cl2(MEET_DATA_PATH)
+    assert sorted(opens) == expected_opens
+    opens.clear()
+    ingest_db = parser.database.Database()
+    assert ingest_db.ingest_directory(MEET_DATA_PATH) == len(sources)
+    assert sorted(opens) == expected_opens
+    assert ingest_db.get_ingested_files() == db.get_ingested_files()
+
+    # Workers hash lines as they parse them, and get the same hashes and records
+    for source in sources:
+        opens.clear()
+        file_hash, records = parser.read_records(source)
+        assert len(opens) == 1
+        assert db.get_ingested_files()[file_hash] == str(source)
+        assert records == list(parser.iter_records(*source))
+
+
+def test_encoded_records_are_plain_values():
+    plain_types = (int, float, str, bool, type(None))
+    for source in parser.find_cl2_sources(MEET_DATA_PATH):
+        file_hash, records = parser.read_records(source)
+        partial_source, partial_hash, rows = parser.read_partial(source)
+        assert (partial_source, partial_hash) == (source, file_hash)
+        for record, row in zip(records, rows, strict=True):
+            assert all(type(value) in plain_types for value in row)
+            assert parser.decode_record(row) == record
+
+
+def test_parse_d3():
+    line = b"D3ABCDEFGH123456Jimmy          "
+    record = parser.parse_d3(line)
+    assert record == parser.D3Record("ABCDEFGH123456", "Jimmy")
+
+
+def test_ingest_matches_read_cl2(tmp_path):
+    full_db = parser.read_cl2(MEET_DATA_PATH)
+    cl2_paths = parser.find_meet_data_files(MEET_DATA_PATH)
+    assert len(full_db.get_ingested_files()) == len(cl2_paths)
+
+    # Ingest first file, then the whole directory; only the remaining files are new
+    db = parser.database.Database()
+    assert db.ingest_file(cl2_paths[0]) == 1
+    assert db.ingest_directory(MEET_DATA_PATH) == len(cl2_paths) - 1
+    assert describe_database(db) == describe_database(full_db)
+
+    # Same content under a different path is skipped
+    copy_path = tmp_path / "copy.cl2"
+    copy_path.write_bytes(open(cl2_paths[0], "rb").read())
+    assert db.ingest_file(str(copy_path)) == 0
+    assert db.ingest_directory(MEET_DATA_PATH) == 0
+    assert describe_database(db) == describe_database(full_db)
+
+
+def test_iter_records():
+    path = parser.find_meet_data_files(MEET_DATA_PATH)[0]
+    records = parser.iter_records(path)
+    assert not isinstance(records, list)
+
+    first = next(records)
+    assert isinstance(first, parser.B1Record)
+    assert type(first.name) == str and first.name != ""
+
+    rest = list(records)
+    assert isinstance(rest[-1], parser.Z0Record)
+    assert any(isinstance(r, parser.D0Record) for r in rest)
+
+
+def test_read_cl2_from_zip(tmp_path):
+    cl2_paths = parser.find_meet_data_files(MEET_DATA_PATH)
+    with zipfile.ZipFile(tmp_path / "results.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, path in enumerate(cl2_paths):
+            archive.write(path, f"meet-{i}/{os.path.basename(path)}")
+    (tmp_path / "corrupt.zip").write_bytes(b"not a zip file")
+
+    zip_db = parser.read_cl2(str(tmp_path))
+    full_db = parser.read_cl2(MEET_DATA_PATH)
+    assert describe_database(zip_db) == describe_database(full_db)
+
+    # Extracted copies of the archive members are recognized by content
+    assert zip_db.ingest_directory(MEET_DATA_PATH) == 0
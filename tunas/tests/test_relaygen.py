@@ -0,0 +1,224 @@
+"""
+Tests for relaygen.py
+"""
+
+import datetime
+import gc
+import itertools
+import random
+import weakref
+
+from tunas import relaygen
+
+database = relaygen.database
+
+
+def make_leg_candidates(rng, num_swimmers, coverage=0.7, mixed=False):
+    sexes = [database.sdif.Sex.FEMALE]
+    if mixed:
+        sexes.append(database.sdif.Sex.MALE)
+    swimmers = [
+        database.swim.Swimmer(f"Swimmer{i}", "Test", rng.choice(sexes), None, None)
+        for i in range(num_swimmers)
+    ]
+    leg_candidates = []
+    for _ in range(4):
+        candidates = [
+            (s, database.stime.Time.from_hundredths(rng.randint(2500, 4000)))
+            for s in swimmers
+            if rng.random() < coverage
+        ]
+        candidates.sort(key=lambda x: x[1])
+        leg_candidates.append(candidates)
+    return leg_candidates
+
+
+def brute_force_relay_times(leg_candidates, num_relays, objective, mixed=False):
+    """
+    Return best relay times (fastest first) over every possible lineup of num_relays
+    full relays, or None if they cannot all be filled. Mixed relays must have two
+    male swimmers.
+    """
+    leg_times = [
+        {s: t.get_total_hundredths() for s, t in candidates}
+        for candidates in leg_candidates
+    ]
+    swimmers = list({s: None for candidates in leg_candidates for s, _ in candidates})
+    best = None
+    for lineup in itertools.permutations(swimmers, 4 * num_relays):
+        relay_times = []
+        for r in range(num_relays):
+            legs = lineup[4 * r : 4 * r + 4]
+            if any(s not in leg_times[l] for l, s in enumerate(legs)):
+                break
+            if mixed and sum(s.get_sex() == database.sdif.Sex.MALE for s in legs) != 2:
+                break
+            relay_times.append(sum(leg_times[l][s] for l, s in enumerate(legs)))
+        else:
+            relay_times.sort()
+            if objective == relaygen.RelayObjective.TOTAL_TIME:
+                key = (sum(relay_times),)
+            else:
+                key = tuple(relay_times)
+            if best is None or key < best[0]:
+                best = (key, relay_times)
+    return None if best is None else best[1]
+
+
+def test_min_cost_assignment():
+    costs = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+    assignment = relaygen.min_cost_assignment(costs)
+    assert sorted(assignment) == [0, 1, 2]
+    assert sum(costs[i][j] for i, j in enumerate(assignment)) == 5
+
+
+def check_matches_brute_force(solve, mixed):
+    rng = random.Random(0)
+    for _ in range(50):
+        leg_candidates = make_leg_candidates(rng, rng.randint(4, 8), mixed=mixed)
+        for objective in [
+            relaygen.RelayObjective.TOTAL_TIME,
+            relaygen.RelayObjective.A_FIRST,
+        ]:
+            relays = solve(leg_candidates, 2, objective)
+            assert len(relays) == 2
+            full_relays = [relay for relay in relays if relay]
+            leg_times = [dict(candidates) for candidates in leg_candidates]
+            relay_times = [
+                sum(leg_times[l][s].get_total_hundredths() for l, s in enumerate(relay))
+                for relay in full_relays
+            ]
+
+            expected = None
+            for num_relays in [2, 1]:
+                expected = brute_force_relay_times(
+                    leg_candidates, num_relays, objective, mixed
+                )
+                if expected is not None:
+                    break
+            if expected is None:
+                assert full_relays == []
+            elif objective == relaygen.RelayObjective.TOTAL_TIME:
+                assert sum(relay_times) == sum(expected)
+            else:
+                assert relay_times == expected
+            assert relay_times == sorted(relay_times)
+            assert len({s for relay in full_relays for s in relay}) == 4 * len(
+                full_relays
+            )
+            if mixed:
+                for relay in full_relays:
+                    sexes = [s.get_sex() for s in relay]
+                    assert sexes.count(database.sdif.Sex.MALE) == 2
+
+
+def test_solve_relays_matches_brute_force():
+    check_matches_brute_force(relaygen.solve_relays, mixed=False)
+
+
+def test_solve_mixed_relays_matches_brute_force():
+    check_matches_brute_force(relaygen.solve_mixed_relays, mixed=True)
+
+
+def test_exact_relays_never_slower_than_greedy():
+    from tunas import parser
+    from tests.test_parser import MEET_DATA_PATH
+
+    db = parser.read_cl2(MEET_DATA_PATH)
+    club = max(db.get_clubs(), key=lambda c: len(c.get_swimmers()))
+    generator = relaygen.RelayGenerator(
+        db, club, datetime.date(2025, 6, 8), num_relays=3, age_range=(1, 99)
+    )
+    events = [
+        database.dutil.Event.MEDLEY_200_RELAY_SCY,
+        database.dutil.Event.FREE_200_RELAY_LCM,
+    ]
+    sexes = [database.sdif.Sex.FEMALE, database.sdif.Sex.MIXED]
+    for event, sex in itertools.product(events, sexes):
+        generator.set_course(event.get_course())
+        generator.set_sex(sex)
+        results = dict()
+        for objective in relaygen.RelayObjective:
+            generator.set_objective(objective)
+            relays = generator.generate_relays(event)
+            results[objective] = [
+                relaygen.get_relay_time(relay, event).get_total_hundredths()
+                for relay in relays
+                if relay
+            ]
+        greedy = results[relaygen.RelayObjective.GREEDY]
+        total = results[relaygen.RelayObjective.TOTAL_TIME]
+        a_first = results[relaygen.RelayObjective.A_FIRST]
+        assert len(total) >= len(greedy) and len(a_first) >= len(greedy)
+        if len(total) == len(greedy):
+            assert sum(total) <= sum(greedy)
+        if len(a_first) == len(greedy):
+            assert a_first <= greedy
+
+
+def test_candidate_pools_are_cached():
+    from tunas import parser
+    from tests.test_parser import MEET_DATA_PATH
+
+    db = parser.read_cl2(MEET_DATA_PATH)
+    club = max(db.get_clubs(), key=lambda c: len(c.get_swimmers()))
+    relay_date = datetime.date(2025, 6, 8)
+    event = database.dutil.Event.MEDLEY_200_RELAY_SCY
+    generator = relaygen.RelayGenerator(
+        db, club, relay_date, course=event.get_course(), age_range=(1, 99)
+    )
+    key = (generator.get_sex(), relay_date, (1, 99), db.get_data_version())
+    leg_candidates = generator.get_leg_candidates(event)
+    pool = relaygen.CANDIDATE_POOLS.get_pool(club, key)
+    assert pool.lock is relaygen.CANDIDATE_POOLS.lock
+    for leg, leg_event in zip(leg_candidates, relaygen.get_relay_leg_events(event)):
+        times, indices = pool.get_leg(leg_event)
+        assert pool.get_leg(leg_event)[0] is times
+        assert [t.get_total_hundredths() for _, t in leg] == times.tolist()
+        assert [s for s, _ in leg] == [pool.swimmers[i] for i in indices]
+        assert times.tolist() == sorted(times.tolist())
+
+    # Exclusions are filtered out of the cached pool
+    fastest = leg_candidates[0][0][0]
+    generator.exclude_swimmer(fastest)
+    excluded_candidates = generator.get_leg_candidates(event)
+    assert relaygen.CANDIDATE_POOLS.get_pool(club, key) is pool
+    for leg, excluded_leg in zip(leg_candidates, excluded_candidates):
+        assert excluded_leg == [c for c in leg if c[0] != fastest]
+    generator.include_swimmer(fastest)
+    assert generator.get_leg_candidates(event) == leg_candidates
+
+    # Changing the database invalidates the pool
+    db.set_meets(db.get_meets())
+    assert db.get_data_version() != key[3]
+    assert generator.get_leg_candidates(event) == leg_candidates
+    new_key = key[:3] + (db.get_data_version(),)
+    assert relaygen.CANDIDATE_POOLS.get_pool(club, new_key) is not pool
+
+
+def test_candidate_pool_cache_is_bounded():
+    from tunas import parser
+    from tests.test_parser import MEET_DATA_PATH
+
+    cache = relaygen.CandidatePoolCache(max_pools=2)
+    db = parser.read_cl2(MEET_DATA_PATH)
+    club = max(db.get_clubs(), key=lambda c: len(c.get_swimmers()))
+    key = (database.sdif.Sex.FEMALE, datetime.date(2025, 6, 8), (1, 99), 0)
+    pool = cache.get_pool(club, key)
+    assert cache.get_pool(club, key) is pool
+
+    # Loading the same club again replaces its pool, and the old club is freed
+    other_db = parser.read_cl2(MEET_DATA_PATH)
+    other_club = other_db.find_club(club.get_team_code())
+    other_pool = cache.get_pool(other_club, key)
+    assert other_pool is not pool and len(cache) == 1
+    club_ref = weakref.ref(club)
+    del db, club, pool
+    gc.collect()
+    assert club_ref() is None
+
+    # Least recently used pools are evicted
+    cache.get_pool(other_club, key[:2] + ((1, 10),) + key[3:])
+    cache.get_pool(other_club, key[:2] + ((11, 12),) + key[3:])
+    assert len(cache) == 2
+    assert cache.get_pool(other_club, key) is not other_pool
@@ -0,0 +1,47 @@
+"""
+Tests for snapshot.py
+"""
+
+import os
+
+from tunas import snapshot
+from tests.test_parser import MEET_DATA_PATH, describe_database
+
+
+def test_snapshot_round_trip(tmp_path):
+    snapshot_path = os.path.join(tmp_path, "database.snapshot")
+
+    # First load parses the data and writes a snapshot
+    db = snapshot.load_database(MEET_DATA_PATH, snapshot_path)
+    assert os.path.isfile(snapshot_path)
+    assert os.listdir(tmp_path) == ["database.snapshot"]
+
+    # Second load comes from the snapshot
+    manifest = snapshot.build_manifest(MEET_DATA_PATH)
+    loaded_db = snapshot.load_snapshot(snapshot_path, manifest)
+    assert loaded_db is not None
+    assert describe_database(loaded_db) == describe_database(db)
+    assert loaded_db.get_time_standard_info() is not None
+
+    # Identity indexes survive the round trip
+    swimmer = next(s for s in loaded_db.get_swimmers() if s.get_usa_id_short())
+    assert loaded_db.find_swimmer_with_short_id(swimmer.get_usa_id_short()) is swimmer
+
+
+def test_snapshot_rejects_stale_or_corrupt_file(tmp_path):
+    snapshot_path = os.path.join(tmp_path, "database.snapshot")
+    manifest = snapshot.build_manifest(MEET_DATA_PATH)
+    assert snapshot.load_snapshot(snapshot_path, manifest) is None
+
+    # Stale manifest
+    snapshot.save_snapshot(snapshot.database.Database(), manifest, snapshot_path)
+    stale_manifest = dict(manifest, meet_data_files=manifest["meet_data_files"][1:])
+    assert snapshot.load_snapshot(snapshot_path, manifest) is not None
+    assert snapshot.load_snapshot(snapshot_path, stale_manifest) is None
+
+    # Truncated file
+    with open(snapshot_path, "rb") as file:
+        data = file.read()
+    with open(snapshot_path, "wb") as file:
+        file.write(data[: len(data) // 2])
+    assert snapshot.load_snapshot(snapshot_path, manifest) is None
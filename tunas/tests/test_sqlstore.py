@@ -0,0 +1,71 @@
+"""
+Tests for database/sqlstore.py
+"""
+
+import os
+import datetime
+
+from tunas import parser, snapshot
+from tests.test_parser import MEET_DATA_PATH
+
+
+def describe_club(club) -> list:
+    """
+    Return a comparable description of club, its roster, and their results.
+    """
+    description = [(club.get_team_code(), club.get_lsc(), club.get_full_name())]
+    description.append([m.get_name() for m in club.get_meets()])
+    for s in club.get_swimmers():
+        description.append(
+            (
+                s.get_full_name(),
+                s.get_usa_id_long(),
+                s.get_birthday(),
+                s.get_age_range(datetime.date(2025, 6, 8)),
+                [
+                    (
+                        mr.get_event(),
+                        mr.get_final_time(),
+                        mr.get_session(),
+                        mr.get_date_of_swim(),
+                        mr.get_meet().get_name(),
+                        mr.get_rank(),
+                        mr.get_swimmer_age_class(),
+                    )
+                    for mr in s.get_meet_results()
+                ],
+            )
+        )
+    return description
+
+
+def test_sqlite_database_matches_memory(tmp_path):
+    db = parser.read_cl2(MEET_DATA_PATH)
+    sqlite_path = os.path.join(tmp_path, "database.sqlite3")
+    manifest = snapshot.build_manifest(MEET_DATA_PATH)
+    parser.database.sqlstore.write_sqlite(db, sqlite_path, manifest)
+    assert parser.database.sqlstore.read_manifest(sqlite_path) is not None
+
+    sqlite_db = parser.database.sqlstore.SqliteDatabase(sqlite_path)
+    assert sqlite_db.get_num_clubs() == db.get_num_clubs()
+    assert sqlite_db.get_num_swimmers() == db.get_num_swimmers()
+    assert sqlite_db.get_num_meets() == db.get_num_meets()
+    assert sqlite_db.get_num_meet_results() == db.get_num_meet_results()
+
+    for club in db.get_clubs()[:5]:
+        code = f"{club.get_lsc().value}-{club.get_team_code()}"
+        assert describe_club(sqlite_db.find_club(code)) == describe_club(club)
+    assert sqlite_db.find_club("NONE") is None
+
+    swimmer = db.get_swimmers()[0]
+    for found in [
+        sqlite_db.find_swimmer_with_short_id(swimmer.get_usa_id_short()),
+        sqlite_db.find_swimmer_with_long_id(swimmer.get_usa_id_long()),
+    ]:
+        assert found.get_full_name() == swimmer.get_full_name()
+        assert found.get_club().get_full_name() == swimmer.get_club().get_full_name()
+        event = swimmer.get_meet_results()[0].get_event()
+        assert found.get_best_meet_result(event).get_final_time() == (
+            swimmer.get_best_meet_result(event).get_final_time()
+        )
+    sqlite_db.close()
@@ -16,6 +16,7 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('-u', action='store_true', help="download meet result files from pacswim")
     parser.add_argument('-r', action='store_true', help="run tunas application")
+    parser.add_argument('-x', action='store_true', help="extract downloaded zip files")
     args = parser.parse_args()
 
     # If no flags, download meet results and run application
@@ -26,7 +27,7 @@ def main():
 
     # If -u flag is specified, download meet result data
     if args.u:
-        scraper.download_meet_result_data(MEET_DATA_PATH)
+        scraper.download_meet_result_data(MEET_DATA_PATH, extract=args.x)
     
     # If -r flag is specified or no flags specified, run tunas application
     if args.r:
@@ -2,8 +2,9 @@
 Database backend for tunas application.
 """
 
-from . import swim, dutil, timestandard, sdif, stime
+from . import swim, dutil, timestandard, sdif, stime, sqlstore, results
 from typing import Optional
+import os
 import datetime
 
 
@@ -14,32 +15,123 @@ class Database:
 
     def __init__(
         self,
-        clubs: list[swim.Club] = [],
-        swimmers: list[swim.Swimmer] = [],
-        meets: list[swim.Meet] = [],
-        meet_results: list[swim.MeetResult] = [],
+        clubs: Optional[list[swim.Club]] = None,
+        swimmers: Optional[list[swim.Swimmer]] = None,
+        meets: Optional[list[swim.Meet]] = None,
+        meet_results: Optional[list[swim.MeetResult]] = None,
     ) -> None:
+        # Default to fresh lists so separate databases never share storage
+        clubs = [] if clubs is None else clubs
+        swimmers = [] if swimmers is None else swimmers
+        meets = [] if meets is None else meets
+        meet_results = [] if meet_results is None else meet_results
+
+        # Bumped on every change to the stored data (see get_data_version)
+        self.data_version = 0
         self.set_clubs(clubs)
         self.set_swimmers(swimmers)
         self.set_meets(meets)
         self.set_meet_results(meet_results)
         self.time_standard_info = timestandard.TimeStandardInfo()
 
+        # Content hash -> path of every cl2 file loaded into the database
+        self.ingested_files: dict[str, str] = dict()
+
+    def ingest_file(self, path: str) -> int:
+        """
+        Load cl2 file at path into the database, linking its meets, clubs, swimmers,
+        and results to the existing objects. If path is a zip archive, its cl2
+        members are loaded. Files are tracked by content hash, so a cl2 file that was
+        already ingested (under any path or archive) is skipped. Return the number of
+        newly ingested cl2 files.
+        """
+        import parser  # Imported here since parser depends on this package
+
+        num_ingested = 0
+        for source in parser.list_cl2_sources(path):
+            file_hash, records = parser.read_records(source)
+            if self.has_ingested_file(file_hash):
+                continue
+            parser.Cl2Processor(self).process_records(records)
+            self.add_ingested_file(file_hash, str(source))
+            num_ingested += 1
+        return num_ingested
+
+    def ingest_directory(self, path: str) -> int:
+        """
+        Ingest every cl2 file and zip archive in directory path (see ingest_file).
+        Return the number of newly ingested cl2 files.
+        """
+        import parser  # Imported here since parser depends on this package
+
+        assert os.path.isdir(path)
+        num_ingested = 0
+        for file_path in parser.find_meet_data_files(path):
+            num_ingested += self.ingest_file(file_path)
+        return num_ingested
+
+    def has_ingested_file(self, file_hash: str) -> bool:
+        return file_hash in self.ingested_files
+
+    def add_ingested_file(self, file_hash: str, path: str) -> None:
+        assert type(file_hash) == str and type(path) == str
+        self.ingested_files[file_hash] = path
+
+    def get_ingested_files(self) -> dict[str, str]:
+        return self.ingested_files
+
+    def get_data_version(self) -> int:
+        """
+        Return a number that changes whenever clubs, swimmers, meets, or meet results
+        are added or replaced, so derived data can be cached against it.
+        """
+        return self.data_version
+
     def add_club(self, club: swim.Club) -> None:
         assert type(club) == swim.Club
         self.clubs.append(club)
+        self.data_version += 1
+        self.index_club(club)
 
     def add_swimmer(self, swimmer: swim.Swimmer) -> None:
         assert type(swimmer) == swim.Swimmer
         self.swimmers.append(swimmer)
+        self.data_version += 1
+        self.swimmer_index.add(swimmer)
 
     def add_meet(self, meet: swim.Meet) -> None:
         assert type(meet) == swim.Meet
         self.meets.append(meet)
+        self.data_version += 1
 
-    def add_meet_result(self, meet_result: swim.MeetResult) -> None:
+    def add_meet_result(
+        self, meet_result: swim.MeetResult, swimmer: Optional[swim.Swimmer] = None
+    ) -> None:
+        """
+        Add meet result to the database. Individual results are also added to the
+        result store, attributed to swimmer.
+        """
         assert isinstance(meet_result, swim.MeetResult)
         self.meet_results.append(meet_result)
+        self.store_meet_result(meet_result, swimmer)
+        self.data_version += 1
+
+    def store_meet_result(
+        self, meet_result: swim.MeetResult, swimmer: Optional[swim.Swimmer]
+    ) -> None:
+        """
+        Add individual meet result to the result store, which makes the result a view
+        of its row. The club is looked up from the team code and lsc the result was
+        swum for.
+        """
+        if not isinstance(meet_result, swim.IndividualMeetResult):
+            return
+        club = None
+        if meet_result.get_team_code() != None:
+            club = self.find_club_with_lsc(
+                meet_result.get_team_code(), meet_result.get_lsc()
+            )
+        self.result_store.add(meet_result, swimmer, club)
 
     def get_clubs(self) -> list[swim.Club]:
         return self.clubs
@@ -53,6 +145,49 @@ class Database:
     def get_meet_results(self) -> list[swim.MeetResult]:
         return self.meet_results
 
+    def get_num_clubs(self) -> int:
+        return len(self.clubs)
+
+    def get_num_swimmers(self) -> int:
+        return len(self.swimmers)
+
+    def get_num_meets(self) -> int:
+        return len(self.meets)
+
+    def get_num_meet_results(self) -> int:
+        return len(self.meet_results)
+
+    def get_result_store(self) -> results.ResultStore:
+        return self.result_store
+
+    def get_best_meet_results(
+        self, swimmer: swim.Swimmer
+    ) -> list[swim.IndividualMeetResult]:
+        """
+        Return swimmer's fastest result in every event they swam, in event order.
+        """
+        return self.result_store.get_best_meet_results(swimmer)
+
+    def rank_event(
+        self,
+        event: dutil.Event,
+        club: Optional[swim.Club] = None,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
+    ) -> list[swim.IndividualMeetResult]:
+        """
+        Return the best result of every swimmer in event (optionally only results swum
+        for club or within a date range), fastest first.
+        """
+        return self.result_store.rank_event(event, club, start_date, end_date)
+
+    def count_meet_results(self, column: str) -> list[int]:
+        """
+        Return number of individual results per value of column (see
+        results.ResultStore.count).
+        """
+        return self.result_store.count(column).tolist()
+
     def get_time_standard_info(self) -> timestandard.TimeStandardInfo:
         return self.time_standard_info
 
@@ -61,18 +196,45 @@ class Database:
         for c in clubs:
             assert type(c) == swim.Club
         self.clubs = clubs
+        self.data_version += 1
+
+        # Rebuild club indexes
+        self.clubs_by_key: dict[tuple[Optional[sdif.LSC], str], swim.Club] = dict()
+        self.clubs_by_team_code: dict[str, list[swim.Club]] = dict()
+        for c in clubs:
+            self.index_club(c)
+
+    def index_club(self, club: swim.Club) -> None:
+        """
+        Add club to the club indexes. Clubs are keyed by the lsc and team code they
+        have when they are added. If several clubs share a key, lookups return the
+        one that was added first.
+        """
+        key = (club.get_lsc(), club.get_team_code())
+        if key not in self.clubs_by_key:
+            self.clubs_by_key[key] = club
+        self.clubs_by_team_code.setdefault(club.get_team_code(), []).append(club)
 
     def set_swimmers(self, swimmers: list[swim.Swimmer]) -> None:
         assert type(swimmers) == list
         for s in swimmers:
             assert type(s) == swim.Swimmer
         self.swimmers = swimmers
+        self.data_version += 1
+
+        # Rebuild swimmer identity index
+        if hasattr(self, "swimmer_index"):
+            self.swimmer_index.clear()
+        self.swimmer_index = swim.SwimmerIndex()
+        for s in swimmers:
+            self.swimmer_index.add(s)
 
     def set_meets(self, meets: list[swim.Meet]) -> None:
         assert type(meets) == list
         for m in meets:
             assert type(m) == swim.Meet
         self.meets = meets
+        self.data_version += 1
 
     def set_meet_results(self, meet_results: list[swim.MeetResult]) -> None:
         assert type(meet_results) == list
@@ -80,25 +242,30 @@ class Database:
             assert isinstance(mr, swim.MeetResult)
         self.meet_results = meet_results
 
+        # Rebuild result store, attributing results to the swimmers that hold them
+        owners: dict[int, swim.Swimmer] = dict()
+        for s in self.swimmers:
+            for mr in s.get_meet_results():
+                owners[id(mr)] = s
+        self.result_store = results.ResultStore()
+        for mr in meet_results:
+            self.store_meet_result(mr, owners.get(id(mr)))
+        self.data_version += 1
+
     def find_swimmer_with_short_id(self, short_id: str) -> swim.Swimmer | None:
         """
         Find swimmer in database who has id equal to short_id. Short id should
         be in the new usa swimming id format.
         """
         assert len(short_id) == 12
-        for s in self.get_swimmers():
-            if s.get_usa_id_short() == short_id:
-                return s
+        return self.swimmer_index.find_with_short_id(short_id)
 
     def find_swimmer_with_long_id(self, long_id: str) -> swim.Swimmer | None:
         """
-        Find swimmer in database who has id equal to short_id. Short id should
-        be in the new usa swimming id format.
+        Find swimmer in database who has long id (14 characters) equal to long_id.
         """
         assert len(long_id) == 14
-        for s in self.get_swimmers():
-            if s.get_usa_id_long() == long_id:
-                return s
+        return self.swimmer_index.find_with_long_id(long_id)
 
     def find_swimmer_with_birthday(
         self,
@@ -107,29 +274,42 @@ class Database:
         last_name: str,
         birthday: datetime.date,
     ) -> Optional[swim.Swimmer]:
-        old_id = dutil.generate_old_id(first_name, middle_initial, last_name, birthday)
-        for swimmer in self.get_swimmers():
-            swimmer_birthday = swimmer.get_birthday()
-            if swimmer_birthday is None or swimmer_birthday != birthday:
-                continue
-            swimmer_first_name = swimmer.get_first_name()
-            swimmer_last_name = swimmer.get_last_name()
-            swimmer_middle_initial = swimmer.get_middle_initial()
-
-            # Find swimmer by generating old ids and comparing hamming distance
-            swimmer_id = dutil.generate_old_id(
-                swimmer_first_name,
-                swimmer_middle_initial,
-                swimmer_last_name,
-                swimmer_birthday,
-            )
-            if dutil.hamming_distance(swimmer_id, old_id) <= 1:
-                return swimmer
-        return None
+        """
+        Find swimmer with the given birthday whose old id is within hamming distance
+        1 of the old id generated from the given name. Uses the swimmer index, so
+        the lookup does not depend on the number of swimmers.
+        """
+        return self.swimmer_index.find_with_birthday(
+            first_name, middle_initial, last_name, birthday
+        )
 
     def find_club(self, club_code: str) -> Optional[swim.Club]:
-        assert type(club_code) == str and len(club_code) <= 4
-        for c in self.get_clubs():
-            if c.get_team_code() == club_code:
-                return c
-        return None
+        """
+        Find club with club_code, which is either a team code (ex. 'SCSC') or a team
+        code qualified by its lsc (ex. 'PC-SCSC'). If a team code is used by clubs in
+        several lscs, an unqualified code returns the club that was added first.
+        """
+        assert type(club_code) == str
+        if "-" in club_code:
+            lsc_code, team_code = club_code.split("-", 1)
+            if lsc_code not in sdif.LSC:
+                return None
+            return self.find_club_with_lsc(team_code, sdif.LSC(lsc_code))
+        clubs = self.find_clubs_with_team_code(club_code)
+        if len(clubs) == 0:
+            return None
+        return clubs[0]
+
+    def find_club_with_lsc(
+        self, team_code: str, lsc: Optional[sdif.LSC]
+    ) -> Optional[swim.Club]:
+        """
+        Find club with the given team code and lsc.
+        """
+        return self.clubs_by_key.get((lsc, team_code))
+
+    def find_clubs_with_team_code(self, team_code: str) -> list[swim.Club]:
+        """
+        Return all clubs with the given team code, in the order they were added.
+        """
+        return list(self.clubs_by_team_code.get(team_code, []))
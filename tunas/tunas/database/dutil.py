@@ -103,16 +103,17 @@ class Event(enum.Enum):
         return f"{event_basic: <10}  {self.get_course()}"
 
     def __eq__(self, value: Event) -> bool:
-        return self.name == value.name
+        return self is value or self.name == getattr(value, "name", None)
 
     def __lt__(self, value: Event) -> bool:
-        self_index = list(Event.__members__).index(self.name)
-        value_index = list(Event.__members__).index(value.name)
-        return self_index < value_index
+        return self.ordinal < value.ordinal
 
     def __gt__(self, value: Event) -> bool:
         return value < self
 
+    def __hash__(self) -> int:
+        return self.ordinal
+
     def get_distance(self) -> int:
         """
         Return distance of event.
@@ -132,6 +133,12 @@ class Event(enum.Enum):
         return self.value[2]
 
 
+# Position of every member in definition order. Used for comparisons and hashing, and
+# as a small integer code for array indexes and sort keys.
+for _ordinal, _event in enumerate(Event):
+    _event.ordinal = _ordinal
+
+
 class AgeGroup(enum.Enum):
     """
     Represent an age group. Every age group corresponds to an age range.
@@ -0,0 +1,439 @@
+"""
+Columnar storage of individual meet results.
+
+Every field of a meet result is declared in swim.py as one of the descriptors below.
+A result that has not been added to a ResultStore keeps its values in a plain list;
+once added, the result becomes a view of one row of the store and every read and
+write goes through the store's numpy columns, so result data is stored once.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, NamedTuple, Optional
+import datetime
+import types
+
+import numpy as np
+
+from . import dutil, sdif, stime
+
+# Events and sessions are stored as their position in the enum
+EVENTS = list(dutil.Event)
+EVENT_CODES = {e: i for i, e in enumerate(EVENTS)}
+SESSIONS = list(sdif.Session)
+
+# Sentinel for missing integers, and for missing enum members in uint8 columns
+NO_VALUE = -1
+NO_MEMBER = 255
+
+# Splits of results without splits
+EMPTY_SPLITS = types.MappingProxyType({})
+
+
+class Column(NamedTuple):
+    dtype: type
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+
+
+def optional_int_column(dtype: type) -> Column:
+    return Column(
+        dtype,
+        lambda value: NO_VALUE if value is None else value,
+        lambda raw: None if raw == NO_VALUE else raw,
+    )
+
+
+def enum_column(enum_type: type) -> Column:
+    members = list(enum_type)
+    positions = {member: i for i, member in enumerate(members)}
+    members.extend([None] * (NO_MEMBER + 1 - len(members)))
+    positions[None] = NO_MEMBER
+    return Column(np.uint8, positions.__getitem__, members.__getitem__)
+
+
+def time_column() -> Column:
+    return Column(
+        np.int32,
+        lambda time: NO_VALUE if time is None else time.get_total_hundredths(),
+        lambda raw: None if raw == NO_VALUE else stime.Time.from_hundredths(raw),
+    )
+
+
+def numeric_age(age_class: Optional[str]) -> int:
+    """
+    Return age class as an age, or NO_VALUE for FR/SO/JR/SR and corrupt ages.
+    """
+    if age_class is not None and age_class.isnumeric():
+        return int(age_class)
+    return NO_VALUE
+
+
+COLUMNS = {
+    "time": time_column(),  # Final time in hundredths of a second
+    "event": enum_column(dutil.Event),
+    "session": enum_column(sdif.Session),
+    "date": Column(  # Ordinal of date of swim
+        np.int32, datetime.date.toordinal, datetime.date.fromordinal
+    ),
+    "swimmer": optional_int_column(np.int32),  # Position in swimmers table
+    "meet": optional_int_column(np.int32),  # Position in meets table
+    "club": optional_int_column(np.int32),  # Position in clubs table
+    "age_class": Column(np.int8, numeric_age, None),  # Numeric age class
+    "place": optional_int_column(np.int16),  # Rank
+    "points": Column(  # Points scored (NaN if missing)
+        np.float64,
+        lambda points: np.nan if points is None else points,
+        lambda raw: None if raw != raw else raw,
+    ),
+    "heat": optional_int_column(np.int8),
+    "lane": optional_int_column(np.int8),
+    "seed_time": time_column(),
+    "seed_course": enum_column(sdif.Course),
+    "event_min_age": Column(np.int16, int, int),
+    "event_max_age": Column(np.int16, int, int),
+    "event_sex": enum_column(sdif.Sex),
+    "event_min_time_class": enum_column(sdif.EventTimeClass),
+    "event_max_time_class": enum_column(sdif.EventTimeClass),
+    "event_number": optional_int_column(np.int32),  # Position in event numbers table
+    "entry": optional_int_column(np.int32),  # Position in entries table
+}
+
+# Every field, in declaration order. A detached result keeps field i in values[i].
+FIELDS: list[ResultField] = []
+
+# Fields that describe who swam for which team. Together they form the result's
+# entry, which is shared by every result with the same values.
+ENTRY_FIELDS: list[EntryField] = []
+
+
+def new_values() -> list:
+    """
+    Return values of a new detached result.
+    """
+    return [None] * len(FIELDS)
+
+
+class ResultField:
+    """
+    Descriptor for one field of a meet result.
+    """
+
+    def __init__(self) -> None:
+        self.index = len(FIELDS)
+        FIELDS.append(self)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, meet_result, owner: Optional[type] = None):
+        if meet_result is None:
+            return self
+        store = meet_result.store
+        if store is None:
+            return meet_result.values[self.index]
+        return self.read(store, meet_result.row)
+
+    def __set__(self, meet_result, value) -> None:
+        store = meet_result.store
+        if store is None:
+            meet_result.values[self.index] = value
+        else:
+            self.write(store, meet_result.row, value)
+
+    def read(self, store: ResultStore, row: int):
+        raise NotImplementedError
+
+    def write(self, store: ResultStore, row: int, value) -> None:
+        raise NotImplementedError
+
+    def fill(self, store: ResultStore, row: int, value) -> None:
+        """
+        Write value of a result that is being added to store.
+        """
+        self.write(store, row, value)
+
+
+class ColumnField(ResultField):
+    """
+    Field stored in one column.
+    """
+
+    def __init__(self, column: str) -> None:
+        super().__init__()
+        self.column = column
+        self.codec = COLUMNS[column]
+
+    def read(self, store: ResultStore, row: int):
+        return self.codec.decode(store.arrays[self.column].item(row))
+
+    def write(self, store: ResultStore, row: int, value) -> None:
+        store.arrays[self.column][row] = self.codec.encode(value)
+
+
+class TableField(ColumnField):
+    """
+    Field stored as a position in one of the store's tables.
+    """
+
+    def __init__(self, column: str, table: str) -> None:
+        super().__init__(column)
+        self.table = table
+
+    def read(self, store: ResultStore, row: int):
+        position = store.arrays[self.column].item(row)
+        if position == NO_VALUE:
+            return None
+        return store.tables[self.table][position]
+
+    def write(self, store: ResultStore, row: int, value) -> None:
+        store.arrays[self.column][row] = store.position_of(self.table, value)
+
+
+class EntryField(ResultField):
+    """
+    Field stored in the result's entry. If column is given, the field is also
+    stored in that column (through the column's encoding) for vectorized use.
+    """
+
+    def __init__(self, column: Optional[str] = None) -> None:
+        super().__init__()
+        self.entry_index = len(ENTRY_FIELDS)
+        ENTRY_FIELDS.append(self)
+        self.column = column
+
+    def read(self, store: ResultStore, row: int):
+        return store.get_entry(row)[self.entry_index]
+
+    def write(self, store: ResultStore, row: int, value) -> None:
+        entry = list(store.get_entry(row))
+        entry[self.entry_index] = value
+        store.set_entry(row, tuple(entry))
+        self.fill(store, row, value)
+
+    def fill(self, store: ResultStore, row: int, value) -> None:
+        if self.column is not None:
+            store.arrays[self.column][row] = COLUMNS[self.column].encode(value)
+
+
+class SplitsField(ResultField):
+    """
+    Splits, which few results have, stored by row.
+    """
+
+    def read(self, store: ResultStore, row: int):
+        return store.splits.get(row, EMPTY_SPLITS)
+
+    def write(self, store: ResultStore, row: int, value) -> None:
+        if len(value) == 0:
+            store.splits.pop(row, None)
+        else:
+            store.splits[row] = value
+
+
+class ResultStore:
+    """
+    Parallel numpy arrays holding one row per individual meet result. Rows are never
+    removed or reordered, so row i always corresponds to the i-th result added and
+    get_meet_result(i) returns its object. Swimmers, meets, clubs, event numbers, and
+    entries are stored as positions in the store's tables, in the order they were
+    first seen.
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.arrays = {
+            name: np.empty(16, dtype=column.dtype) for name, column in COLUMNS.items()
+        }
+        self.meet_results: list = []
+        self.tables: dict[str, list] = {
+            "swimmers": [],
+            "meets": [],
+            "clubs": [],
+            "event_numbers": [],
+            "entries": [],
+        }
+        self.positions: dict[str, dict] = {table: dict() for table in self.tables}
+        self.splits: dict[int, dict[int, stime.Time]] = dict()
+        self.swimmer_order: Optional[tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, meet_result, swimmer, club) -> int:
+        """
+        Append meet_result (swum by swimmer for club) to the store and make it a view
+        of its row. Return the row.
+        """
+        if meet_result.store is None:
+            values = meet_result.values
+        else:
+            values = [field.__get__(meet_result) for field in FIELDS]
+        if self.size == len(self.arrays["time"]):
+            self.grow()
+
+        row = self.size
+        self.set_entry(row, tuple(values[f.index] for f in ENTRY_FIELDS))
+        for field in FIELDS:
+            field.fill(self, row, values[field.index])
+        self.arrays["swimmer"][row] = self.position_of("swimmers", swimmer)
+        self.arrays["club"][row] = self.position_of("clubs", club)
+        self.meet_results.append(meet_result)
+        self.size += 1
+        self.swimmer_order = None
+
+        meet_result.store = self
+        meet_result.row = row
+        meet_result.values = None
+        return row
+
+    def grow(self) -> None:
+        """
+        Double the capacity of every column.
+        """
+        for name, array in self.arrays.items():
+            new_array = np.empty(2 * len(array), dtype=array.dtype)
+            new_array[: self.size] = array[: self.size]
+            self.arrays[name] = new_array
+
+    def position_of(self, table: str, item) -> int:
+        """
+        Return position of item in table, appending it if it is new.
+        """
+        if item is None:
+            return NO_VALUE
+        positions = self.positions[table]
+        position = positions.get(item)
+        if position is None:
+            position = len(self.tables[table])
+            self.tables[table].append(item)
+            positions[item] = position
+        return position
+
+    def get_entry(self, row: int) -> tuple:
+        return self.tables["entries"][self.arrays["entry"].item(row)]
+
+    def set_entry(self, row: int, entry: tuple) -> None:
+        self.arrays["entry"][row] = self.position_of("entries", entry)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Return read-only view of column name.
+        """
+        view = self.arrays[name][: self.size]
+        view.flags.writeable = False
+        return view
+
+    def get_meet_result(self, row: int):
+        return self.meet_results[row]
+
+    def get_meet_results(self, rows) -> list:
+        return [self.meet_results[r] for r in rows]
+
+    def get_swimmer_position(self, swimmer) -> int:
+        return self.positions["swimmers"].get(swimmer, NO_VALUE)
+
+    def get_club_position(self, club) -> int:
+        return self.positions["clubs"].get(club, NO_VALUE)
+
+    def get_swimmer_rows(self, swimmer) -> np.ndarray:
+        """
+        Return rows swum by swimmer, in order. Uses the rows sorted by swimmer, which
+        are computed once per size of the store.
+        """
+        position = self.get_swimmer_position(swimmer)
+        if position == NO_VALUE:
+            return np.empty(0, dtype=np.intp)
+        swimmer_order = self.swimmer_order
+        if swimmer_order is None:
+            swimmers = self.column("swimmer")
+            order = np.argsort(swimmers, kind="stable")
+            swimmer_order = (order, swimmers[order])
+            self.swimmer_order = swimmer_order
+        order, sorted_swimmers = swimmer_order
+        start, end = np.searchsorted(sorted_swimmers, [position, position + 1])
+        return order[start:end]
+
+    def select(
+        self,
+        event: Optional[dutil.Event] = None,
+        swimmer=None,
+        club=None,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
+    ) -> np.ndarray:
+        """
+        Return rows matching every given filter, in order. Dates are inclusive.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if event is not None:
+            mask &= self.column("event") == EVENT_CODES[event]
+        if swimmer is not None:
+            position = self.get_swimmer_position(swimmer)
+            mask &= (self.column("swimmer") == position) & (position != NO_VALUE)
+        if club is not None:
+            position = self.get_club_position(club)
+            mask &= (self.column("club") == position) & (position != NO_VALUE)
+        if start_date is not None:
+            mask &= self.column("date") >= start_date.toordinal()
+        if end_date is not None:
+            mask &= self.column("date") <= end_date.toordinal()
+        return np.flatnonzero(mask)
+
+    def best_rows(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Return the fastest row for every (swimmer, event) pair among rows (default
+        all rows), ordered by swimmer and event. Ties go to the row added first, which
+        matches Swimmer.get_best_meet_result.
+        """
+        if rows is None:
+            rows = np.arange(self.size)
+        rows = rows[self.column("swimmer")[rows] != NO_VALUE]
+        swimmers = self.column("swimmer")[rows]
+        events = self.column("event")[rows]
+        order = np.lexsort((rows, self.column("time")[rows], events, swimmers))
+        rows, swimmers, events = rows[order], swimmers[order], events[order]
+        keys = swimmers.astype(np.int64) * len(EVENTS) + events
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        return rows[first]
+
+    def get_best_meet_results(self, swimmer) -> list:
+        """
+        Return swimmer's fastest result in every event they swam, in event order.
+        """
+        return self.get_meet_results(self.best_rows(self.get_swimmer_rows(swimmer)))
+
+    def rank_event(
+        self,
+        event: dutil.Event,
+        club=None,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
+    ) -> list:
+        """
+        Return the best result of every swimmer in event (optionally only results swum
+        for club or within a date range), fastest first.
+        """
+        rows = self.best_rows(self.select(event, None, club, start_date, end_date))
+        order = np.lexsort((rows, self.column("time")[rows]))
+        return self.get_meet_results(rows[order])
+
+    def count(self, name: str) -> np.ndarray:
+        """
+        Return number of rows per value of column name (ex. count("event")[i] is the
+        number of results in EVENTS[i]). Missing values are not counted.
+        """
+        minlengths = {
+            "event": len(EVENTS),
+            "session": len(SESSIONS),
+            "swimmer": len(self.tables["swimmers"]),
+            "meet": len(self.tables["meets"]),
+            "club": len(self.tables["clubs"]),
+            "age_class": 0,
+            "place": 0,
+        }
+        assert name in minlengths
+        values = self.column(name)
+        if np.issubdtype(values.dtype, np.signedinteger):
+            values = values[values != NO_VALUE]
+        return np.bincount(values, minlength=minlengths[name])
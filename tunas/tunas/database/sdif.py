@@ -467,16 +467,22 @@ class Session(enum.Enum):
         return self.value
 
     def __eq__(self, value: Session) -> bool:
-        return self.name == value.name
+        return self is value or self.name == getattr(value, "name", None)
 
     def __lt__(self, value: Session) -> bool:
-        self_index = list(Session.__members__).index(self.name)
-        value_index = list(Session.__members__).index(value.name)
-        return self_index < value_index
+        return self.ordinal < value.ordinal
 
     def __gt__(self, value: Session) -> bool:
         return value < self
 
+    def __hash__(self) -> int:
+        return self.ordinal
+
+
+# Position of every member in definition order (see dutil.Event)
+for _ordinal, _session in enumerate(Session):
+    _session.ordinal = _ordinal
+
 
 class State(enum.Enum):
     """
@@ -0,0 +1,661 @@
+"""
+SQLite storage for the database. write_sqlite stores a parsed database in a SQLite
+file, and SqliteDatabase serves lookups from that file, building objects for the
+rows it needs instead of holding every object in memory. Several processes can open
+the same file and share it through the OS page cache.
+"""
+
+from __future__ import annotations
+from typing import Optional
+import os
+import json
+import sqlite3
+import datetime
+import tempfile
+import threading
+
+from . import swim, dutil, timestandard, sdif, stime
+
+# Bump when the schema changes
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE clubs (
+    id INTEGER PRIMARY KEY,
+    organization TEXT NOT NULL,
+    team_code TEXT NOT NULL,
+    lsc TEXT,
+    full_name TEXT NOT NULL,
+    abbreviated_name TEXT,
+    address_one TEXT,
+    address_two TEXT,
+    city TEXT,
+    state TEXT,
+    postal_code TEXT,
+    country TEXT,
+    region TEXT
+);
+CREATE TABLE meets (
+    id INTEGER PRIMARY KEY,
+    organization TEXT NOT NULL,
+    name TEXT NOT NULL,
+    city TEXT NOT NULL,
+    address_one TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    state TEXT,
+    address_two TEXT,
+    postal_code TEXT,
+    country TEXT,
+    course TEXT,
+    altitude INTEGER,
+    meet_type TEXT
+);
+CREATE TABLE club_meets (
+    club_id INTEGER NOT NULL,
+    meet_id INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE swimmers (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    sex TEXT NOT NULL,
+    usa_id_short TEXT,
+    usa_id_long TEXT,
+    club_id INTEGER,
+    roster_position INTEGER,
+    middle_initial TEXT,
+    preferred_first_name TEXT,
+    birthday TEXT,
+    citizenship TEXT
+);
+CREATE TABLE results (
+    id INTEGER PRIMARY KEY,
+    swimmer_id INTEGER,
+    meet_id INTEGER NOT NULL,
+    organization TEXT NOT NULL,
+    team_code TEXT,
+    lsc TEXT,
+    session TEXT NOT NULL,
+    date_of_swim TEXT NOT NULL,
+    event TEXT NOT NULL,
+    event_min_age INTEGER NOT NULL,
+    event_max_age INTEGER NOT NULL,
+    event_number TEXT NOT NULL,
+    event_sex TEXT NOT NULL,
+    heat INTEGER,
+    lane INTEGER,
+    final_time INTEGER NOT NULL,
+    rank INTEGER,
+    points REAL,
+    seed_time INTEGER,
+    seed_course TEXT,
+    event_min_time_class TEXT,
+    event_max_time_class TEXT,
+    swimmer_first_name TEXT NOT NULL,
+    swimmer_last_name TEXT NOT NULL,
+    swimmer_sex TEXT NOT NULL,
+    swimmer_usa_id_short TEXT NOT NULL,
+    swimmer_attach_status TEXT NOT NULL,
+    swimmer_middle_initial TEXT,
+    swimmer_age_class TEXT,
+    swimmer_birthday TEXT,
+    swimmer_usa_id_long TEXT,
+    swimmer_citizenship TEXT,
+    splits TEXT
+);
+CREATE INDEX clubs_team_code ON clubs (team_code, lsc);
+CREATE INDEX club_meets_club ON club_meets (club_id, position);
+CREATE INDEX swimmers_usa_id_short ON swimmers (usa_id_short);
+CREATE INDEX swimmers_usa_id_long ON swimmers (usa_id_long);
+CREATE INDEX swimmers_club ON swimmers (club_id, roster_position);
+CREATE INDEX results_swimmer_event ON results (swimmer_id, event, final_time);
+CREATE INDEX results_event_sex_date ON results (event, swimmer_sex, date_of_swim);
+"""
+
+CLUB_COLUMNS = (
+    "id, organization, team_code, lsc, full_name, abbreviated_name, address_one, "
+    "address_two, city, state, postal_code, country, region"
+)
+SWIMMER_COLUMNS = (
+    "id, first_name, last_name, sex, usa_id_short, usa_id_long, club_id, "
+    "middle_initial, preferred_first_name, birthday, citizenship"
+)
+RESULT_COLUMNS = (
+    "swimmer_id, meet_id, organization, team_code, lsc, session, date_of_swim, "
+    "event, event_min_age, event_max_age, event_number, event_sex, heat, lane, "
+    "final_time, rank, points, seed_time, seed_course, event_min_time_class, "
+    "event_max_time_class, swimmer_first_name, swimmer_last_name, swimmer_sex, "
+    "swimmer_usa_id_short, swimmer_attach_status, swimmer_middle_initial, "
+    "swimmer_age_class, swimmer_birthday, swimmer_usa_id_long, swimmer_citizenship, "
+    "splits"
+)
+
+
+def write_sqlite(db, path: str, manifest: Optional[dict] = None) -> None:
+    """
+    Write database db to a new SQLite file at path, along with the manifest of the
+    files it was built from (see snapshot.build_manifest). The file is written
+    under a temporary name and renamed into place, so readers never observe a
+    partially written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.executescript(SCHEMA)
+            insert_database(connection, db)
+            meta = {
+                "schema_version": str(SCHEMA_VERSION),
+                "manifest": encode_manifest(manifest),
+            }
+            connection.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def insert_database(connection: sqlite3.Connection, db) -> None:
+    """
+    Insert every club, meet, swimmer, and individual meet result of db. Row ids are
+    positions in the database lists, so lookups preserve the database order.
+    """
+    club_ids = {c: i for i, c in enumerate(db.get_clubs())}
+    meet_ids = {m: i for i, m in enumerate(db.get_meets())}
+    swimmer_ids = {s: i for i, s in enumerate(db.get_swimmers())}
+
+    connection.executemany(
+        f"INSERT INTO clubs ({CLUB_COLUMNS}) VALUES ({', '.join('?' * 13)})",
+        (
+            (
+                club_ids[c],
+                enum_name(c.get_organization()),
+                c.get_team_code(),
+                enum_name(c.get_lsc()),
+                c.get_full_name(),
+                c.get_abbreviated_name(),
+                c.get_address_one(),
+                c.get_address_two(),
+                c.get_city(),
+                enum_name(c.get_state()),
+                c.get_postal_code(),
+                enum_name(c.get_country()),
+                enum_name(c.get_region()),
+            )
+            for c in db.get_clubs()
+        ),
+    )
+    connection.executemany(
+        f"INSERT INTO meets VALUES ({', '.join('?' * 14)})",
+        (
+            (
+                meet_ids[m],
+                enum_name(m.get_organization()),
+                m.get_name(),
+                m.get_city(),
+                m.get_address_one(),
+                m.get_start_date().isoformat(),
+                m.get_end_date().isoformat(),
+                enum_name(m.get_state()),
+                m.get_address_two(),
+                m.get_postal_code(),
+                enum_name(m.get_country()),
+                enum_name(m.get_course()),
+                m.get_altitude(),
+                enum_name(m.get_meet_type()),
+            )
+            for m in db.get_meets()
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO club_meets VALUES (?, ?, ?)",
+        (
+            (club_ids[c], meet_ids[m], position)
+            for c in db.get_clubs()
+            for position, m in enumerate(c.get_meets())
+        ),
+    )
+
+    roster_positions = dict()
+    for c in db.get_clubs():
+        for position, s in enumerate(c.get_swimmers()):
+            roster_positions[s] = position
+    connection.executemany(
+        "INSERT INTO swimmers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                swimmer_ids[s],
+                s.get_first_name(),
+                s.get_last_name(),
+                enum_name(s.get_sex()),
+                s.get_usa_id_short(),
+                s.get_usa_id_long(),
+                club_ids.get(s.get_club()),
+                roster_positions.get(s),
+                s.get_middle_initial(),
+                s.get_preferred_first_name(),
+                date_str(s.get_birthday()),
+                enum_name(s.get_citizenship()),
+            )
+            for s in db.get_swimmers()
+        ),
+    )
+
+    owners = dict()
+    for s in db.get_swimmers():
+        for mr in s.get_meet_results():
+            owners[id(mr)] = swimmer_ids[s]
+    connection.executemany(
+        f"INSERT INTO results ({RESULT_COLUMNS}) VALUES ({', '.join('?' * 32)})",
+        (
+            result_row(mr, owners.get(id(mr)), meet_ids[mr.get_meet()])
+            for mr in db.get_meet_results()
+            if isinstance(mr, swim.IndividualMeetResult)
+        ),
+    )
+
+
+def result_row(
+    mr: swim.IndividualMeetResult, swimmer_id: Optional[int], meet_id: int
+) -> tuple:
+    """
+    Return results table row (in RESULT_COLUMNS order) for mr.
+    """
+    if len(mr.get_splits()) == 0:
+        splits = None
+    else:
+        splits = json.dumps(
+            {d: t.get_total_hundredths() for d, t in mr.get_splits().items()}
+        )
+    seed_time = mr.get_seed_time()
+    return (
+        swimmer_id,
+        meet_id,
+        enum_name(mr.get_organization()),
+        mr.get_team_code(),
+        enum_name(mr.get_lsc()),
+        enum_name(mr.get_session()),
+        mr.get_date_of_swim().isoformat(),
+        enum_name(mr.get_event()),
+        mr.get_event_min_age(),
+        mr.get_event_max_age(),
+        mr.get_event_number(),
+        enum_name(mr.get_event_sex()),
+        mr.get_heat(),
+        mr.get_lane(),
+        mr.get_final_time().get_total_hundredths(),
+        mr.get_rank(),
+        mr.get_points(),
+        seed_time.get_total_hundredths() if seed_time is not None else None,
+        enum_name(mr.get_seed_course()),
+        enum_name(mr.get_event_min_time_class()),
+        enum_name(mr.get_event_max_time_class()),
+        mr.get_swimmer_first_name(),
+        mr.get_swimmer_last_name(),
+        enum_name(mr.get_swimmer_sex()),
+        mr.get_swimmer_usa_id_short(),
+        enum_name(mr.get_swimmer_attach_status()),
+        mr.get_swimmer_middle_initial(),
+        mr.get_swimmer_age_class(),
+        date_str(mr.get_swimmer_birthday()),
+        mr.get_swimmer_usa_id_long(),
+        enum_name(mr.get_swimmer_citizenship()),
+        splits,
+    )
+
+
+def read_manifest(path: str) -> Optional[dict]:
+    """
+    Return manifest stored in SQLite file at path. Return None if the file is
+    missing, was written with a different schema, or is unreadable.
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    if meta.get("schema_version") != str(SCHEMA_VERSION):
+        return None
+    return json.loads(meta["manifest"])
+
+
+def encode_manifest(manifest: Optional[dict]) -> str:
+    """
+    Return manifest as JSON, in the form read_manifest returns it.
+    """
+    return json.dumps(manifest, sort_keys=True)
+
+
+class SqliteDatabase:
+    """
+    Read-only database backed by a SQLite file written by write_sqlite. Provides the
+    lookups used by the API with the same interface as Database, building objects
+    from rows on demand:
+     - clubs found with find_club* come with their roster and meets, and every
+       rostered swimmer comes with their meet results
+     - swimmers found with find_swimmer* come with their meet results and a club
+       without a roster
+    Meets are shared between lookups and do not hold their results.
+    """
+
+    def __init__(self, path: str) -> None:
+        assert os.path.isfile(path)
+        self.path = path
+        self.connection = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+        )
+        self.lock = threading.Lock()
+        # The file is opened read-only, so it is identified by when it was written
+        self.data_version = os.stat(path).st_mtime_ns
+        self.meets: dict[int, swim.Meet] = dict()
+        self.time_standard_info: Optional[timestandard.TimeStandardInfo] = None
+
+    def query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def count(self, table: str) -> int:
+        return self.query(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+    def get_num_clubs(self) -> int:
+        return self.count("clubs")
+
+    def get_num_swimmers(self) -> int:
+        return self.count("swimmers")
+
+    def get_num_meets(self) -> int:
+        return self.count("meets")
+
+    def get_num_meet_results(self) -> int:
+        return self.count("results")
+
+    def get_best_meet_results(
+        self, swimmer: swim.Swimmer
+    ) -> list[swim.IndividualMeetResult]:
+        """
+        Return swimmer's fastest result in every event they swam, in event order.
+        Swimmers built from the file hold their results, so they are used directly.
+        """
+        return swimmer.get_best_meet_results()
+
+    def get_data_version(self) -> int:
+        """
+        Return the data version (see Database.get_data_version).
+        """
+        return self.data_version
+
+    def get_time_standard_info(self) -> timestandard.TimeStandardInfo:
+        """
+        Return time standard information, loading it on first use.
+        """
+        if self.time_standard_info is None:
+            self.time_standard_info = timestandard.TimeStandardInfo()
+        return self.time_standard_info
+
+    def get_clubs(self) -> list[swim.Club]:
+        """
+        Return every club, without rosters.
+        """
+        rows = self.query(f"SELECT {CLUB_COLUMNS} FROM clubs ORDER BY id")
+        return [self.build_club(row) for row in rows]
+
+    def get_meets(self) -> list[swim.Meet]:
+        rows = self.query("SELECT id FROM meets ORDER BY id")
+        return [self.get_meet(row[0]) for row in rows]
+
+    def find_club(self, club_code: str) -> Optional[swim.Club]:
+        """
+        Find club with club_code (see Database.find_club).
+        """
+        assert type(club_code) == str
+        if "-" in club_code:
+            lsc_code, team_code = club_code.split("-", 1)
+            if lsc_code not in sdif.LSC:
+                return None
+            return self.find_club_with_lsc(team_code, sdif.LSC(lsc_code))
+        rows = self.query(
+            f"SELECT {CLUB_COLUMNS} FROM clubs WHERE team_code = ? ORDER BY id LIMIT 1",
+            (club_code,),
+        )
+        if len(rows) == 0:
+            return None
+        return self.load_club(rows[0])
+
+    def find_club_with_lsc(
+        self, team_code: str, lsc: Optional[sdif.LSC]
+    ) -> Optional[swim.Club]:
+        rows = self.query(
+            f"SELECT {CLUB_COLUMNS} FROM clubs WHERE team_code = ? AND lsc IS ? "
+            "ORDER BY id LIMIT 1",
+            (team_code, enum_name(lsc)),
+        )
+        if len(rows) == 0:
+            return None
+        return self.load_club(rows[0])
+
+    def find_clubs_with_team_code(self, team_code: str) -> list[swim.Club]:
+        rows = self.query(
+            f"SELECT {CLUB_COLUMNS} FROM clubs WHERE team_code = ? ORDER BY id",
+            (team_code,),
+        )
+        return [self.load_club(row) for row in rows]
+
+    def find_swimmer_with_short_id(self, short_id: str) -> Optional[swim.Swimmer]:
+        assert len(short_id) == 12
+        return self.find_swimmer("usa_id_short", short_id)
+
+    def find_swimmer_with_long_id(self, long_id: str) -> Optional[swim.Swimmer]:
+        assert len(long_id) == 14
+        return self.find_swimmer("usa_id_long", long_id)
+
+    def find_swimmer(self, column: str, value: str) -> Optional[swim.Swimmer]:
+        """
+        Find first swimmer whose column is equal to value.
+        """
+        rows = self.query(
+            f"SELECT {SWIMMER_COLUMNS} FROM swimmers WHERE {column} = ? "
+            "ORDER BY id LIMIT 1",
+            (value,),
+        )
+        if len(rows) == 0:
+            return None
+        club_id = rows[0][6]
+        club = None
+        if club_id is not None:
+            club_rows = self.query(
+                f"SELECT {CLUB_COLUMNS} FROM clubs WHERE id = ?", (club_id,)
+            )
+            club = self.build_club(club_rows[0])
+        swimmer = self.build_swimmer(rows[0], club)
+        for mr in self.load_results("swimmer_id = ?", (rows[0][0],)).get(
+            rows[0][0], []
+        ):
+            swimmer.add_meet_result(mr)
+        return swimmer
+
+    def load_club(self, row: tuple) -> swim.Club:
+        """
+        Return club for clubs table row, with its roster and meets.
+        """
+        club = self.build_club(row)
+        club_id = row[0]
+        for meet_row in self.query(
+            "SELECT meet_id FROM club_meets WHERE club_id = ? ORDER BY position",
+            (club_id,),
+        ):
+            club.add_meet(self.get_meet(meet_row[0]))
+        swimmer_rows = self.query(
+            f"SELECT {SWIMMER_COLUMNS} FROM swimmers WHERE club_id = ? "
+            "ORDER BY roster_position",
+            (club_id,),
+        )
+        swimmer_results = self.load_results(
+            "swimmer_id IN (SELECT id FROM swimmers WHERE club_id = ?)", (club_id,)
+        )
+        for swimmer_row in swimmer_rows:
+            swimmer = self.build_swimmer(swimmer_row, club)
+            for mr in swimmer_results.get(swimmer_row[0], []):
+                swimmer.add_meet_result(mr)
+            club.add_swimmer(swimmer)
+        return club
+
+    def load_results(
+        self, condition: str, parameters: tuple
+    ) -> dict[int, list[swim.IndividualMeetResult]]:
+        """
+        Return results matching condition, grouped by swimmer id, in database order.
+        """
+        rows = self.query(
+            f"SELECT {RESULT_COLUMNS} FROM results WHERE {condition} ORDER BY id",
+            parameters,
+        )
+        swimmer_results: dict[int, list[swim.IndividualMeetResult]] = dict()
+        for row in rows:
+            swimmer_results.setdefault(row[0], []).append(self.build_result(row))
+        return swimmer_results
+
+    def get_meet(self, meet_id: int) -> swim.Meet:
+        """
+        Return meet with meet_id. Meets are built once and shared.
+        """
+        meet = self.meets.get(meet_id)
+        if meet is None:
+            row = self.query("SELECT * FROM meets WHERE id = ?", (meet_id,))[0]
+            meet = swim.Meet(
+                sdif.Organization[row[1]],
+                row[2],
+                row[3],
+                row[4],
+                datetime.date.fromisoformat(row[5]),
+                datetime.date.fromisoformat(row[6]),
+                enum_member(sdif.State, row[7]),
+                row[8],
+                row[9],
+                enum_member(sdif.Country, row[10]),
+                enum_member(sdif.Course, row[11]),
+                row[12],
+                enum_member(sdif.MeetType, row[13]),
+            )
+            self.meets[meet_id] = meet
+        return meet
+
+    def build_club(self, row: tuple) -> swim.Club:
+        return swim.Club(
+            sdif.Organization[row[1]],
+            row[2],
+            enum_member(sdif.LSC, row[3]),
+            row[4],
+            row[5],
+            row[6],
+            row[7],
+            row[8],
+            enum_member(sdif.State, row[9]),
+            row[10],
+            enum_member(sdif.Country, row[11]),
+            enum_member(sdif.Region, row[12]),
+        )
+
+    def build_swimmer(self, row: tuple, club: Optional[swim.Club]) -> swim.Swimmer:
+        return swim.Swimmer(
+            row[1],
+            row[2],
+            sdif.Sex[row[3]],
+            row[4],
+            club,
+            row[7],
+            row[8],
+            date_from_str(row[9]),
+            row[5],
+            enum_member(sdif.Country, row[10]),
+        )
+
+    def build_result(self, row: tuple) -> swim.IndividualMeetResult:
+        # "NA" marks a corrupt numeric age class; the setter only produces it from
+        # numeric input, so it is restored after construction
+        age_class = row[27]
+        mr = swim.IndividualMeetResult(
+            self.get_meet(row[1]),
+            sdif.Organization[row[2]],
+            row[3],
+            enum_member(sdif.LSC, row[4]),
+            sdif.Session[row[5]],
+            datetime.date.fromisoformat(row[6]),
+            dutil.Event[row[7]],
+            row[8],
+            row[9],
+            row[10],
+            sdif.Sex[row[11]],
+            row[12],
+            row[13],
+            stime.Time.from_hundredths(row[14]),
+            row[21],
+            row[22],
+            sdif.Sex[row[23]],
+            row[24],
+            sdif.AttachStatus[row[25]],
+            row[15],
+            row[16],
+            stime.Time.from_hundredths(row[17]) if row[17] is not None else None,
+            enum_member(sdif.Course, row[18]),
+            enum_member(sdif.EventTimeClass, row[19]),
+            enum_member(sdif.EventTimeClass, row[20]),
+            row[26],
+            None if age_class == "NA" else age_class,
+            date_from_str(row[28]),
+            row[29],
+            enum_member(sdif.Country, row[30]),
+            None,
+        )
+        if age_class == "NA":
+            mr.swimmer_age_class = age_class
+        if row[31] is not None:
+            splits = json.loads(row[31])
+            mr.set_splits(
+                {int(d): stime.Time.from_hundredths(t) for d, t in splits.items()}
+            )
+        return mr
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def enum_name(member) -> Optional[str]:
+    if member is None:
+        return None
+    return member.name
+
+
+def enum_member(enum_class, name: Optional[str]):
+    if name is None:
+        return None
+    return enum_class[name]
+
+
+def date_str(date: Optional[datetime.date]) -> Optional[str]:
+    if date is None:
+        return None
+    return date.isoformat()
+
+
+def date_from_str(date_string: Optional[str]) -> Optional[datetime.date]:
+    if date_string is None:
+        return None
+    return datetime.date.fromisoformat(date_string)
@@ -9,35 +9,37 @@ from typing import Optional
 def create_time_from_str(time_str: str) -> Time:
     """
     Create and return a time object corresponding to time_str which should be in
-    mm:ss.hh format.
+    mm:ss.hh format. Times of an hour or more may be given as mm:ss.hh with 60 or
+    more minutes, or as h:mm:ss.hh.
     """
-    # Set default values
-    minute_str, second_str, hundredth_str = "0", "0", "0"
-    minute, second, hundredth = 0, 0, 0
-
-    # Parse time_str and return time object
     first_split = time_str.split(":")
-    if len(first_split) == 2:
-        minute_str = first_split[0]
+    if len(first_split) > 3:
+        raise Exception(f"Invalid time string: '{time_str}'")
     next_split = first_split[-1].split(".")
     if len(next_split) != 2:
         raise Exception(f"Invalid time string: '{time_str}'")
-    second_str = next_split[0]
-    hundredth_str = next_split[1]
     try:
-        minute = int(minute_str)
-        second = int(second_str)
-        hundredth = int(hundredth_str)
-    except:
+        hour = int(first_split[0]) if len(first_split) == 3 else 0
+        minute = int(first_split[-2]) if len(first_split) >= 2 else 0
+        second = int(next_split[0])
+        hundredth = int(next_split[1])
+    except ValueError:
+        raise Exception(f"Invalid time string: '{time_str}'")
+    if hour < 0 or (len(first_split) == 3 and minute >= 60):
         raise Exception(f"Invalid time string: '{time_str}'")
-    return Time(minute, second, hundredth)
+    return Time(hour * 60 + minute, second, hundredth)
 
 
 class Time:
     """
-    Custom time representation for swim meet results.
+    Custom time representation for swim meet results. Times are immutable and stored
+    as a total number of hundredths of a second.
     """
 
+    __slots__ = ("hundredths",)
+
+    hundredths: int
+
     def __init__(
         self,
         minute: int = 0,
@@ -45,19 +47,43 @@ class Time:
         hundredth: int = 0,
     ) -> None:
         """
-        Create a time oject. There are two ways to create a time object:
-        1) Input minute, second, and hundredth
-        2) Input a time_str. Must be in m:ss.hh or m:ss:hh* format.
+        Create a time object from its minute, second, and hundredth components.
+        Minutes may be 60 or more.
 
         Keyword arguments:
         minute -- the minutes component (default 0)
         second -- the seconds component (default 0)
         hundredth -- the hundredths component (default 0)
-        time_str -- time string
         """
-        self.set_minute(minute)
-        self.set_second(second)
-        self.set_hundredth(hundredth)
+        assert type(minute) == int, f"Minute should be an integer: {minute}"
+        assert 0 <= minute, f"Invalid minute: {minute}"
+        assert type(second) == int, f"Seconds should be an integer: {second}"
+        assert 0 <= second and second < 60, f"Invalid seconds: {second}"
+        assert type(hundredth) == int, f"Hundredths should be an integer: {hundredth}"
+        assert 0 <= hundredth and hundredth < 100, f"Invalid hundredths: {hundredth}"
+        object.__setattr__(self, "hundredths", minute * 6000 + second * 100 + hundredth)
+
+    @classmethod
+    def from_hundredths(cls, hundredths: int) -> Time:
+        """
+        Create a time object from a total number of hundredths without validation.
+        Callers must pass a non-negative int.
+
+        >>> Time.from_hundredths(7523)
+        Time(1, 15, 23)
+        """
+        time = object.__new__(cls)
+        object.__setattr__(time, "hundredths", hundredths)
+        return time
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Time objects are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Time objects are immutable")
+
+    def __reduce__(self) -> tuple:
+        return (Time.from_hundredths, (self.hundredths,))
 
     def __str__(self) -> str:
         """
@@ -73,16 +99,17 @@ class Time:
         >>> t3 = Time(0, 0, 0)
         >>> str(t3) == ""
         True
+        >>> print(Time(75, 2, 5))
+        75:02.05
         """
-        if self == Time(0, 0, 0):
+        if self.hundredths == 0:
             return ""
-        m = str(self.get_minute())
-        s = str(self.get_second()).zfill(2)
-        h = str(self.get_hundredth()).zfill(2)
-        if m == "0":
-            return f"{s}.{h}"
+        m, rest = divmod(self.hundredths, 6000)
+        s, h = divmod(rest, 100)
+        if m == 0:
+            return f"{s:02}.{h:02}"
         else:
-            return f"{m}:{s}.{h}"
+            return f"{m}:{s:02}.{h:02}"
 
     def __repr__(self) -> str:
         """
@@ -101,7 +128,7 @@ class Time:
         """
         Return time hash.
         """
-        return self.get_minute() + self.get_second() + self.get_hundredth()
+        return hash(self.hundredths)
 
     def __gt__(self, other_time: Optional[Time]) -> bool:
         """
@@ -112,24 +139,7 @@ class Time:
         """
         if other_time is None:
             return False
-
-        # Compare minutes
-        if self.get_minute() > other_time.get_minute():
-            return True
-        if self.get_minute() < other_time.get_minute():
-            return False
-        # Compare seconds
-        if self.get_second() > other_time.get_second():
-            return True
-        if self.get_second() < other_time.get_second():
-            return False
-        # Compare hundredths
-        if self.get_hundredth() > other_time.get_hundredth():
-            return True
-        if self.get_hundredth() < other_time.get_hundredth():
-            return False
-        # Self must equal other_time so return false
-        return False
+        return self.hundredths > other_time.hundredths
 
     def __lt__(self, other_time: Optional[Time]) -> bool:
         """
@@ -138,7 +148,9 @@ class Time:
         Keyword arguments:
         other_time -- Time object that is being compared against
         """
-        return other_time > self
+        if other_time is None:
+            return False
+        return self.hundredths < other_time.hundredths
 
     def __eq__(self, other_time: Optional[Time]) -> bool:
         """
@@ -149,11 +161,7 @@ class Time:
         """
         if other_time is None or type(other_time) != Time:
             return False
-        return (
-            self.get_minute() == other_time.get_minute()
-            and self.get_second() == other_time.get_second()
-            and self.get_hundredth() == other_time.get_hundredth()
-        )
+        return self.hundredths == other_time.hundredths
 
     def __ge__(self, other_time: Time) -> bool:
         """
@@ -163,7 +171,9 @@ class Time:
         Keyword arguments:
         other_time -- Time object that is being compared against
         """
-        return self > other_time or self == other_time
+        if other_time is None:
+            return False
+        return self.hundredths >= other_time.hundredths
 
     def __le__(self, other_time: Time) -> bool:
         """
@@ -173,7 +183,9 @@ class Time:
         Keyword arguments:
         other_time -- Time object that is being compared against
         """
-        return other_time >= self
+        if other_time is None:
+            return False
+        return self.hundredths <= other_time.hundredths
 
     def __add__(self, other_time: Time) -> Time:
         """
@@ -182,16 +194,7 @@ class Time:
         Keyword arguments:
         other_time -- Time object that is being added to self.
         """
-        hundredth = self.hundredth + other_time.get_hundredth()
-        second = self.second + other_time.get_second()
-        minute = self.minute + other_time.get_minute()
-        if hundredth >= 100:
-            hundredth = hundredth % 100
-            second += 1
-        if second >= 60:
-            second = second % 60
-            minute += 1
-        return Time(minute, second, hundredth)
+        return Time.from_hundredths(self.hundredths + other_time.hundredths)
 
     def __sub__(self, other_time: Time) -> Time:
         """
@@ -200,63 +203,30 @@ class Time:
         Keyword arguments:
         other_time -- Time object that is being subtracted from self.
         """
-        if other_time > self:
+        if other_time.hundredths > self.hundredths:
             raise Exception("Cannot subtract larger valued time")
-        hundredth = self.get_hundredth()
-        second = self.get_second()
-        minute = self.get_minute()
-        t_hundredth = other_time.get_hundredth()
-        t_second = other_time.get_second()
-        t_minute = other_time.get_minute()
-        if hundredth < t_hundredth:
-            second = second - 1
-            hundredth = hundredth + 100
-        hundredth = hundredth - t_hundredth
-        if second < t_second:
-            minute = minute - 1
-            second = second + 60
-        second = second - t_second
-        minute = minute - t_minute
-        return Time(minute, second, hundredth)
-
-    def set_minute(self, m: int) -> None:
-        """
-        Verify and set self.minute attribute
-        """
-        assert type(m) == int, f"Minute should be an integer: {m}"
-        assert 0 <= m and m < 60, f"Invalid minute: {m}"
-        self.minute = m
-
-    def set_second(self, s: int) -> None:
-        """
-        Verify and set self.second attribute
-        """
-        assert type(s) == int, f"Seconds should be an integer: {s}"
-        assert 0 <= s and s < 60, f"Invalid seconds: {s}"
-        self.second = s
-
-    def set_hundredth(self, h: int) -> None:
-        """
-        Verify and set self.hundredth attribute
-        """
-        assert type(h) == int, f"Hundredths should be an integer: {h}"
-        assert 0 <= h and h < 100, f"Invalid hundredths: {h}"
-        self.hundredth = h
+        return Time.from_hundredths(self.hundredths - other_time.hundredths)
 
     def get_minute(self) -> int:
         """
-        Return self.minute attribute.
+        Return minutes component. May be 60 or more.
         """
-        return self.minute
+        return self.hundredths // 6000
 
     def get_second(self) -> int:
         """
-        Return self.second attribute.
+        Return seconds component.
         """
-        return self.second
+        return self.hundredths // 100 % 60
 
     def get_hundredth(self) -> int:
         """
-        Return self.hundredth attribute.
+        Return hundredths component.
+        """
+        return self.hundredths % 100
+
+    def get_total_hundredths(self) -> int:
+        """
+        Return time as a total number of hundredths of a second.
         """
-        return self.hundredth
+        return self.hundredths
@@ -6,7 +6,7 @@ from __future__ import annotations
 from typing import Optional
 import datetime
 
-from . import dutil, stime, sdif
+from . import dutil, stime, sdif, results
 
 
 class Club:
@@ -121,13 +121,19 @@ class Club:
 
     def set_swimmers(self, swimmers: Optional[list[Swimmer]]) -> None:
         if swimmers == None:
-            self.swimmers = []
-            return
+            swimmers = []
         assert type(swimmers) == list
         for s in swimmers:
             assert type(s) == Swimmer
         self.swimmers = swimmers
 
+        # Rebuild swimmer index
+        if hasattr(self, "swimmer_index"):
+            self.swimmer_index.clear()
+        self.swimmer_index = SwimmerIndex()
+        for s in swimmers:
+            self.swimmer_index.add(s)
+
     def set_meets(self, meets: Optional[list[Meet]]) -> None:
         if meets == None:
             self.meets = []
@@ -194,6 +200,12 @@ class Club:
     def add_swimmer(self, swimmer: Swimmer) -> None:
         assert type(swimmer) == Swimmer
         self.swimmers.append(swimmer)
+        self.swimmer_index.add(swimmer)
+
+    def remove_swimmer(self, swimmer: Swimmer) -> None:
+        assert type(swimmer) == Swimmer
+        self.swimmers.remove(swimmer)
+        self.swimmer_index.remove(swimmer)
 
     def add_meet(self, meet: Meet) -> None:
         assert type(meet) == Meet
@@ -205,15 +217,11 @@ class Club:
 
     def find_swimmer_with_short_id(self, short_id: str) -> Optional[Swimmer]:
         assert len(short_id) == 12
-        for s in self.get_swimmers():
-            if s.get_usa_id_short() == short_id:
-                return s
+        return self.swimmer_index.find_with_short_id(short_id)
 
     def find_swimmer_with_long_id(self, long_id: str) -> Optional[Swimmer]:
         assert len(long_id) == 14
-        for s in self.get_swimmers():
-            if s.get_usa_id_long() == long_id:
-                return s
+        return self.swimmer_index.find_with_long_id(long_id)
 
     def find_swimmer_with_birthday(
         self,
@@ -222,25 +230,9 @@ class Club:
         last_name: str,
         birthday: datetime.date,
     ) -> Optional[Swimmer]:
-        old_id = dutil.generate_old_id(first_name, middle_initial, last_name, birthday)
-        for swimmer in self.get_swimmers():
-            swimmer_birthday = swimmer.get_birthday()
-            if swimmer_birthday is None or swimmer_birthday != birthday:
-                continue
-            swimmer_first_name = swimmer.get_first_name()
-            swimmer_last_name = swimmer.get_last_name()
-            swimmer_middle_initial = swimmer.get_middle_initial()
-
-            # Find swimmer by generating old ids and comparing hamming distance
-            swimmer_id = dutil.generate_old_id(
-                swimmer_first_name,
-                swimmer_middle_initial,
-                swimmer_last_name,
-                swimmer_birthday,
-            )
-            if dutil.hamming_distance(swimmer_id, old_id) <= 1:
-                return swimmer
-        return None
+        return self.swimmer_index.find_with_birthday(
+            first_name, middle_initial, last_name, birthday
+        )
 
 
 class Swimmer:
@@ -263,6 +255,9 @@ class Swimmer:
         meets: Optional[list[Meet]] = None,
         meet_results: Optional[list[IndividualMeetResult]] = None,
     ) -> None:
+        # Swimmer indexes containing this swimmer. Must exist before any setter runs.
+        self.indexes: list[SwimmerIndex] = []
+
         # Mandatory fields
         self.set_first_name(first_name)
         self.set_last_name(last_name)
@@ -279,18 +274,18 @@ class Swimmer:
 
         # Internal
         self.set_meets(meets)
-        self.set_meet_results(meet_results)
         self.date_most_recent_swim = None
+        self.set_meet_results(meet_results)
 
     def set_first_name(self, first_name: str) -> None:
         assert type(first_name) == str
         assert first_name != ""
-        self.first_name = first_name
+        self.set_indexed_attribute("first_name", first_name)
 
     def set_last_name(self, last_name: str) -> None:
         assert type(last_name) == str
         assert last_name != ""
-        self.last_name = last_name
+        self.set_indexed_attribute("last_name", last_name)
 
     def set_sex(self, sex: sdif.Sex) -> None:
         assert type(sex) == sdif.Sex
@@ -300,7 +295,7 @@ class Swimmer:
         if usa_id_short is not None:
             assert type(usa_id_short) == str
             assert len(usa_id_short) == 12
-        self.usa_id_short = usa_id_short
+        self.set_indexed_attribute("usa_id_short", usa_id_short)
 
     def set_club(self, club: Optional[Club]) -> None:
         """
@@ -314,7 +309,7 @@ class Swimmer:
         if middle_initial != None:
             assert type(middle_initial) == str
             assert len(middle_initial) == 1
-        self.middle_initial = middle_initial
+        self.set_indexed_attribute("middle_initial", middle_initial)
 
     def set_preferred_first_name(self, preferred_first_name: Optional[str]) -> None:
         if preferred_first_name != None:
@@ -330,13 +325,13 @@ class Swimmer:
         """
         if birthday != None:
             assert type(birthday) == datetime.date
-        self.birthday = birthday
+        self.set_indexed_attribute("birthday", birthday)
 
     def set_usa_id_long(self, usa_id_long: Optional[str]) -> None:
         if usa_id_long != None:
             assert type(usa_id_long) == str
             assert len(usa_id_long) == 14
-        self.usa_id_long = usa_id_long
+        self.set_indexed_attribute("usa_id_long", usa_id_long)
 
     def set_citizenship(self, citizenship: Optional[sdif.Country]) -> None:
         if citizenship != None:
@@ -355,6 +350,8 @@ class Swimmer:
     def set_meet_results(
         self, meet_results: Optional[list[IndividualMeetResult]]
     ) -> None:
+        # Fastest meet result per event
+        self.best_meet_results: dict[dutil.Event, IndividualMeetResult] = dict()
         if meet_results == None:
             self.meet_results = []
             return
@@ -367,8 +364,20 @@ class Swimmer:
                 or mr.get_date_of_swim() > self.date_most_recent_swim
             ):
                 self.date_most_recent_swim = mr.get_date_of_swim()
+            self.update_best_meet_result(mr)
         self.meet_results = meet_results
 
+    def set_indexed_attribute(self, name: str, value: object) -> None:
+        """
+        Set an attribute that is used as a key by SwimmerIndex, keeping every index
+        containing this swimmer up to date.
+        """
+        for index in self.indexes:
+            index.remove_keys(self)
+        setattr(self, name, value)
+        for index in self.indexes:
+            index.add_keys(self)
+
     def get_first_name(self) -> str:
         return self.first_name
 
@@ -426,6 +435,17 @@ class Swimmer:
         ):
             self.date_most_recent_swim = meet_result.get_date_of_swim()
         self.meet_results.append(meet_result)
+        self.update_best_meet_result(meet_result)
+
+    def update_best_meet_result(self, meet_result: IndividualMeetResult) -> None:
+        """
+        Record meet_result as the best for its event if it is strictly faster than the
+        current best, so ties go to the result added first.
+        """
+        event = meet_result.get_event()
+        best = self.best_meet_results.get(event)
+        if best is None or meet_result.get_final_time() < best.get_final_time():
+            self.best_meet_results[event] = meet_result
 
     def get_age_range(self, on_date: datetime.date) -> tuple[int, int]:
         """
@@ -508,7 +528,7 @@ class Swimmer:
             self.set_club(new_club)
             new_club.add_swimmer(self)
         else:
-            current_club.get_swimmers().remove(self)
+            current_club.remove_swimmer(self)
             new_club.add_swimmer(self)
             self.set_club(new_club)
 
@@ -518,15 +538,15 @@ class Swimmer:
         """
         Return meet result with fastest time for event
         """
-        valid_results: list[IndividualMeetResult]
-        valid_results = []
-        for mr in self.get_meet_results():
-            if mr.get_event() == event:
-                valid_results.append(mr)
-        if len(valid_results) == 0:
-            return None
-        else:
-            return min(valid_results, key=lambda mr: mr.get_final_time())
+        return self.best_meet_results.get(event)
+
+    def get_best_meet_results(self) -> list[IndividualMeetResult]:
+        """
+        Return fastest meet result for every event swum, in dutil.Event order
+        """
+        return [
+            self.best_meet_results[event] for event in sorted(self.best_meet_results)
+        ]
 
 
 class Meet:
@@ -695,6 +715,31 @@ class MeetResult:
     and heat/lane assignments.
     """
 
+    # Results are the most numerous objects in the database. Once added to a
+    # results.ResultStore, a result is a view of one row of the store's columns.
+    __slots__ = ("store", "row", "values")
+
+    meet = results.TableField("meet", "meets")
+    organization = results.EntryField()
+    team_code = results.EntryField()
+    lsc = results.EntryField()
+    session = results.ColumnField("session")
+    date_of_swim = results.ColumnField("date")
+    event = results.ColumnField("event")
+    event_min_age = results.ColumnField("event_min_age")
+    event_max_age = results.ColumnField("event_max_age")
+    event_number = results.TableField("event_number", "event_numbers")
+    event_sex = results.ColumnField("event_sex")
+    heat = results.ColumnField("heat")
+    lane = results.ColumnField("lane")
+    final_time = results.ColumnField("time")
+    rank = results.ColumnField("place")
+    points = results.ColumnField("points")
+    seed_time = results.ColumnField("seed_time")
+    seed_course = results.ColumnField("seed_course")
+    event_min_time_class = results.ColumnField("event_min_time_class")
+    event_max_time_class = results.ColumnField("event_max_time_class")
+
     def __init__(
         self,
         meet: Meet,
@@ -718,6 +763,10 @@ class MeetResult:
         event_min_time_class: Optional[sdif.EventTimeClass] = None,
         event_max_time_class: Optional[sdif.EventTimeClass] = None,
     ) -> None:
+        self.store: Optional[results.ResultStore] = None
+        self.row: Optional[int] = None
+        self.values: Optional[list] = results.new_values()
+
         # Mandatory fields
         self.set_meet(meet)
         self.set_organization(organization)
@@ -924,6 +973,20 @@ class IndividualMeetResult(MeetResult):
     name and splits.
     """
 
+    __slots__ = ()
+
+    swimmer_first_name = results.EntryField()
+    swimmer_last_name = results.EntryField()
+    swimmer_sex = results.EntryField()
+    swimmer_usa_id_short = results.EntryField()
+    swimmer_attach_status = results.EntryField()
+    swimmer_middle_initial = results.EntryField()
+    swimmer_age_class = results.EntryField("age_class")
+    swimmer_birthday = results.EntryField()
+    swimmer_usa_id_long = results.EntryField()
+    swimmer_citizenship = results.EntryField()
+    splits = results.SplitsField()
+
     def __init__(
         self,
         meet: Meet,
@@ -1111,3 +1174,143 @@ class IndividualMeetResult(MeetResult):
 
     def get_splits(self) -> dict[int, stime.Time]:
         return self.splits
+
+
+class SwimmerIndex:
+    """
+    Hash index over a collection of swimmers, used to resolve swimmer identities
+    without scanning every swimmer.
+
+    Swimmers are indexed by short id, by long id, and, if they have a birthday, by
+    birthday plus the deletion neighborhood of the 8 character name part of their old
+    id (see dutil.generate_old_id). Two swimmers with the same birthday have old ids
+    within hamming distance 1 exactly when their name parts share a deletion key, so
+    a fuzzy birthday match takes a constant number of lookups. Lookups return the
+    earliest added matching swimmer, which matches a linear scan of the collection.
+    """
+
+    def __init__(self) -> None:
+        self.positions: dict[Swimmer, int] = dict()
+        self.next_position = 0
+        self.short_ids: dict[str, list[Swimmer]] = dict()
+        self.long_ids: dict[str, list[Swimmer]] = dict()
+        self.name_keys: dict[tuple[datetime.date, int, str], list[Swimmer]] = dict()
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, swimmer: object) -> bool:
+        return swimmer in self.positions
+
+    def add(self, swimmer: Swimmer) -> None:
+        """
+        Add swimmer to index. Swimmer key changes are tracked until it is removed.
+        """
+        assert type(swimmer) == Swimmer
+        assert swimmer not in self.positions
+        self.positions[swimmer] = self.next_position
+        self.next_position += 1
+        self.add_keys(swimmer)
+        swimmer.indexes.append(self)
+
+    def remove(self, swimmer: Swimmer) -> None:
+        """
+        Remove swimmer from index.
+        """
+        assert swimmer in self.positions
+        self.remove_keys(swimmer)
+        del self.positions[swimmer]
+        swimmer.indexes.remove(self)
+
+    def clear(self) -> None:
+        """
+        Remove every swimmer from index.
+        """
+        for swimmer in list(self.positions):
+            self.remove(swimmer)
+
+    def add_keys(self, swimmer: Swimmer) -> None:
+        for table, key in self.generate_keys(swimmer):
+            table.setdefault(key, []).append(swimmer)
+
+    def remove_keys(self, swimmer: Swimmer) -> None:
+        for table, key in self.generate_keys(swimmer):
+            bucket = table[key]
+            bucket.remove(swimmer)
+            if len(bucket) == 0:
+                del table[key]
+
+    def generate_keys(self, swimmer: Swimmer) -> list[tuple[dict, object]]:
+        """
+        Return (table, key) pairs under which swimmer is indexed.
+        """
+        keys: list[tuple[dict, object]] = []
+        short_id = swimmer.get_usa_id_short()
+        if short_id is not None:
+            keys.append((self.short_ids, short_id))
+        long_id = swimmer.get_usa_id_long()
+        if long_id is not None:
+            keys.append((self.long_ids, long_id))
+        birthday = swimmer.get_birthday()
+        if birthday is not None:
+            name_part = generate_name_part(
+                swimmer.get_first_name(),
+                swimmer.get_middle_initial(),
+                swimmer.get_last_name(),
+                birthday,
+            )
+            for key in generate_deletion_keys(name_part):
+                keys.append((self.name_keys, (birthday, *key)))
+        return keys
+
+    def first_added(self, candidates: list[Swimmer]) -> Optional[Swimmer]:
+        """
+        Return the candidate that was added to the index first.
+        """
+        if len(candidates) == 0:
+            return None
+        return min(candidates, key=self.positions.__getitem__)
+
+    def find_with_short_id(self, short_id: str) -> Optional[Swimmer]:
+        return self.first_added(self.short_ids.get(short_id, []))
+
+    def find_with_long_id(self, long_id: str) -> Optional[Swimmer]:
+        return self.first_added(self.long_ids.get(long_id, []))
+
+    def find_with_birthday(
+        self,
+        first_name: str,
+        middle_initial: Optional[str],
+        last_name: str,
+        birthday: datetime.date,
+    ) -> Optional[Swimmer]:
+        """
+        Find swimmer with birthday whose old id is within hamming distance 1 of the
+        old id generated from the given name.
+        """
+        name_part = generate_name_part(first_name, middle_initial, last_name, birthday)
+        candidates = []
+        for position, deleted in generate_deletion_keys(name_part):
+            candidates.extend(self.name_keys.get((birthday, position, deleted), []))
+        return self.first_added(candidates)
+
+
+def generate_name_part(
+    first_name: str,
+    middle_initial: Optional[str],
+    last_name: str,
+    birthday: datetime.date,
+) -> str:
+    """
+    Return the 8 character name part of the old id (everything after the birthday).
+    """
+    return dutil.generate_old_id(first_name, middle_initial, last_name, birthday)[6:]
+
+
+def generate_deletion_keys(name_part: str) -> list[tuple[int, str]]:
+    """
+    Return the deletion neighborhood of name_part: one key per position with the
+    character at that position removed. Equal length strings share a key if and only
+    if their hamming distance is at most 1.
+    """
+    return [(i, name_part[:i] + name_part[i + 1 :]) for i in range(len(name_part))]
@@ -3,18 +3,30 @@ Time standard information logic.
 """
 
 from __future__ import annotations
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import os
 import enum
-import pandas as pd
+import json
+import tempfile
+
+import numpy as np
 
 from . import dutil, stime, sdif
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 # Paths
 TUNAS_DIRECTORY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 TUNAS_PROJECT_PATH = os.path.dirname(TUNAS_DIRECTORY_PATH)
 TIME_STANDARDS_PATH = os.path.join(TUNAS_PROJECT_PATH, "data", "timeStandards")
+TIME_STANDARDS_CACHE_PATH = os.path.join(
+    TUNAS_PROJECT_PATH, "data", "cache", "time_standards.npz"
+)
+
+# Bump when the layout of the compiled time standard cache changes
+COMPILED_FORMAT_VERSION = 1
 
 # Time standard file names
 B_XLSX_FILE_NAME = "B-2028.xlsx"
@@ -81,23 +93,39 @@ class TimeStandard(enum.Enum):
         return self.value
 
     def __eq__(self, value: TimeStandard) -> bool:
-        return self.name == value.name
+        return self is value or self.name == getattr(value, "name", None)
 
     def __lt__(self, value: TimeStandard) -> bool:
-        self_index = list(TimeStandard.__members__).index(self.name)
-        value_index = list(TimeStandard.__members__).index(value.name)
-        return self_index < value_index
+        return self.ordinal < value.ordinal
 
     def __gt__(self, value: TimeStandard) -> bool:
         return value < self
 
     def __hash__(self) -> int:
-        return super().__hash__()
+        return self.ordinal
 
     def short(self) -> str:
         return self.name
 
 
+# Position of every member in definition order (see dutil.Event)
+for _ordinal, _standard in enumerate(TimeStandard):
+    _standard.ordinal = _ordinal
+
+# Axes of the compiled time standard table
+TIME_STANDARDS = list(TimeStandard)
+AGE_GROUPS = list(dutil.AgeGroup)
+SEXES = list(sdif.Sex)
+AGE_GROUP_INDEXES = {ag.name: i for i, ag in enumerate(AGE_GROUPS)}
+SEX_INDEXES = {sex.name: i for i, sex in enumerate(SEXES)}
+
+# Ages covered by the table (every age group ends before MAX_AGE)
+MAX_AGE = 100
+
+# Table value for events, sexes, and age groups without a qualifying time
+NO_STANDARD = -1
+
+
 class TimeStandardInfo:
     """
     Contains time standard information.
@@ -134,40 +162,38 @@ class TimeStandardInfo:
         TimeStandard.OT: SENIOR_AGE_GROUPS,
     }
 
-    def __init__(self) -> None:
+    def __init__(self, cache_path: Optional[str] = TIME_STANDARDS_CACHE_PATH) -> None:
         """
-        Initialize TimeStandardInfo object.
+        Initialize TimeStandardInfo object. Compiled time standards are read from
+        cache_path if it is up to date with the xlsx files; otherwise the xlsx files
+        are compiled and the cache is rewritten. Pass None to skip the cache.
         """
-        self.ts_data = dict()
-        self.load_time_standard_data()
+        self.load_time_standard_data(cache_path)
 
-    def load_time_standard_data(self) -> None:
+    def load_time_standard_data(self, cache_path: Optional[str]) -> None:
         """
-        Load time standard dataframes into self.
+        Load compiled time standard tables into self.
         """
-        for ts in TimeStandard:
-            file_path = TimeStandardInfo.file_paths[ts]
-            age_groups = TimeStandardInfo.age_group_types[ts]
-            age_group_to_df = dict()
-            for sheet_index in range(1, len(age_groups) + 1):
-                age_group = age_groups[sheet_index - 1]
-                df = (
-                    pd.read_excel(file_path, sheet_name=sheet_index)
-                    .fillna("0")
-                    .set_index("Event")
-                    .rename_axis(None)
-                    .astype(str)
-                    .map(lambda x: x[:-1] if x[-1] == "*" else x)
-                    .map(
-                        lambda x: (
-                            stime.create_time_from_str(x)
-                            if x != "0"
-                            else stime.Time(0, 0, 0)
-                        )
-                    )
-                )
-                age_group_to_df[age_group] = df
-            self.ts_data[ts] = age_group_to_df
+        manifest = build_time_standard_manifest()
+        compiled = None
+        if cache_path is not None:
+            compiled = load_compiled_time_standards(cache_path, manifest)
+        if compiled is None:
+            compiled = compile_time_standards(manifest)
+            if cache_path is not None:
+                try:
+                    save_compiled_time_standards(compiled, cache_path)
+                except OSError as e:
+                    print(f"Could not write time standard cache: {e}")
+
+        # Qualifying time in hundredths, indexed by [standard, age group, event, sex]
+        self.table: np.ndarray = compiled["table"]
+        # Position in AGE_GROUPS of every age's age group, indexed by [standard, age]
+        self.age_group_table: np.ndarray = compiled["age_groups"]
+        # Sheet contents for get_time_standard_df
+        self.sheets = {
+            key: compiled[key] for key in compiled if key.startswith("sheet-")
+        }
 
     def get_time_standard_df(
         self, standard: TimeStandard, age_group: dutil.AgeGroup
@@ -177,12 +203,23 @@ class TimeStandardInfo:
         """
         assert type(standard) == TimeStandard
         assert type(age_group) == dutil.AgeGroup
-        try:
-            df = self.ts_data[standard][age_group]
-            return df
-        except KeyError:
+        key = sheet_key(standard, age_group)
+        if f"{key}-times" not in self.sheets:
             return None
 
+        import pandas as pd
+
+        times = [
+            [stime.Time.from_hundredths(int(h)) for h in row]
+            for row in self.sheets[f"{key}-times"]
+        ]
+        return pd.DataFrame(
+            times,
+            index=list(self.sheets[f"{key}-rows"]),
+            columns=list(self.sheets[f"{key}-columns"]),
+            dtype=object,
+        )
+
     def get_qualified_standards(
         self,
         time: stime.Time,
@@ -193,52 +230,51 @@ class TimeStandardInfo:
         """
         Return a list of qualified time standards, sorted from slowest to fastest.
         """
-        dist, course, stroke = (
-            event.get_distance(),
-            event.get_course(),
-            event.get_stroke(),
+        if age < 0 or age >= MAX_AGE:
+            return []
+        age_groups = self.age_group_table[:, age]
+        qual_times = self.table[
+            np.arange(len(TIME_STANDARDS)),
+            age_groups,
+            event.ordinal,
+            SEX_INDEXES[sex.name],
+        ]
+        qualified = (age_groups != NO_STANDARD) & (
+            time.get_total_hundredths() <= qual_times
         )
-        qualified_standards = []
-        for standard in TimeStandard:
-            # Get age group
-            age_groups = self.get_age_groups(standard)
-            age_group = None
-            for ag in age_groups:
-                if age in ag:
-                    age_group = ag
-                    break
-            if age_group is None:
-                continue
-
-            # Get corresponding dataframe
-            df = self.get_time_standard_df(standard, age_group)
-            if df is None:
-                continue
-
-            # Get column label
-            column_label = f"{course}-{sex}"
-
-            # Get row label
-            if stroke == sdif.Stroke.FREESTYLE and (dist == 400 or dist == 500):
-                row_label = f"400/500 FR"
-            elif stroke == sdif.Stroke.FREESTYLE and (dist == 800 or dist == 1000):
-                row_label = f"800/1000 FR"
-            elif stroke == sdif.Stroke.FREESTYLE and (dist == 1500 or dist == 1650):
-                row_label = f"1500/1650 FR"
-            else:
-                row_label = f"{dist} {stroke.short()}"
-
-            # If time is less than qualifying time, add standard to qualified standards
-            try:
-                qual_time = df.loc[row_label, column_label]
-                assert isinstance(qual_time, stime.Time)
-            except:
-                continue
-            else:
-                if time <= qual_time:
-                    qualified_standards.append(standard)
-
-        return qualified_standards
+        return [TIME_STANDARDS[i] for i in np.flatnonzero(qualified)]
+
+    def get_qualified_standards_batch(
+        self,
+        times: np.ndarray,
+        events: np.ndarray,
+        ages: np.ndarray,
+        sexes: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized get_qualified_standards. Inputs are equal length arrays of times
+        in hundredths, dutil.Event ordinals, ages, and positions in SEXES. Return the
+        ordinal of the fastest standard achieved by each input (NO_STANDARD if none)
+        and a bitmask of every standard achieved (bit i set for ordinal i).
+        """
+        times = np.asarray(times, dtype=np.int64)
+        events = np.asarray(events, dtype=np.intp)
+        ages = np.asarray(ages, dtype=np.intp)
+        sexes = np.asarray(sexes, dtype=np.intp)
+        valid_ages = (ages >= 0) & (ages < MAX_AGE)
+        age_groups = self.age_group_table[:, np.where(valid_ages, ages, 0)]
+        standards = np.arange(len(TIME_STANDARDS))[:, np.newaxis]
+        qual_times = self.table[standards, age_groups, events, sexes]
+        qualified = valid_ages & (age_groups != NO_STANDARD) & (times <= qual_times)
+
+        bits = (1 << standards).astype(np.uint16)
+        masks = (qualified * bits).sum(axis=0, dtype=np.uint16)
+        fastest = np.where(
+            qualified.any(axis=0),
+            len(TIME_STANDARDS) - 1 - qualified[::-1].argmax(axis=0),
+            NO_STANDARD,
+        )
+        return fastest.astype(np.int8), masks
 
     @classmethod
     def get_age_groups(cls, standard: TimeStandard) -> list[dutil.AgeGroup]:
@@ -246,3 +282,181 @@ class TimeStandardInfo:
         Get age groups for a particular time standard.
         """
         return TimeStandardInfo.age_group_types[standard]
+
+
+def get_standards_from_mask(mask: int) -> list[TimeStandard]:
+    """
+    Return standards set in a bitmask from get_qualified_standards_batch, sorted from
+    slowest to fastest.
+    """
+    return [ts for ts in TIME_STANDARDS if int(mask) >> ts.ordinal & 1]
+
+
+def get_row_label(event: dutil.Event) -> str:
+    """
+    Return label of the time standard sheet row holding event.
+    """
+    dist, stroke = event.get_distance(), event.get_stroke()
+    if stroke == sdif.Stroke.FREESTYLE and (dist == 400 or dist == 500):
+        return f"400/500 FR"
+    elif stroke == sdif.Stroke.FREESTYLE and (dist == 800 or dist == 1000):
+        return f"800/1000 FR"
+    elif stroke == sdif.Stroke.FREESTYLE and (dist == 1500 or dist == 1650):
+        return f"1500/1650 FR"
+    else:
+        return f"{dist} {stroke.short()}"
+
+
+def get_column_label(event: dutil.Event, sex: sdif.Sex) -> str:
+    """
+    Return label of the time standard sheet column holding event for sex.
+    """
+    return f"{event.get_course()}-{sex}"
+
+
+def sheet_key(standard: TimeStandard, age_group: dutil.AgeGroup) -> str:
+    return f"sheet-{standard.name}-{age_group.name}"
+
+
+def build_time_standard_manifest() -> dict:
+    """
+    Return manifest describing the inputs of the compiled time standards: the name,
+    size, and modification time of each xlsx file, and the table axes.
+    """
+    files = []
+    for path in TimeStandardInfo.file_paths.values():
+        stat = os.stat(path)
+        files.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    files.sort()
+    return {
+        "format_version": COMPILED_FORMAT_VERSION,
+        "files": files,
+        "standards": [ts.name for ts in TIME_STANDARDS],
+        "age_groups": [ag.name for ag in AGE_GROUPS],
+        "events": [event.name for event in dutil.Event],
+        "sexes": [sex.name for sex in SEXES],
+    }
+
+
+def read_time_standard_sheet(
+    file_path: str, sheet_index: int
+) -> tuple[list[str], list[str], np.ndarray]:
+    """
+    Read one age group sheet of a time standard xlsx file. Return its row labels,
+    column labels, and times in hundredths (0 for blank cells).
+    """
+    import pandas as pd
+
+    df = (
+        pd.read_excel(file_path, sheet_name=sheet_index)
+        .fillna("0")
+        .set_index("Event")
+        .rename_axis(None)
+        .astype(str)
+        .map(lambda x: x[:-1] if x[-1] == "*" else x)
+        .map(
+            lambda x: (
+                stime.create_time_from_str(x).get_total_hundredths() if x != "0" else 0
+            )
+        )
+    )
+    return (
+        [str(label) for label in df.index],
+        [str(label) for label in df.columns],
+        df.to_numpy(dtype=np.int32),
+    )
+
+
+def compile_time_standards(manifest: dict) -> dict[str, np.ndarray]:
+    """
+    Read every time standard xlsx file and return the compiled arrays (see
+    TimeStandardInfo.load_time_standard_data) along with manifest.
+    """
+    num_events = len(dutil.Event)
+    table = np.full(
+        (len(TIME_STANDARDS), len(AGE_GROUPS), num_events, len(SEXES)),
+        NO_STANDARD,
+        dtype=np.int32,
+    )
+    age_group_table = np.full((len(TIME_STANDARDS), MAX_AGE), NO_STANDARD, np.int8)
+    compiled = {"manifest": np.array(json.dumps(manifest, sort_keys=True))}
+
+    for ts in TIME_STANDARDS:
+        file_path = TimeStandardInfo.file_paths[ts]
+        age_groups = TimeStandardInfo.age_group_types[ts]
+
+        # Every age takes the first age group containing it
+        for age in range(MAX_AGE):
+            for ag in age_groups:
+                if age in ag:
+                    age_group_table[ts.ordinal, age] = AGE_GROUP_INDEXES[ag.name]
+                    break
+
+        for sheet_index in range(1, len(age_groups) + 1):
+            age_group = age_groups[sheet_index - 1]
+            rows, columns, times = read_time_standard_sheet(file_path, sheet_index)
+            key = sheet_key(ts, age_group)
+            compiled[f"{key}-rows"] = np.array(rows)
+            compiled[f"{key}-columns"] = np.array(columns)
+            compiled[f"{key}-times"] = times
+
+            # Only cells with a single matching row and column can qualify
+            row_positions = {r: i for i, r in enumerate(rows) if rows.count(r) == 1}
+            column_positions = {
+                c: i for i, c in enumerate(columns) if columns.count(c) == 1
+            }
+            age_group_index = AGE_GROUP_INDEXES[age_group.name]
+            for event in dutil.Event:
+                row = row_positions.get(get_row_label(event))
+                if row is None:
+                    continue
+                for sex in SEXES:
+                    column = column_positions.get(get_column_label(event, sex))
+                    if column is None:
+                        continue
+                    sex_index = SEX_INDEXES[sex.name]
+                    position = (ts.ordinal, age_group_index, event.ordinal, sex_index)
+                    table[position] = times[row, column]
+
+    compiled["table"] = table
+    compiled["age_groups"] = age_group_table
+    return compiled
+
+
+def load_compiled_time_standards(
+    cache_path: str, manifest: dict
+) -> Optional[dict[str, np.ndarray]]:
+    """
+    Return compiled time standards stored at cache_path if they were built from the
+    inputs described by manifest. Return None if the cache is missing, stale, or
+    unreadable.
+    """
+    if not os.path.isfile(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if json.loads(str(data["manifest"])) != manifest:
+                return None
+            return {key: data[key] for key in data.files}
+    except Exception:
+        return None
+
+
+def save_compiled_time_standards(
+    compiled: dict[str, np.ndarray], cache_path: str
+) -> None:
+    """
+    Write compiled time standards to cache_path. The cache is written to a temporary
+    file in the same directory and renamed into place.
+    """
+    cache_directory = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(cache_directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, **compiled)
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
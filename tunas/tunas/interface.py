@@ -224,13 +224,14 @@ def display_full_time_history(swimmer: database.swim.Swimmer) -> None:
     else:
         b_range = f"({min_birth}, {max_birth})"
 
-    # Sort meet results
-    meet_results.sort(
+    # Sort meet results (a copy, so the swimmer's own list keeps its order)
+    meet_results = sorted(
+        meet_results,
         key=lambda mr: (
-            mr.get_event(),
+            mr.get_event().ordinal,
             mr.get_date_of_swim(),
-            mr.get_session(),
-        )
+            mr.get_session().ordinal,
+        ),
     )
 
     # Display swimmer information
@@ -282,10 +283,8 @@ def display_best_times(swimmer: database.swim.Swimmer) -> None:
     print()
 
     # Display best times
-    for event in database.dutil.Event:
-        best_mr = swimmer.get_best_meet_result(event)
-        if best_mr is not None:
-            display_ind_meet_result_info(swimmer, best_mr)
+    for best_mr in DATABASE.get_best_meet_results(swimmer):
+        display_ind_meet_result_info(swimmer, best_mr)
 
 
 def run_time_standard_mode() -> None:
@@ -0,0 +1,564 @@
+"""
+Meet-wide relay lineup optimization.
+"""
+
+from typing import Callable, NamedTuple, Optional
+import datetime
+import heapq
+import itertools
+import time
+
+import database
+import relaygen
+
+
+class RelayEntry(NamedTuple):
+    """
+    One relay event of a meet lineup: num_relays relays of event for swimmers of sex
+    in age_range.
+    """
+
+    event: database.dutil.Event
+    sex: database.sdif.Sex
+    age_range: tuple[int, int]
+    num_relays: int
+
+
+class Lineup(NamedTuple):
+    """
+    Relays for every entry of a lineup, in entry order. optimal is False if the time
+    budget ran out before the lineup was proven optimal.
+    """
+
+    relays: list[list[list[database.swim.Swimmer]]]
+    num_filled: int
+    total_time: database.stime.Time
+    optimal: bool
+    nodes: int
+
+
+# Lineups compare by (number of empty relays, combined time in hundredths)
+LineupKey = tuple[int, int]
+# (entry index, swimmer) pairs a swimmer may not be placed in
+Bans = frozenset[tuple[int, database.swim.Swimmer]]
+# Return the most relays a swimmer may swim, or None if there is no limit
+SwimmerCap = Callable[[database.swim.Swimmer], Optional[int]]
+EntryRelays = list[list[database.swim.Swimmer]]
+
+# Share of the time budget spent choosing penalties before branch and bound
+PENALTY_TIME_SHARE = 0.3
+MAX_PENALTY_ITERATIONS = 150
+
+
+class EntrySolver:
+    """
+    Solve entries of a lineup on their own, with some swimmers banned from some
+    entries, caching every solution. penalties[i][swimmer] is added to each of the
+    swimmer's times in entry i.
+    """
+
+    def __init__(
+        self,
+        entries: list[RelayEntry],
+        entry_candidates: list[list[relaygen.LegCandidates]],
+        penalties: Optional[list[dict[database.swim.Swimmer, int]]] = None,
+    ) -> None:
+        if penalties is not None:
+            entry_candidates = [
+                [
+                    sorted(
+                        (
+                            (s, t + database.stime.Time.from_hundredths(pen[s]))
+                            if s in pen
+                            else (s, t)
+                            for s, t in leg
+                        ),
+                        key=lambda x: x[1],
+                    )
+                    for leg in candidates
+                ]
+                for candidates, pen in zip(entry_candidates, penalties)
+            ]
+        self.entries = entries
+        self.entry_candidates = entry_candidates
+        self.leg_times = [
+            [{s: t.get_total_hundredths() for s, t in leg} for leg in candidates]
+            for candidates in entry_candidates
+        ]
+        self.cache: dict[tuple[int, frozenset], tuple[LineupKey, EntryRelays]] = dict()
+
+    def get_key(self, i: int, relays: EntryRelays) -> LineupKey:
+        """
+        Return the key of relays for entry i.
+        """
+        return (
+            sum(1 for relay in relays if not relay),
+            sum(
+                times[s]
+                for relay in relays
+                for times, s in zip(self.leg_times[i], relay)
+            ),
+        )
+
+    def get_lineup_key(self, lineup: list[EntryRelays]) -> LineupKey:
+        """
+        Return the key of a lineup of relays for every entry.
+        """
+        keys = [self.get_key(i, relays) for i, relays in enumerate(lineup)]
+        return sum(key[0] for key in keys), sum(key[1] for key in keys)
+
+    def solve_entry(
+        self, i: int, banned: frozenset[database.swim.Swimmer]
+    ) -> tuple[LineupKey, EntryRelays]:
+        """
+        Return the key and relays of entry i's best relays without banned swimmers.
+        """
+        if (i, banned) in self.cache:
+            return self.cache[(i, banned)]
+        entry = self.entries[i]
+        leg_candidates = [
+            [c for c in leg if c[0] not in banned] for leg in self.entry_candidates[i]
+        ]
+        if entry.sex == database.sdif.Sex.MIXED:
+            solve = relaygen.solve_mixed_relays
+        else:
+            solve = relaygen.solve_relays
+        relays = solve(
+            leg_candidates, entry.num_relays, relaygen.RelayObjective.TOTAL_TIME
+        )
+        self.cache[(i, banned)] = (self.get_key(i, relays), relays)
+        return self.cache[(i, banned)]
+
+    def solve(self, bans: Bans) -> tuple[LineupKey, list[EntryRelays]]:
+        """
+        Return the combined key and relays of every entry solved on its own.
+        """
+        key = (0, 0)
+        lineup = []
+        for i in range(len(self.entries)):
+            banned = frozenset(s for j, s in bans if j == i)
+            entry_key, relays = self.solve_entry(i, banned)
+            key = (key[0] + entry_key[0], key[1] + entry_key[1])
+            lineup.append(relays)
+        return key, lineup
+
+    def solve_greedy(
+        self,
+        get_cap: SwimmerCap,
+        exclusive_entries: list[tuple[int, int]],
+    ) -> list[EntryRelays]:
+        """
+        Return a lineup that breaks no rule, solving entries one at a time without
+        the swimmers that earlier entries have used up.
+        """
+        counts: dict[database.swim.Swimmer, int] = dict()
+        lineup: list[EntryRelays] = []
+        for i in range(len(self.entries)):
+            banned = set()
+            for leg in self.entry_candidates[i]:
+                for s, _ in leg:
+                    cap = get_cap(s)
+                    if cap is not None and counts.get(s, 0) >= cap:
+                        banned.add(s)
+            for a, b in exclusive_entries:
+                j = b if a == i else a if b == i else None
+                if j is not None and j < i:
+                    banned.update(s for relay in lineup[j] for s in relay)
+            _, relays = self.solve_entry(i, frozenset(banned))
+            for relay in relays:
+                for swimmer in relay:
+                    counts[swimmer] = counts.get(swimmer, 0) + 1
+            lineup.append(relays)
+        return lineup
+
+
+def get_swimmer_entries(
+    lineup: list[EntryRelays],
+) -> dict[database.swim.Swimmer, list[int]]:
+    """
+    Return the entries every swimmer in lineup swims.
+    """
+    swimmer_entries: dict[database.swim.Swimmer, list[int]] = dict()
+    for i, relays in enumerate(lineup):
+        for relay in relays:
+            for swimmer in relay:
+                swimmer_entries.setdefault(swimmer, []).append(i)
+    return swimmer_entries
+
+
+def find_conflict(
+    lineup: list[EntryRelays],
+    get_cap: SwimmerCap,
+    exclusive_entries: list[tuple[int, int]],
+) -> Optional[list[tuple[int, database.swim.Swimmer]]]:
+    """
+    Return the bans to branch on for a swimmer that breaks a rule in lineup (one ban
+    per entry they could be removed from), or None if lineup breaks no rule.
+    """
+    for swimmer, entry_indexes in get_swimmer_entries(lineup).items():
+        cap = get_cap(swimmer)
+        if cap is not None and len(entry_indexes) > cap:
+            return [(i, swimmer) for i in entry_indexes]
+        for i, j in exclusive_entries:
+            if i in entry_indexes and j in entry_indexes:
+                return [(i, swimmer), (j, swimmer)]
+    return None
+
+
+class LineupSearch:
+    """
+    Search for the best lineup that breaks no rule.
+
+    Solving each entry on its own bounds every lineup below, but the bound is weak
+    when many swimmers are wanted in more entries than they may swim. Penalizing
+    those swimmers' times (a Lagrangian relaxation of the rules, with penalties
+    chosen by subgradient steps) gives a much tighter bound, and every penalized
+    lineup is repaired into a lineup that breaks no rule. Branch and bound then
+    works on the unpenalized entries, pruning with both bounds.
+    """
+
+    def __init__(
+        self,
+        entries: list[RelayEntry],
+        entry_candidates: list[list[relaygen.LegCandidates]],
+        get_cap: SwimmerCap,
+        exclusive_entries: list[tuple[int, int]],
+    ) -> None:
+        self.entries = entries
+        self.entry_candidates = entry_candidates
+        self.get_cap = get_cap
+        self.exclusive_entries = exclusive_entries
+        self.solver = EntrySolver(entries, entry_candidates)
+        self.best_relays = self.solver.solve_greedy(get_cap, exclusive_entries)
+        self.best_key = self.solver.get_lineup_key(self.best_relays)
+        # Solver for the penalties with the best bound, and the constant subtracted
+        # from its keys to make them bounds
+        self.bounding_solver: Optional[EntrySolver] = None
+        self.bound_offset = 0
+        self.nodes = 0
+
+    def update_best(self, lineup: list[EntryRelays]) -> None:
+        """
+        Keep lineup if it breaks no rule and beats the best lineup so far.
+        """
+        key = self.solver.get_lineup_key(lineup)
+        if key < self.best_key:
+            if find_conflict(lineup, self.get_cap, self.exclusive_entries) is None:
+                self.best_key, self.best_relays = key, lineup
+
+    def get_bound(self, bans: Bans) -> LineupKey:
+        """
+        Return a lower bound on every lineup without the banned swimmers.
+        """
+        key, _ = self.solver.solve(bans)
+        if self.bounding_solver is not None:
+            penalized_key, _ = self.bounding_solver.solve(bans)
+            key = max(key, (penalized_key[0], penalized_key[1] - self.bound_offset))
+        return key
+
+    def choose_penalties(self, deadline: float) -> bool:
+        """
+        Choose swimmer penalties that tighten the bound, improving the best lineup
+        along the way. Return True if the best lineup is proven optimal.
+        """
+        # Penalty per entry swum for a capped swimmer, and for a swimmer in an
+        # exclusive pair, in whole hundredths
+        cap_prices: dict[database.swim.Swimmer, int] = dict()
+        pair_prices: dict[tuple[database.swim.Swimmer, int], int] = dict()
+        best_bound = None
+        step_size = 2.0
+        stalled = 0
+        for _ in range(MAX_PENALTY_ITERATIONS):
+            if time.perf_counter() > deadline:
+                break
+            penalties: list[dict[database.swim.Swimmer, int]] = [
+                dict() for _ in self.entries
+            ]
+            for swimmer, price in cap_prices.items():
+                for pen in penalties:
+                    pen[swimmer] = price
+            for (swimmer, p), price in pair_prices.items():
+                for i in self.exclusive_entries[p]:
+                    penalties[i][swimmer] = penalties[i].get(swimmer, 0) + price
+            offset = sum(cap_prices[s] * self.get_cap(s) for s in cap_prices)
+            offset += sum(pair_prices.values())
+
+            solver = EntrySolver(self.entries, self.entry_candidates, penalties)
+            key, lineup = solver.solve(frozenset())
+            bound = (key[0], key[1] - offset)
+            if best_bound is None or bound > best_bound:
+                best_bound = bound
+                self.bounding_solver, self.bound_offset = solver, offset
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled == 5:
+                    step_size /= 2
+                    stalled = 0
+
+            self.update_best(lineup)
+            self.update_best(solver.solve_greedy(self.get_cap, self.exclusive_entries))
+            if bound >= self.best_key:
+                return True
+
+            # Subgradient: how far each rule is broken (negative if it has slack).
+            # Rules only get a price once they are broken.
+            swimmer_entries = get_swimmer_entries(lineup)
+            cap_gradient = dict()
+            for swimmer in set(swimmer_entries) | set(cap_prices):
+                cap = self.get_cap(swimmer)
+                used = len(swimmer_entries.get(swimmer, []))
+                if cap is not None and (used > cap or swimmer in cap_prices):
+                    cap_gradient[swimmer] = used - cap
+            pair_gradient = dict()
+            for p, (i, j) in enumerate(self.exclusive_entries):
+                for swimmer, entry_indexes in swimmer_entries.items():
+                    if i in entry_indexes and j in entry_indexes:
+                        pair_gradient[(swimmer, p)] = 1
+            for swimmer, p in pair_prices:
+                if (swimmer, p) not in pair_gradient:
+                    entry_indexes = swimmer_entries.get(swimmer, [])
+                    used = sum(i in entry_indexes for i in self.exclusive_entries[p])
+                    pair_gradient[(swimmer, p)] = used - 1
+            norm = sum(g * g for g in cap_gradient.values())
+            norm += sum(g * g for g in pair_gradient.values())
+            if norm == 0 or step_size < 0.01:
+                break
+
+            if self.best_key[0] == bound[0]:
+                gap = self.best_key[1] - bound[1]
+            else:
+                gap = bound[1] // 20
+            step = step_size * max(gap, 1) / norm
+            for prices, gradient in [
+                (cap_prices, cap_gradient),
+                (pair_prices, pair_gradient),
+            ]:
+                for k, g in gradient.items():
+                    price = max(0, prices.get(k, 0) + round(step * g))
+                    if price:
+                        prices[k] = price
+                    else:
+                        prices.pop(k, None)
+        return False
+
+    def branch_and_bound(self, deadline: float) -> bool:
+        """
+        Search lineups best bound first until the best lineup is proven optimal or
+        the deadline passes. Return True if the best lineup is proven optimal.
+        """
+        root: Bans = frozenset()
+        heap = [(self.get_bound(root), 0, root)]
+        seen = {root}
+        counter = itertools.count(1)
+        while heap:
+            if time.perf_counter() > deadline:
+                return False
+            bound, _, bans = heapq.heappop(heap)
+            if bound >= self.best_key:
+                # No remaining lineup can beat the best one found
+                return True
+            self.nodes += 1
+            # Branch on the penalized lineup first, since its bound is the tighter
+            branches = None
+            if self.bounding_solver is not None:
+                _, lineup = self.bounding_solver.solve(bans)
+                self.update_best(lineup)
+                branches = find_conflict(lineup, self.get_cap, self.exclusive_entries)
+            if branches is None:
+                _, lineup = self.solver.solve(bans)
+                branches = find_conflict(lineup, self.get_cap, self.exclusive_entries)
+            if branches is None:
+                # Best lineup without the banned swimmers
+                self.update_best(lineup)
+                continue
+            for ban in branches:
+                child = bans | {ban}
+                if child in seen:
+                    continue
+                seen.add(child)
+                child_bound = self.get_bound(child)
+                if child_bound < self.best_key:
+                    heapq.heappush(heap, (child_bound, next(counter), child))
+        return True
+
+
+def optimize_lineup(
+    entries: list[RelayEntry],
+    entry_candidates: list[list[relaygen.LegCandidates]],
+    get_cap: SwimmerCap,
+    exclusive_entries: list[tuple[int, int]],
+    time_budget: float,
+) -> Lineup:
+    """
+    Return the best lineup for entries found within time_budget seconds, given the
+    eligible swimmers and their times for each leg of every entry, fastest first.
+    See LineupOptimizer for the rules.
+    """
+    start = time.perf_counter()
+    search = LineupSearch(entries, entry_candidates, get_cap, exclusive_entries)
+    optimal = search.choose_penalties(
+        start + time_budget * PENALTY_TIME_SHARE
+    ) or search.branch_and_bound(start + time_budget)
+
+    num_slots = sum(entry.num_relays for entry in entries)
+    return Lineup(
+        relays=search.best_relays,
+        num_filled=num_slots - search.best_key[0],
+        total_time=database.stime.Time.from_hundredths(search.best_key[1]),
+        optimal=optimal,
+        nodes=search.nodes,
+    )
+
+
+class LineupOptimizer:
+    """
+    Generate relays for several entries at once. Every swimmer swims at most their
+    relay cap, and no swimmer swims both entries of an exclusive pair. Lineups fill
+    as many relays as possible, then minimize the combined time of every relay.
+
+    Lineups are found by branch and bound (see LineupSearch). When a swimmer breaks
+    a rule, the search branches on which of their entries they are removed from. A
+    lineup that breaks no rule is kept as the best so far from the start, so one is
+    always returned when the time budget runs out.
+    """
+
+    def __init__(
+        self,
+        db: database.Database,
+        club: database.swim.Club,
+        entries: list[RelayEntry],
+        relay_date: datetime.date = datetime.date.today(),
+        max_relays_per_swimmer: Optional[int] = None,
+        exclusive_entries: Optional[list[tuple[int, int]]] = None,
+        time_budget: float = 2.0,
+    ) -> None:
+        self.set_database(db)
+        self.set_club(club)
+        self.set_entries(entries)
+        self.set_relay_date(relay_date)
+        self.set_max_relays_per_swimmer(max_relays_per_swimmer)
+        self.set_exclusive_entries(exclusive_entries or [])
+        self.set_time_budget(time_budget)
+        self.set_excluded_swimmers(set())
+        self.swimmer_caps: dict[database.swim.Swimmer, int] = dict()
+
+    def set_database(
+        self, db: database.Database | database.sqlstore.SqliteDatabase
+    ) -> None:
+        assert type(db) in (database.Database, database.sqlstore.SqliteDatabase)
+        self.db = db
+
+    def set_club(self, club: database.swim.Club) -> None:
+        assert type(club) == database.swim.Club
+        self.club = club
+
+    def set_entries(self, entries: list[RelayEntry]) -> None:
+        assert type(entries) == list and len(entries) > 0
+        for entry in entries:
+            assert type(entry) == RelayEntry
+            assert entry.num_relays > 0
+        self.entries = entries
+
+    def set_relay_date(self, relay_date: datetime.date) -> None:
+        assert type(relay_date) == datetime.date
+        self.relay_date = relay_date
+
+    def set_max_relays_per_swimmer(self, max_relays: Optional[int]) -> None:
+        assert max_relays is None or (type(max_relays) == int and max_relays >= 0)
+        self.max_relays_per_swimmer = max_relays
+
+    def set_exclusive_entries(self, exclusive_entries: list[tuple[int, int]]) -> None:
+        assert type(exclusive_entries) == list
+        for i, j in exclusive_entries:
+            assert 0 <= i < len(self.entries) and 0 <= j < len(self.entries)
+            assert i != j
+        self.exclusive_entries = exclusive_entries
+
+    def set_time_budget(self, time_budget: float) -> None:
+        assert time_budget > 0
+        self.time_budget = time_budget
+
+    def set_excluded_swimmers(
+        self, excluded_swimmers: set[database.swim.Swimmer]
+    ) -> None:
+        assert type(excluded_swimmers) == set
+        for s in excluded_swimmers:
+            assert type(s) == database.swim.Swimmer
+        self.excluded_swimmers = excluded_swimmers
+
+    def set_swimmer_cap(self, swimmer: database.swim.Swimmer, max_relays: int) -> None:
+        """
+        Limit swimmer to max_relays relays, overriding max_relays_per_swimmer.
+        """
+        assert type(swimmer) == database.swim.Swimmer
+        assert type(max_relays) == int and max_relays >= 0
+        self.swimmer_caps[swimmer] = max_relays
+
+    def get_database(self) -> database.Database:
+        return self.db
+
+    def get_club(self) -> database.swim.Club:
+        return self.club
+
+    def get_entries(self) -> list[RelayEntry]:
+        return self.entries
+
+    def get_relay_date(self) -> datetime.date:
+        return self.relay_date
+
+    def get_max_relays_per_swimmer(self) -> Optional[int]:
+        return self.max_relays_per_swimmer
+
+    def get_exclusive_entries(self) -> list[tuple[int, int]]:
+        return self.exclusive_entries
+
+    def get_time_budget(self) -> float:
+        return self.time_budget
+
+    def get_excluded_swimmers(self) -> set[database.swim.Swimmer]:
+        return self.excluded_swimmers
+
+    def get_swimmer_cap(self, swimmer: database.swim.Swimmer) -> Optional[int]:
+        """
+        Return the most relays swimmer may swim, or None if there is no limit.
+        """
+        return self.swimmer_caps.get(swimmer, self.get_max_relays_per_swimmer())
+
+    def exclude_swimmer(self, swimmer: database.swim.Swimmer):
+        """
+        Exclude swimmer from every entry. If swimmer was already excluded, this does
+        nothing.
+        """
+        assert type(swimmer) == database.swim.Swimmer
+        self.excluded_swimmers.add(swimmer)
+
+    def get_entry_candidates(self, entry: RelayEntry) -> list[relaygen.LegCandidates]:
+        """
+        Return eligible swimmers and their best times for each leg of entry, fastest
+        first.
+        """
+        generator = relaygen.RelayGenerator(
+            self.get_database(),
+            self.get_club(),
+            self.get_relay_date(),
+            num_relays=entry.num_relays,
+            sex=entry.sex,
+            course=entry.event.get_course(),
+            age_range=entry.age_range,
+        )
+        generator.set_excluded_swimmers(set(self.get_excluded_swimmers()))
+        return generator.get_leg_candidates(entry.event)
+
+    def optimize(self) -> Lineup:
+        """
+        Return the best lineup found within the time budget.
+        """
+        entries = self.get_entries()
+        return optimize_lineup(
+            entries,
+            [self.get_entry_candidates(entry) for entry in entries],
+            self.get_swimmer_cap,
+            self.get_exclusive_entries(),
+            self.get_time_budget(),
+        )
@@ -3,288 +3,874 @@ Parser for tunas application. Handle reading data and creating underlying data
 structure for higher level application code.
 """
 
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, NamedTuple, Optional
 import os
+import collections
 import datetime
+import enum
+import hashlib
+import typing
+import zipfile
+import contextlib
+import concurrent.futures
 
 import database
 import util
 
 
-def read_cl2(file_path: str) -> database.Database:
+def read_cl2(file_path: str, workers: int = 1) -> database.Database:
     """
-    Return database object containing data from all cl2 files in file_path.
+    Return database object containing data from all cl2 files in file_path. Zip
+    archives in file_path are read as well: their cl2 members are streamed straight
+    out of the archive without extracting it.
+
+    If workers is greater than 1, files are parsed by a pool of worker processes into
+    partial results made of plain values (see read_partial), which are cheap to send
+    back. This process then reconciles them into the database in file order (see
+    Cl2Processor.reconcile), so the resulting database is identical to a serial load.
+    At most two files per worker are parsed ahead of the reconcile phase, so parsed
+    files do not pile up in memory.
     """
+    assert type(workers) == int and workers > 0
     db = database.Database()
     processor = Cl2Processor(db)
+    sources = find_cl2_sources(file_path)
+
+    # Load cl2 files into database. Files whose content was already loaded are skipped.
+    print("Loading files...")
+    files_read = 0
+    if workers == 1:
+        for source in sources:
+            file_hash, records = read_records(source)
+            if not db.has_ingested_file(file_hash):
+                processor.process_records(records)
+                db.add_ingested_file(file_hash, str(source))
+            files_read += 1
+            print(f"Files read: {files_read}", end="\r")
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: collections.deque[concurrent.futures.Future] = collections.deque()
+            for source in sources:
+                pending.append(executor.submit(read_partial, source))
+                if len(pending) < 2 * workers:
+                    continue
+                files_read += reconcile_next(db, processor, pending)
+                print(f"Files read: {files_read}", end="\r")
+            while pending:
+                files_read += reconcile_next(db, processor, pending)
+                print(f"Files read: {files_read}", end="\r")
+    print()
+
+    return db
+
+
+def reconcile_next(
+    db: database.Database,
+    processor: "Cl2Processor",
+    pending: collections.deque[concurrent.futures.Future],
+) -> int:
+    """
+    Wait for the oldest parse in pending and reconcile it into db unless its content
+    was already ingested. Return the number of files read (1).
+    """
+    source, file_hash, rows = pending.popleft().result()
+    if not db.has_ingested_file(file_hash):
+        processor.reconcile(rows)
+        db.add_ingested_file(file_hash, str(source))
+    return 1
+
+
+class Cl2Source(NamedTuple):
+    """
+    A cl2 file on disk (member is None), or a cl2 member of the zip archive at path.
+    """
+
+    path: str
+    member: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self.member is None:
+            return self.path
+        return os.path.join(self.path, self.member)
 
-    # Get cl2 file paths
+
+def find_meet_data_files(file_path: str) -> list[str]:
+    """
+    Return paths of all cl2 files and zip archives in file_path, in directory walk
+    order.
+    """
     paths = []
     for root, _, files in os.walk(file_path):
         for f in files:
-            if f.endswith(".cl2"):
+            if f.endswith(".cl2") or f.endswith(".zip"):
                 full_file_path = os.path.join(root, f)
                 paths.append(full_file_path)
+    return paths
 
-    # Load cl2 files into database
-    print("Loading files...")
-    files_read = 0
-    for p in paths:
-        processor.read_file(p)
-        files_read += 1
-        print(f"Files read: {files_read}", end="\r")
-    print()
 
-    return db
+def list_cl2_sources(path: str) -> list[Cl2Source]:
+    """
+    Return cl2 sources in the file at path: the file itself if it is a cl2 file, or
+    its cl2 members if it is a zip archive. Unreadable archives have no sources.
+    """
+    if not path.endswith(".zip"):
+        return [Cl2Source(path)]
+    try:
+        with zipfile.ZipFile(path) as archive:
+            members = archive.namelist()
+    except zipfile.BadZipFile:
+        return []
+    return [Cl2Source(path, m) for m in members if m.endswith(".cl2")]
+
+
+def find_cl2_sources(file_path: str) -> list[Cl2Source]:
+    """
+    Return all cl2 sources in file_path (see list_cl2_sources).
+    """
+    sources = []
+    for path in find_meet_data_files(file_path):
+        sources.extend(list_cl2_sources(path))
+    return sources
+
+
+@contextlib.contextmanager
+def open_cl2(path: str, member: Optional[str] = None) -> Iterator[BinaryIO]:
+    """
+    Open cl2 file at path, or cl2 member of zip archive at path, for binary reading.
+    Zip members are decompressed as they are read.
+    """
+    if member is None:
+        assert os.path.isfile(path)
+        assert path.endswith(".cl2")
+        with open(path, "rb") as file:
+            yield file
+    else:
+        assert member.endswith(".cl2")
+        with zipfile.ZipFile(path) as archive, archive.open(member) as file:
+            yield file
+
+
+class B1Record(NamedTuple):
+    """
+    Meet record (B1 line).
+    """
+
+    organization: database.sdif.Organization
+    name: str
+    city: str
+    address_one: str
+    start_date: datetime.date
+    end_date: datetime.date
+    state: Optional[database.sdif.State]
+    address_two: Optional[str]
+    postal_code: Optional[str]
+    country: Optional[database.sdif.Country]
+    course: Optional[database.sdif.Course]
+    altitude: Optional[int]
+    meet_type: Optional[database.sdif.MeetType]
+
+
+class C1Record(NamedTuple):
+    """
+    Team record (C1 line). Unattached teams only set the unattached flag.
+    """
+
+    unattached: bool
+    organization: Optional[database.sdif.Organization] = None
+    team_code: Optional[str] = None
+    lsc: Optional[database.sdif.LSC] = None
+    full_name: Optional[str] = None
+    abbreviated_name: Optional[str] = None
+    address_one: Optional[str] = None
+    address_two: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[database.sdif.State] = None
+    postal_code: Optional[str] = None
+    country: Optional[database.sdif.Country] = None
+    region: Optional[database.sdif.Region] = None
+
+
+class D0Record(NamedTuple):
+    """
+    Individual event record (D0 line).
+    """
+
+    organization: database.sdif.Organization
+    first_name: str
+    middle_initial: Optional[str]
+    last_name: str
+    usa_id_short: str
+    is_new_id: bool
+    attach_status: database.sdif.AttachStatus
+    citizenship: Optional[database.sdif.Country]
+    birthday: Optional[datetime.date]
+    age_class: str
+    swimmer_sex: database.sdif.Sex
+    event_sex: database.sdif.Sex
+    event_distance: int
+    event_stroke: database.sdif.Stroke
+    event_number: str
+    event_min_age: int
+    event_max_age: int
+    event_date: datetime.date
+    seed_time: Optional[database.stime.Time]
+    seed_course: Optional[database.sdif.Course]
+    prelim_time: Optional[database.stime.Time]
+    prelim_course: Optional[database.sdif.Course]
+    prelim_heat: Optional[int]
+    prelim_lane: Optional[int]
+    prelim_place: Optional[int]
+    swim_off_time: Optional[database.stime.Time]
+    swim_off_course: Optional[database.sdif.Course]
+    finals_time: Optional[database.stime.Time]
+    finals_course: Optional[database.sdif.Course]
+    finals_heat: Optional[int]
+    finals_lane: Optional[int]
+    finals_place: Optional[int]
+    points: Optional[float]
+
+
+class InvalidD0Record(NamedTuple):
+    """
+    D0 line that could not be read. Resets the current swimmer.
+    """
+
+
+class D3Record(NamedTuple):
+    """
+    Individual information record (D3 line).
+    """
+
+    full_id: str
+    preferred_first_name: str
+
+
+class Z0Record(NamedTuple):
+    """
+    File terminator record (Z0 line).
+    """
+
+
+Record = B1Record | C1Record | D0Record | InvalidD0Record | D3Record | Z0Record
+RECORD_TYPES = (B1Record, C1Record, D0Record, InvalidD0Record, D3Record, Z0Record)
+
+# Encoded record: position of its type in RECORD_TYPES followed by its fields as plain
+# values (enums as member positions, dates as ordinals, and times as hundredths)
+RecordRow = tuple
+
+
+def get_field_codec(hint: Any) -> Optional[tuple[Callable, Callable]]:
+    """
+    Return (encode, decode) functions for record fields with type hint, or None if
+    values of the field are already plain values. None values are never encoded.
+    """
+    args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+    field_type = args[0] if len(args) == 1 else hint
+    if isinstance(field_type, type) and issubclass(field_type, enum.Enum):
+        members = list(field_type)
+        positions = {member: i for i, member in enumerate(members)}
+        return positions.__getitem__, members.__getitem__
+    if field_type is datetime.date:
+        return datetime.date.toordinal, datetime.date.fromordinal
+    if field_type is database.stime.Time:
+        return (
+            database.stime.Time.get_total_hundredths,
+            database.stime.Time.from_hundredths,
+        )
+    return None
+
+
+RECORD_CODECS = [
+    [get_field_codec(hint) for hint in typing.get_type_hints(record_type).values()]
+    for record_type in RECORD_TYPES
+]
+RECORD_TYPE_POSITIONS = {t: i for i, t in enumerate(RECORD_TYPES)}
+
+
+def encode_record(record: Record) -> RecordRow:
+    """
+    Return record as a tuple of plain values (see decode_record).
+    """
+    position = RECORD_TYPE_POSITIONS[type(record)]
+    return (position,) + tuple(
+        value if codec is None or value is None else codec[0](value)
+        for value, codec in zip(record, RECORD_CODECS[position])
+    )
+
+
+def decode_record(row: RecordRow) -> Record:
+    """
+    Return record encoded as row by encode_record.
+    """
+    position = row[0]
+    return RECORD_TYPES[position]._make(
+        value if codec is None or value is None else codec[1](value)
+        for value, codec in zip(row[1:], RECORD_CODECS[position])
+    )
+
+
+def read_records(source: Cl2Source) -> tuple[str, list[Record]]:
+    """
+    Return content hash and records of cl2 source. The file is streamed one line at
+    a time and each line is hashed as it is parsed, so the file is only read once
+    and never held in memory; only its parsed records are kept, so that they can be
+    skipped if the hash shows the file was already ingested.
+    """
+    digest = hashlib.sha256()
+
+    def hashed_lines(file: BinaryIO) -> Iterator[bytes]:
+        for line in file:
+            digest.update(line)
+            yield line
+
+    with open_cl2(*source) as file:
+        records = list(iter_line_records(hashed_lines(file)))
+    return digest.hexdigest(), records
+
+
+def read_partial(source: Cl2Source) -> tuple[Cl2Source, str, list[RecordRow]]:
+    """
+    Return source, content hash, and encoded records of cl2 source. Run by worker
+    processes: rows are made of plain values, so they are much cheaper to pickle
+    back than records holding enum members, dates, and times.
+    """
+    file_hash, records = read_records(source)
+    return source, file_hash, [encode_record(record) for record in records]
+
+
+def iter_records(path: str, member: Optional[str] = None) -> Iterator[Record]:
+    """
+    Yield records of cl2 file specified at path in file order. If path is a zip
+    archive, yield records of member, or of every cl2 member if member is None.
+
+    The file is read one line at a time in binary mode and fields are sliced from the
+    raw bytes, so memory use does not grow with the size of the file. Parsing does
+    not touch any database, so files can be parsed independently (e.g. in worker
+    processes).
+    """
+    if member is None and path.endswith(".zip"):
+        for source in list_cl2_sources(path):
+            yield from iter_records(*source)
+        return
+
+    with open_cl2(path, member) as file:
+        yield from iter_line_records(file)
+
+
+def iter_line_records(lines: Iterable[bytes]) -> Iterator[Record]:
+    """
+    Yield records of raw cl2 lines (as read from a file in binary mode) in order.
+    """
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        header = line[:2]
+        match header:
+            case b"B1":
+                yield parse_b1(line)
+            case b"C1":
+                yield parse_c1(line)
+            case b"D0":
+                yield parse_d0(line)
+            case b"D3":
+                yield parse_d3(line)
+            case b"Z0":
+                yield Z0Record()
+
+
+def decode_field(line: bytes, start: int, end: int) -> str:
+    """
+    Return field at bytes start:end of line as a string without surrounding spaces.
+    """
+    return line[start:end].strip().decode("utf-8", errors="replace")
+
+
+def parse_b1(line: bytes) -> B1Record:
+    """
+    Parse B1 line in cl2 file.
+    """
+    org_code_str = decode_field(line, 2, 3)
+    name_str = decode_field(line, 11, 41)
+    address_one_str = decode_field(line, 41, 63)
+    address_two_str = decode_field(line, 63, 85)
+    city_str = decode_field(line, 85, 105)
+    state_str = decode_field(line, 105, 107)
+    postal_code_str = decode_field(line, 107, 117)
+    country_code_str = decode_field(line, 117, 120)
+    meet_type_str = decode_field(line, 120, 121)
+    start_date_str = decode_field(line, 121, 129)
+    end_date_str = decode_field(line, 129, 137)
+    altitude_str = decode_field(line, 137, 141)
+    course_code_str = decode_field(line, 149, 150)
+
+    # Parse start date and end date
+    start_date_year = int(start_date_str[4:])
+    start_date_month = int(start_date_str[:2])
+    start_date_day = int(start_date_str[2:4])
+    end_date_year = int(end_date_str[4:])
+    end_date_month = int(end_date_str[:2])
+    end_date_day = int(end_date_str[2:4])
+
+    # Parse data
+    organization = database.sdif.Organization(org_code_str)
+    name = name_str
+    city = city_str
+    address_one = address_one_str
+    start_date = datetime.date(start_date_year, start_date_month, start_date_day)
+    end_date = datetime.date(end_date_year, end_date_month, end_date_day)
+    if address_two_str != "":
+        address_two = address_two_str
+    else:
+        address_two = None
+    if state_str != "":
+        state = database.sdif.State(state_str)
+    else:
+        state = None
+    if postal_code_str != "":
+        postal_code = postal_code_str
+    else:
+        postal_code = None
+    if country_code_str != "":
+        country = database.sdif.Country(country_code_str)
+    else:
+        country = None
+    if course_code_str != "":
+        standardized_course = util.standardize_course(course_code_str)
+        course = database.sdif.Course(standardized_course)
+    else:
+        course = None
+    if altitude_str != "":
+        altitude = int(altitude_str)
+    else:
+        altitude = None
+    if meet_type_str != "":
+        meet_type = database.sdif.MeetType(meet_type_str)
+    else:
+        meet_type = None
+
+    return B1Record(
+        organization,
+        name,
+        city,
+        address_one,
+        start_date,
+        end_date,
+        state,
+        address_two,
+        postal_code,
+        country,
+        course,
+        altitude,
+        meet_type,
+    )
+
+
+def parse_c1(line: bytes) -> C1Record:
+    """
+    Parse C1 line in cl2 file.
+    """
+    org_code_str = decode_field(line, 2, 3)
+    lsc_code_str = decode_field(line, 11, 13)
+    team_code_str = decode_field(line, 13, 17)
+    full_name_str = decode_field(line, 17, 47)
+    abbreviated_name_str = decode_field(line, 47, 63)
+    address_one_str = decode_field(line, 63, 85)
+    address_two_str = decode_field(line, 85, 107)
+    city_str = decode_field(line, 107, 127)
+    state_str = decode_field(line, 127, 129)
+    postal_code_str = decode_field(line, 129, 139)
+    country_code_str = decode_field(line, 139, 142)
+    region_str = decode_field(line, 142, 143)
+
+    def is_unattached() -> bool:
+        """
+        Return true if line is an unattached club.
+        """
+        if lsc_code_str == "UN" or team_code_str.upper() == "UN":
+            return True
+        if "unattached" in full_name_str.lower():
+            return True
+        if "UN" in team_code_str.upper() and (
+            "unat" in full_name_str.lower() or "unnat" in full_name_str.lower()
+        ):
+            return True
+        return False
+
+    if is_unattached():
+        return C1Record(True)
+
+    # Parse string data
+    organization = database.sdif.Organization(org_code_str)
+    full_name = full_name_str
+    team_code = team_code_str
+    if lsc_code_str in database.sdif.LSC:
+        lsc = database.sdif.LSC(lsc_code_str)
+    else:
+        lsc = None
+    if abbreviated_name_str != "":
+        abbreviated_name = abbreviated_name_str
+    else:
+        abbreviated_name = None
+    if address_one_str != "":
+        address_one = address_one_str
+    else:
+        address_one = None
+    if address_two_str != "":
+        address_two = address_two_str
+    else:
+        address_two = None
+    if city_str != "":
+        city = city_str
+    else:
+        city = None
+    if state_str != "" and state_str in database.sdif.State:
+        state = database.sdif.State(state_str)
+    else:
+        state = None
+    if postal_code_str != "":
+        postal_code = postal_code_str
+    else:
+        postal_code = None
+    if country_code_str != "" and country_code_str in database.sdif.Country:
+        country = database.sdif.Country(country_code_str)
+    else:
+        country = None
+    if region_str != "":
+        region = database.sdif.Region(region_str)
+    else:
+        region = None
+
+    return C1Record(
+        False,
+        organization,
+        team_code,
+        lsc,
+        full_name,
+        abbreviated_name,
+        address_one,
+        address_two,
+        city,
+        state,
+        postal_code,
+        country,
+        region,
+    )
+
+
+def parse_d0(line: bytes) -> D0Record | InvalidD0Record:
+    """
+    Parse D0 line in cl2 file. Numeric and time fields are kept as bytes and only
+    decoded when they hold a value.
+    """
+    ignored_results = [b"NT", b"NS", b"DNF", b"DQ", b"SCR"]
+    org_code_str = decode_field(line, 2, 3)
+    full_name_str = decode_field(line, 11, 39)
+    swimmer_short_id_str = decode_field(line, 39, 51)
+    attach_code_str = decode_field(line, 51, 52)
+    citizen_code_str = decode_field(line, 52, 55)
+    b_month_bytes = line[55:57].strip()
+    b_day_bytes = line[57:59].strip()
+    b_year_bytes = line[59:63].strip()
+    age_class_str = decode_field(line, 63, 65)
+    swimmer_sex_str = decode_field(line, 65, 66)
+    event_sex_str = decode_field(line, 66, 67)
+    event_distance_bytes = line[67:71]
+    event_stroke_str = decode_field(line, 71, 72)
+    event_number_str = decode_field(line, 72, 76)
+    event_age_code_bytes = line[76:80].strip()
+    event_month_bytes = line[80:82]
+    event_day_bytes = line[82:84]
+    event_year_bytes = line[84:88]
+    seed_time_bytes = line[88:96].strip()
+    prelim_time_bytes = line[97:105].strip()
+    swim_off_time_bytes = line[106:114].strip()
+    finals_time_bytes = line[115:123].strip()
+    prelim_heat_bytes = line[124:126]
+    prelim_lane_bytes = line[126:128]
+    finals_heat_bytes = line[128:130]
+    finals_lane_bytes = line[130:132]
+    prelim_place_bytes = line[132:135].strip()
+    finals_place_bytes = line[135:138].strip()
+    points_scored_bytes = line[138:142].strip()
+
+    # Ignore invalid entries
+    invalid_short_id = len(swimmer_short_id_str) != 12
+    invalid_stroke = event_stroke_str not in database.sdif.Stroke
+    invalid_line_length = len(line) != 160
+    if invalid_short_id or invalid_stroke or invalid_line_length:
+        return InvalidD0Record()
+
+    # Parse full name, sex, id, and age_class
+    try:
+        first_name, middle_initial, last_name = util.parse_full_name(full_name_str)
+    except:
+        return InvalidD0Record()
+    swimmer_sex = database.sdif.Sex(swimmer_sex_str)
+    usa_id_short = swimmer_short_id_str
+    age_class = age_class_str
+
+    # Check to see if the usa_id_short is in the new id format
+    is_new_id = not util.is_old_id(first_name, last_name, middle_initial, usa_id_short)
+
+    # Parse birthday
+    if b_day_bytes and b_month_bytes and b_year_bytes:
+        # If the birthday is in the data, we just read it.
+        birthday = datetime.date(int(b_year_bytes), int(b_month_bytes), int(b_day_bytes))
+    elif not is_new_id:
+        # If the swimmer has an old id, we can reverse engineer the birthday.
+        b_month = int(usa_id_short[:2])
+        b_day = int(usa_id_short[2:4])
+        if int(usa_id_short[4:6]) > datetime.date.today().year % 100:
+            b_year = int("19" + usa_id_short[4:6])
+        else:
+            b_year = int("20" + usa_id_short[4:6])
+        birthday = datetime.date(b_year, b_month, b_day)
+
+        # We can also get the middle initial from the old id
+        if middle_initial == None and usa_id_short[9] != "*":
+            middle_initial = usa_id_short[9]
+    else:
+        # There is no way to retrieve the birthday
+        birthday = None
+
+    # Parse rest of data
+    organization = database.sdif.Organization(org_code_str)
+    attach_status = database.sdif.AttachStatus(attach_code_str)
+    event_sex = database.sdif.Sex(event_sex_str)
+    event_distance = int(event_distance_bytes)
+    event_stroke = database.sdif.Stroke(event_stroke_str)
+    event_number = event_number_str
+    event_year = int(event_year_bytes)
+    event_month = int(event_month_bytes)
+    event_day = int(event_day_bytes)
+    event_date = datetime.date(event_year, event_month, event_day)
+    if event_age_code_bytes[0:2] == b"UN":
+        event_min_age = 0
+    else:
+        event_min_age = int(event_age_code_bytes[0:2])
+    if event_age_code_bytes[2:4] == b"OV":
+        event_max_age = 1000
+    else:
+        event_max_age = int(event_age_code_bytes[2:4])
+    if citizen_code_str == "" or citizen_code_str not in database.sdif.Country:
+        citizen_code = None
+    else:
+        citizen_code = database.sdif.Country(citizen_code_str)
+    if seed_time_bytes == b"":
+        seed_time = None
+        seed_course = None
+    else:
+        seed_time = database.stime.create_time_from_str(seed_time_bytes.decode())
+        seed_course_str = decode_field(line, 96, 97)
+        try:
+            seed_course = database.sdif.Course(util.standardize_course(seed_course_str))
+        except AssertionError:
+            seed_course = None
+    if prelim_time_bytes == b"" or prelim_time_bytes in ignored_results:
+        prelim_time = None
+        prelim_course = None
+        prelim_heat = None
+        prelim_lane = None
+    else:
+        prelim_time = database.stime.create_time_from_str(prelim_time_bytes.decode())
+        prelim_course_str = decode_field(line, 105, 106)
+        prelim_course = database.sdif.Course(util.standardize_course(prelim_course_str))
+        prelim_heat = int(prelim_heat_bytes)
+        prelim_lane = int(prelim_lane_bytes)
+    if swim_off_time_bytes == b"" or swim_off_time_bytes in ignored_results:
+        swim_off_time = None
+        swim_off_course = None
+    else:
+        swim_off_time = database.stime.create_time_from_str(swim_off_time_bytes.decode())
+        swim_off_course_str = decode_field(line, 114, 115)
+        swim_off_course = database.sdif.Course(
+            util.standardize_course(swim_off_course_str)
+        )
+    if finals_time_bytes == b"" or finals_time_bytes in ignored_results:
+        finals_time = None
+        finals_course = None
+        finals_heat = None
+        finals_lane = None
+    else:
+        finals_time = database.stime.create_time_from_str(finals_time_bytes.decode())
+        finals_course_str = decode_field(line, 123, 124)
+        finals_course = database.sdif.Course(util.standardize_course(finals_course_str))
+        finals_heat = int(finals_heat_bytes)
+        finals_lane = int(finals_lane_bytes)
+    if prelim_place_bytes == b"" or int(prelim_place_bytes) <= 0:
+        prelim_place = None
+    else:
+        prelim_place = int(prelim_place_bytes)
+    if finals_place_bytes == b"" or int(finals_place_bytes) <= 0:
+        finals_place = None
+    else:
+        finals_place = int(finals_place_bytes)
+    if points_scored_bytes == b"":
+        points_scored = None
+    else:
+        points_scored = float(points_scored_bytes)
+
+    return D0Record(
+        organization,
+        first_name,
+        middle_initial,
+        last_name,
+        usa_id_short,
+        is_new_id,
+        attach_status,
+        citizen_code,
+        birthday,
+        age_class,
+        swimmer_sex,
+        event_sex,
+        event_distance,
+        event_stroke,
+        event_number,
+        event_min_age,
+        event_max_age,
+        event_date,
+        seed_time,
+        seed_course,
+        prelim_time,
+        prelim_course,
+        prelim_heat,
+        prelim_lane,
+        prelim_place,
+        swim_off_time,
+        swim_off_course,
+        finals_time,
+        finals_course,
+        finals_heat,
+        finals_lane,
+        finals_place,
+        points_scored,
+    )
+
+
+def parse_d3(line: bytes) -> D3Record:
+    """
+    Parse D3 line in cl2 file.
+    """
+    full_id = decode_field(line, 2, 16)
+    preferred_first_name = decode_field(line, 16, 31)
+    return D3Record(full_id, preferred_first_name)
 
 
 class Cl2Processor:
+    """
+    Build database objects from cl2 records. Records must be processed in file
+    order, since swimmers and results are attached to the current meet and club.
+    """
+
     def __init__(self, db: database.Database):
         self.db = db
-        self.meet = None
+        self.current_meet = None
         self.current_club = None
         self.current_swimmer = None
 
-    def read_file(self, path: str):
+    def read_file(self, path: str, member: Optional[str] = None):
         """
-        Load data from file specified at path into self.db.
+        Load data from file specified at path (see iter_records) into self.db.
         """
-        assert os.path.isfile(path)
-        assert path.endswith(".cl2")
+        self.process_records(iter_records(path, member))
 
-        with open(path, encoding="utf-8", errors="replace") as file:
-            for line in file:
-                header = line[:2]
-                match header:
-                    case "A0":
-                        pass
-                    case "B1":
-                        self.process_b1(line)
-                    case "B2":
-                        pass
-                    case "C1":
-                        self.process_c1(line)
-                    case "C2":
-                        pass
-                    case "D0":
-                        self.process_d0(line)
-                    case "D1":
-                        pass
-                    case "D2":
-                        pass
-                    case "D3":
-                        self.process_d3(line)
-                    case "E0":
-                        pass
-                    case "F0":
-                        pass
-                    case "G0":
-                        pass
-                    case "Z0":
-                        self.process_z0(line)
-
-    def process_b1(self, line: str) -> None:
+    def reconcile(self, rows: Iterable[RecordRow]) -> None:
         """
-        Process B1 line in cl2 file.
+        Merge records of one file encoded by worker processes (see read_partial) into
+        self.db: meets are added, clubs are merged by team code and LSC, and swimmers
+        are resolved with the same rules as a serial load (see process_d0).
         """
-        org_code_str = line[2].strip()
-        name_str = line[11:41].strip()
-        address_one_str = line[41:63].strip()
-        address_two_str = line[63:85].strip()
-        city_str = line[85:105].strip()
-        state_str = line[105:107].strip()
-        postal_code_str = line[107:117].strip()
-        country_code_str = line[117:120].strip()
-        meet_type_str = line[120:121].strip()
-        start_date_str = line[121:129].strip()
-        end_date_str = line[129:137].strip()
-        altitude_str = line[137:141].strip()
-        course_code_str = line[149].strip()
-
-        # Parse start date and end date
-        start_date_year = int(start_date_str[4:])
-        start_date_month = int(start_date_str[:2])
-        start_date_day = int(start_date_str[2:4])
-        end_date_year = int(end_date_str[4:])
-        end_date_month = int(end_date_str[:2])
-        end_date_day = int(end_date_str[2:4])
-
-        # Parse data
-        organization = database.sdif.Organization(org_code_str)
-        name = name_str
-        city = city_str
-        address_one = address_one_str
-        start_date = datetime.date(start_date_year, start_date_month, start_date_day)
-        end_date = datetime.date(end_date_year, end_date_month, end_date_day)
-        if address_two_str != "":
-            address_two = address_two_str
-        else:
-            address_two = None
-        if state_str != "":
-            state = database.sdif.State(state_str)
-        else:
-            state = None
-        if postal_code_str != "":
-            postal_code = postal_code_str
-        else:
-            postal_code = None
-        if country_code_str != "":
-            country = database.sdif.Country(country_code_str)
-        else:
-            country = None
-        if course_code_str != "":
-            standardized_course = util.standardize_course(course_code_str)
-            course = database.sdif.Course(standardized_course)
-        else:
-            course = None
-        if altitude_str != "":
-            altitude = int(altitude_str)
-        else:
-            altitude = None
-        if meet_type_str != "":
-            meet_type = database.sdif.MeetType(meet_type_str)
-        else:
-            meet_type = None
+        self.process_records(decode_record(row) for row in rows)
+
+    def process_records(self, records: Iterable[Record]) -> None:
+        """
+        Load records (in file order) into self.db.
+        """
+        for record in records:
+            match record:
+                case B1Record():
+                    self.process_b1(record)
+                case C1Record():
+                    self.process_c1(record)
+                case D0Record() | InvalidD0Record():
+                    self.process_d0(record)
+                case D3Record():
+                    self.process_d3(record)
+                case Z0Record():
+                    self.process_z0(record)
 
-        # Create meet object
+    def process_b1(self, record: B1Record) -> None:
+        """
+        Process B1 record.
+        """
         new_meet = database.swim.Meet(
-            organization,
-            name,
-            city,
-            address_one,
-            start_date,
-            end_date,
-            state,
-            address_two,
-            postal_code,
-            country,
-            course,
-            altitude,
-            meet_type,
+            record.organization,
+            record.name,
+            record.city,
+            record.address_one,
+            record.start_date,
+            record.end_date,
+            record.state,
+            record.address_two,
+            record.postal_code,
+            record.country,
+            record.course,
+            record.altitude,
+            record.meet_type,
         )
         self.current_meet = new_meet
         self.db.add_meet(new_meet)
 
-    def process_c1(self, line: str) -> None:
+    def process_c1(self, record: C1Record) -> None:
         """
-        Process C1 line in cl2 file.
+        Process C1 record.
         """
         assert self.current_meet is not None
 
-        org_code_str = line[2].strip()
-        lsc_code_str = line[11:13].strip()
-        team_code_str = line[13:17].strip()
-        full_name_str = line[17:47].strip()
-        abbreviated_name_str = line[47:63].strip()
-        address_one_str = line[63:85].strip()
-        address_two_str = line[85:107].strip()
-        city_str = line[107:127].strip()
-        state_str = line[127:129].strip()
-        postal_code_str = line[129:139].strip()
-        country_code_str = line[139:142].strip()
-        region_str = line[142].strip()
-
-        def is_unattached() -> bool:
-            """
-            Return true if line is an unattached club.
-            """
-            if lsc_code_str == "UN" or team_code_str.upper() == "UN":
-                return True
-            if "unattached" in full_name_str.lower():
-                return True
-            if "UN" in team_code_str.upper() and (
-                "unat" in full_name_str.lower() or "unnat" in full_name_str.lower()
-            ):
-                return True
-            return False
-
         # If unattached, set current club to None
-        if is_unattached():
+        if record.unattached:
             self.current_club = None
             return
 
-        # Parse string data
-        organization = database.sdif.Organization(org_code_str)
-        full_name = full_name_str
-        team_code = team_code_str
-        if lsc_code_str in database.sdif.LSC:
-            lsc = database.sdif.LSC(lsc_code_str)
-        else:
-            lsc = None
-        if abbreviated_name_str != "":
-            abbreviated_name = abbreviated_name_str
-        else:
-            abbreviated_name = None
-        if address_one_str != "":
-            address_one = address_one_str
-        else:
-            address_one = None
-        if address_two_str != "":
-            address_two = address_two_str
-        else:
-            address_two = None
-        if city_str != "":
-            city = city_str
-        else:
-            city = None
-        if state_str != "" and state_str in database.sdif.State:
-            state = database.sdif.State(state_str)
-        else:
-            state = None
-        if postal_code_str != "":
-            postal_code = postal_code_str
-        else:
-            postal_code = None
-        if country_code_str != "" and country_code_str in database.sdif.Country:
-            country = database.sdif.Country(country_code_str)
-        else:
-            country = None
-        if region_str != "":
-            region = database.sdif.Region(region_str)
-        else:
-            region = None
+        team_code = record.team_code
+        lsc = record.lsc
 
         # Check for existing club object
-        club_exists = False
-        for c in self.db.get_clubs():
-            if c.get_team_code() == team_code and c.get_lsc() == lsc:
-                club_exists = True
-                club = c
-                break
+        club = self.db.find_club_with_lsc(team_code, lsc)
 
         # If club exists, update abbributes. Otherwise, create new club.
-        if club_exists:
+        if club is not None:
             if club.get_lsc() == None:
                 club.set_lsc(lsc)
             if club.get_abbreviated_name() == None:
-                club.set_abbreviated_name(abbreviated_name)
+                club.set_abbreviated_name(record.abbreviated_name)
             if club.get_address_one() == None:
-                club.set_address_one(address_one)
+                club.set_address_one(record.address_one)
             if club.get_address_two() == None:
-                club.set_address_two(address_two)
+                club.set_address_two(record.address_two)
             if club.get_city() == None:
-                club.set_city(city)
+                club.set_city(record.city)
             if club.get_state() == None:
-                club.set_state(state)
+                club.set_state(record.state)
             if club.get_postal_code() == None:
-                club.set_postal_code(postal_code)
+                club.set_postal_code(record.postal_code)
             if club.get_country() == None:
-                club.set_country(country)
+                club.set_country(record.country)
             if club.get_region() == None:
-                club.set_region(region)
+                club.set_region(record.region)
         else:
             club = database.swim.Club(
-                organization,
+                record.organization,
                 team_code,
                 lsc,
-                full_name,
-                abbreviated_name,
-                address_one,
-                address_two,
-                city,
-                state,
-                postal_code,
-                country,
-                region,
+                record.full_name,
+                record.abbreviated_name,
+                record.address_one,
+                record.address_two,
+                record.city,
+                record.state,
+                record.postal_code,
+                record.country,
+                record.region,
             )
             # We need to add the club to the database if we create it
             self.db.add_club(club)
@@ -293,184 +879,58 @@ class Cl2Processor:
         club.add_meet(self.current_meet)
         self.current_club = club
 
-    def process_d0(self, line: str) -> None:
+    def process_d0(self, record: D0Record | InvalidD0Record) -> None:
         """
-        Process D0 line in cl2 file.
+        Process D0 record.
         """
         assert self.current_meet is not None
 
-        ignored_results = ["NT", "NS", "DNF", "DQ", "SCR"]
-        org_code_str = line[2].strip()
-        full_name_str = line[11:39].strip()
-        swimmer_short_id_str = line[39:51].strip()
-        attach_code_str = line[51].strip()
-        citizen_code_str = line[52:55].strip()
-        b_month_str = line[55:57].strip()
-        b_day_str = line[57:59].strip()
-        b_year_str = line[59:63].strip()
-        age_class_str = line[63:65].strip()
-        swimmer_sex_str = line[65].strip()
-        event_sex_str = line[66].strip()
-        event_distance_str = line[67:71].strip()
-        event_stroke_str = line[71].strip()
-        event_number_str = line[72:76].strip()
-        event_age_code_str = line[76:80].strip()
-        event_month_str = line[80:82].strip()
-        event_day_str = line[82:84].strip()
-        event_year_str = line[84:88].strip()
-        seed_time_str = line[88:96].strip()
-        seed_course_str = line[96].strip()
-        prelim_time_str = line[97:105].strip()
-        prelim_course_str = line[105].strip()
-        swim_off_time_str = line[106:114].strip()
-        swim_off_course_str = line[114].strip()
-        finals_time_str = line[115:123].strip()
-        finals_course_str = line[123].strip()
-        prelim_heat_str = line[124:126].strip()
-        prelim_lane_str = line[126:128].strip()
-        finals_heat_str = line[128:130].strip()
-        finals_lane_str = line[130:132].strip()
-        prelim_place_str = line[132:135].strip()
-        finals_place_str = line[135:138].strip()
-        points_scored_str = line[138:142].strip()
-
         # Ignore invalid entries
-        invalid_short_id = len(swimmer_short_id_str) != 12
-        invalid_stroke = event_stroke_str not in database.sdif.Stroke
-        invalid_line_length = len(line) != 161
-        if invalid_short_id or invalid_stroke or invalid_line_length:
-            self.current_swimmer = None
-            return
-
-        # Ignore entries with invalid stroke
-        if event_stroke_str not in database.sdif.Stroke:
+        if isinstance(record, InvalidD0Record):
             self.current_swimmer = None
             return
 
-        # Parse full name, sex, id, and age_class
-        try:
-            first_name, middle_initial, last_name = util.parse_full_name(full_name_str)
-        except:
-            self.current_swimmer = None
-            return
-        swimmer_sex = database.sdif.Sex(swimmer_sex_str)
-        usa_id_short = swimmer_short_id_str
-        age_class = age_class_str
-
-        # Check to see if the usa_id_short is in the new id format
-        is_new_id = not util.is_old_id(
-            first_name, last_name, middle_initial, usa_id_short
-        )
-
-        # Parse birthday
-        if b_day_str and b_month_str and b_year_str:
-            # If the birthday is in the data, we just read it.
-            birthday = datetime.date(int(b_year_str), int(b_month_str), int(b_day_str))
-        elif util.is_old_id(first_name, last_name, middle_initial, usa_id_short):
-            # If the swimmer has an old id, we can reverse engineer the birthday.
-            b_month = int(usa_id_short[:2])
-            b_day = int(usa_id_short[2:4])
-            if int(usa_id_short[4:6]) > datetime.date.today().year % 100:
-                b_year = int("19" + usa_id_short[4:6])
-            else:
-                b_year = int("20" + usa_id_short[4:6])
-            birthday = datetime.date(b_year, b_month, b_day)
-
-            # We can also get the middle initial from the old id
-            if middle_initial == None and usa_id_short[9] != "*":
-                middle_initial = usa_id_short[9]
-        else:
-            # There is no way to retrieve the birthday
-            birthday = None
-
-        # Parse rest of data
-        organization = database.sdif.Organization(org_code_str)
-        attach_status = database.sdif.AttachStatus(attach_code_str)
-        event_sex = database.sdif.Sex(event_sex_str)
-        event_distance = int(event_distance_str)
-        event_stroke = database.sdif.Stroke(event_stroke_str)
-        event_number = event_number_str
-        event_year = int(event_year_str)
-        event_month = int(event_month_str)
-        event_day = int(event_day_str)
-        event_date = datetime.date(event_year, event_month, event_day)
+        organization = record.organization
+        first_name = record.first_name
+        middle_initial = record.middle_initial
+        last_name = record.last_name
+        usa_id_short = record.usa_id_short
+        is_new_id = record.is_new_id
+        attach_status = record.attach_status
+        citizen_code = record.citizenship
+        birthday = record.birthday
+        age_class = record.age_class
+        swimmer_sex = record.swimmer_sex
+        event_sex = record.event_sex
+        event_distance = record.event_distance
+        event_stroke = record.event_stroke
+        event_number = record.event_number
+        event_min_age = record.event_min_age
+        event_max_age = record.event_max_age
+        event_date = record.event_date
+        seed_time = record.seed_time
+        seed_course = record.seed_course
+        prelim_time = record.prelim_time
+        prelim_course = record.prelim_course
+        prelim_heat = record.prelim_heat
+        prelim_lane = record.prelim_lane
+        prelim_place = record.prelim_place
+        swim_off_time = record.swim_off_time
+        swim_off_course = record.swim_off_course
+        swim_off_heat = None
+        swim_off_lane = None
+        finals_time = record.finals_time
+        finals_course = record.finals_course
+        finals_heat = record.finals_heat
+        finals_lane = record.finals_lane
+        finals_place = record.finals_place
+        points_scored = record.points
         if self.current_club == None:
             team_code = None
             lsc = None
         else:
             team_code = self.current_club.get_team_code()
             lsc = self.current_club.get_lsc()
-        if event_age_code_str[0:2] == "UN":
-            event_min_age = 0
-        else:
-            event_min_age = int(event_age_code_str[0:2])
-        if event_age_code_str[2:4] == "OV":
-            event_max_age = 1000
-        else:
-            event_max_age = int(event_age_code_str[2:4])
-        if citizen_code_str == "" or citizen_code_str not in database.sdif.Country:
-            citizen_code = None
-        else:
-            citizen_code = database.sdif.Country(citizen_code_str)
-        if seed_time_str == "":
-            seed_time = None
-            seed_course = None
-        else:
-            seed_time = database.stime.create_time_from_str(seed_time_str)
-            try:
-                seed_course = database.sdif.Course(
-                    util.standardize_course(seed_course_str)
-                )
-            except AssertionError:
-                seed_course = None
-        if prelim_time_str == "" or prelim_time_str in ignored_results:
-            prelim_time = None
-            prelim_course = None
-            prelim_heat = None
-            prelim_lane = None
-        else:
-            prelim_time = database.stime.create_time_from_str(prelim_time_str)
-            prelim_course = database.sdif.Course(
-                util.standardize_course(prelim_course_str)
-            )
-            prelim_heat = int(prelim_heat_str)
-            prelim_lane = int(prelim_lane_str)
-        if swim_off_time_str == "" or swim_off_time_str in ignored_results:
-            swim_off_time = None
-            swim_off_course = None
-            swim_off_heat = None
-            swim_off_lane = None
-        else:
-            swim_off_time = database.stime.create_time_from_str(swim_off_time_str)
-            swim_off_course = database.sdif.Course(
-                util.standardize_course(swim_off_course_str)
-            )
-            swim_off_heat = None
-            swim_off_lane = None
-        if finals_time_str == "" or finals_time_str in ignored_results:
-            finals_time = None
-            finals_course = None
-            finals_heat = None
-            finals_lane = None
-        else:
-            finals_time = database.stime.create_time_from_str(finals_time_str)
-            finals_course = database.sdif.Course(
-                util.standardize_course(finals_course_str)
-            )
-            finals_heat = int(finals_heat_str)
-            finals_lane = int(finals_lane_str)
-        if prelim_place_str == "" or int(prelim_place_str) <= 0:
-            prelim_place = None
-        else:
-            prelim_place = int(prelim_place_str)
-        if finals_place_str == "" or int(finals_place_str) <= 0:
-            finals_place = None
-        else:
-            finals_place = int(finals_place_str)
-        if points_scored_str == "":
-            points_scored = None
-        else:
-            points_scored = float(points_scored_str)
 
         # Before searching for the corresponding swimmer, we check if the
         # most recent swimmer is what we are looking for. This improves performance
@@ -621,7 +1081,7 @@ class Cl2Processor:
             )
             self.current_swimmer.add_meet_result(mr)
             self.current_meet.add_meet_result(mr)
-            self.db.add_meet_result(mr)
+            self.db.add_meet_result(mr, self.current_swimmer)
             if self.current_club != None:
                 self.current_club.add_meet_result(mr)
 
@@ -663,7 +1123,7 @@ class Cl2Processor:
                 citizen_code,
             )
             self.current_swimmer.add_meet_result(mr)
-            self.db.add_meet_result(mr)
+            self.db.add_meet_result(mr, self.current_swimmer)
             self.current_meet.add_meet_result(mr)
             if self.current_club is not None:
                 self.current_club.add_meet_result(mr)
@@ -711,20 +1171,20 @@ class Cl2Processor:
                 )
                 self.current_swimmer.add_meet_result(mr)
                 self.current_meet.add_meet_result(mr)
-                self.db.add_meet_result(mr)
+                self.db.add_meet_result(mr, self.current_swimmer)
                 if self.current_club != None:
                     self.current_club.add_meet_result(mr)
 
-    def process_d3(self, line: str) -> None:
+    def process_d3(self, record: D3Record) -> None:
         """
-        Process D3 line in cl2 file.
+        Process D3 record.
         """
         # If there was an error reading the d0 line, return.
         if self.current_swimmer is None:
             return
 
-        full_id = line[2:16].strip()
-        preferred_first_name = line[16:31].strip()
+        full_id = record.full_id
+        preferred_first_name = record.preferred_first_name
         curr_long_id = self.current_swimmer.get_usa_id_long()
         curr_preferred_name = self.current_swimmer.get_preferred_first_name()
 
@@ -743,9 +1203,9 @@ class Cl2Processor:
         if len(preferred_first_name) > 0 and curr_preferred_name is None:
             self.current_swimmer.set_preferred_first_name(preferred_first_name)
 
-    def process_z0(self, line: str) -> None:
+    def process_z0(self, record: Z0Record) -> None:
         """
-        Process Z0 line in cl2 file.
+        Process Z0 record.
         """
         self.current_meet = None
         self.current_club = None
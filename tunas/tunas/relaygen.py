@@ -2,8 +2,16 @@
 Relay generation logic.
 """
 
+from typing import Optional
+import collections
 import datetime
+import enum
+import heapq
 import itertools
+import math
+import threading
+
+import numpy as np
 
 import database
 
@@ -60,6 +68,592 @@ def get_relay_time(
     return total_time
 
 
+class RelayObjective(enum.Enum):
+    """
+    What generated relays are optimized for.
+    """
+
+    # Fill relay A from each leg's top 4 swimmers, then relay B, and so on (mixed
+    # relays are solved as A_FIRST, which also fills relay A first)
+    GREEDY = "greedy"
+    # Exact: fill as many relays as possible, then minimize the sum of relay times
+    TOTAL_TIME = "total_time"
+    # Exact: fill as many relays as possible, then minimize relay A's time, then
+    # relay B's, and so on
+    A_FIRST = "a_first"
+
+
+LegCandidates = list[tuple[database.swim.Swimmer, database.stime.Time]]
+
+
+def min_cost_assignment(costs: list[list[int]]) -> list[int]:
+    """
+    Solve the rectangular assignment problem with the Hungarian algorithm. costs[i][j]
+    is the cost of giving row i column j, and there must be at least as many columns
+    as rows. Return the column assigned to every row, minimizing total cost.
+    Runs in O(rows^2 * columns).
+    """
+    n, m = len(costs), len(costs[0])
+    assert n <= m
+
+    # Row/column potentials and the row matched to every column (1-indexed, 0 = none)
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = costs[i0 - 1]
+            delta = math.inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # Augment along the alternating path
+        while j0 != 0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    assignment = [0] * n
+    for j in range(1, m + 1):
+        if p[j] != 0:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def solve_relays(
+    leg_candidates: list[LegCandidates],
+    num_relays: int,
+    objective: RelayObjective,
+) -> list[list[database.swim.Swimmer]]:
+    """
+    Return num_relays relays built from leg_candidates (the eligible swimmers and
+    their times for each leg, fastest first) by solving a min-cost assignment of
+    swimmers to every leg of every relay. As many relays as possible are filled and
+    listed fastest first; the rest are empty lists.
+    """
+    assert objective != RelayObjective.GREEDY
+    max_relays = min([num_relays] + [len(c) for c in leg_candidates])
+    for k in range(max_relays, 0, -1):
+        relays = solve_full_relays(leg_candidates, k, objective)
+        if relays is not None:
+            return relays + [[] for _ in range(num_relays - k)]
+    return [[] for _ in range(num_relays)]
+
+
+def solve_full_relays(
+    leg_candidates: list[LegCandidates],
+    num_relays: int,
+    objective: RelayObjective,
+) -> Optional[list[list[database.swim.Swimmer]]]:
+    """
+    Return exactly num_relays optimal full relays, or None if there are not enough
+    swimmers to fill them.
+    """
+    num_legs = len(leg_candidates)
+    num_slots = num_relays * num_legs
+
+    # A swimmer outside a leg's top num_slots is never needed there: some faster
+    # swimmer for that leg would be free to take their place.
+    leg_times: list[dict[database.swim.Swimmer, int]] = []
+    swimmers: list[database.swim.Swimmer] = []
+    columns: dict[database.swim.Swimmer, int] = dict()
+    for candidates in leg_candidates:
+        times = dict()
+        for swimmer, time in candidates[:num_slots]:
+            times[swimmer] = time.get_total_hundredths()
+            if swimmer not in columns:
+                columns[swimmer] = len(swimmers)
+                swimmers.append(swimmer)
+        leg_times.append(times)
+    if len(swimmers) < num_slots:
+        return None
+
+    # Slot (relay r, leg l) is row r * num_legs + l. For A_FIRST, relay r's times are
+    # weighted so that one hundredth on relay r outweighs every later relay.
+    max_time = max(max(times.values()) for times in leg_times)
+    base = num_legs * max_time + 1
+    if objective == RelayObjective.A_FIRST:
+        weights = [base ** (num_relays - 1 - r) for r in range(num_relays)]
+    else:
+        weights = [1] * num_relays
+    forbidden = num_slots * base * weights[0] + 1
+    costs = []
+    for r in range(num_relays):
+        for times in leg_times:
+            row = [forbidden] * len(swimmers)
+            for swimmer, time in times.items():
+                row[columns[swimmer]] = time * weights[r]
+            costs.append(row)
+
+    assignment = min_cost_assignment(costs)
+    if any(costs[i][j] == forbidden for i, j in enumerate(assignment)):
+        return None
+    relays = [
+        [swimmers[assignment[r * num_legs + l]] for l in range(num_legs)]
+        for r in range(num_relays)
+    ]
+
+    # Every grouping of the chosen swimmers has the same total time, so give relay A
+    # the fastest swimmer on every leg, relay B the next fastest, and so on.
+    if objective == RelayObjective.TOTAL_TIME:
+        for l, times in enumerate(leg_times):
+            leg_swimmers = sorted((relay[l] for relay in relays), key=times.get)
+            for relay, swimmer in zip(relays, leg_swimmers):
+                relay[l] = swimmer
+    return relays
+
+
+MIXED_RELAY_SEXES = (database.sdif.Sex.MALE, database.sdif.Sex.FEMALE)
+
+MixedPools = list[dict[database.sdif.Sex, LegCandidates]]
+
+
+def solve_mixed_relays(
+    leg_candidates: list[LegCandidates],
+    num_relays: int,
+    objective: RelayObjective,
+) -> list[list[database.swim.Swimmer]]:
+    """
+    Like solve_relays, but every relay has exactly two male and two female swimmers.
+    """
+    assert objective != RelayObjective.GREEDY
+    assert len(leg_candidates) == 4
+    pools = [
+        {
+            sex: [(s, t) for s, t in candidates if s.get_sex() == sex]
+            for sex in MIXED_RELAY_SEXES
+        }
+        for candidates in leg_candidates
+    ]
+    max_relays = num_relays
+    for sex in MIXED_RELAY_SEXES:
+        swimmers = set(s for pool in pools for s, _ in pool[sex])
+        max_relays = min(max_relays, len(swimmers) // 2)
+    for k in range(max_relays, 0, -1):
+        if objective == RelayObjective.TOTAL_TIME:
+            relays = solve_mixed_total_time(pools, k)
+        else:
+            relays = solve_mixed_a_first(pools, k)
+        if relays is not None:
+            return relays + [[] for _ in range(num_relays - k)]
+    return [[] for _ in range(num_relays)]
+
+
+def min_cost_flow(
+    num_nodes: int,
+    edges: list[tuple[int, int, int, int]],
+    source: int,
+    sink: int,
+    required: int,
+) -> Optional[list[int]]:
+    """
+    Send required units of flow from source to sink at minimum cost along edges,
+    given as (from, to, capacity, cost) with non-negative costs, by repeatedly
+    augmenting along a cheapest path. Return the flow on every edge, or None if
+    required units cannot be sent.
+    """
+    # Edge 2i is edges[i] and edge 2i + 1 is its residual reverse edge
+    graph: list[list[int]] = [[] for _ in range(num_nodes)]
+    heads, capacities, costs = [], [], []
+    for u, v, capacity, cost in edges:
+        graph[u].append(len(heads))
+        heads += [v, u]
+        capacities += [capacity, 0]
+        costs += [cost, -cost]
+        graph[v].append(len(heads) - 1)
+
+    sent = 0
+    while sent < required:
+        # Bellman-Ford with a queue, since residual edges have negative costs
+        dist = [math.inf] * num_nodes
+        via = [-1] * num_nodes
+        in_queue = [False] * num_nodes
+        dist[source] = 0
+        queue = collections.deque([source])
+        while queue:
+            u = queue.popleft()
+            in_queue[u] = False
+            for e in graph[u]:
+                v = heads[e]
+                if capacities[e] > 0 and dist[u] + costs[e] < dist[v]:
+                    dist[v] = dist[u] + costs[e]
+                    via[v] = e
+                    if not in_queue[v]:
+                        in_queue[v] = True
+                        queue.append(v)
+        if dist[sink] == math.inf:
+            return None
+
+        amount = required - sent
+        v = sink
+        while v != source:
+            amount = min(amount, capacities[via[v]])
+            v = heads[via[v] ^ 1]
+        v = sink
+        while v != source:
+            capacities[via[v]] -= amount
+            capacities[via[v] ^ 1] += amount
+            v = heads[via[v] ^ 1]
+        sent += amount
+    return [capacity - capacities[2 * i] for i, (_, _, capacity, _) in enumerate(edges)]
+
+
+def choose_mixed_leg_swimmers(
+    pools: MixedPools, num_relays: int
+) -> Optional[dict[database.sdif.Sex, list[list[database.swim.Swimmer]]]]:
+    """
+    Choose num_relays distinct swimmers for every leg, 2 * num_relays of each sex in
+    total, with the lowest combined time. Return the chosen swimmers of each sex for
+    every leg, fastest first, or None if there are not enough swimmers.
+
+    Any such choice can be split into relays of two males and two females (see
+    group_mixed_relays), so this is a min-cost flow from the legs through the
+    swimmers to one node per sex, each taking 2 * num_relays swimmers.
+    """
+    # A swimmer outside a leg's top 2 * num_relays of their sex is never needed
+    # there: a faster swimmer of the same sex would be free to take their place.
+    num_per_sex = 2 * num_relays
+    swimmers: list[database.swim.Swimmer] = []
+    columns: dict[database.swim.Swimmer, int] = dict()
+    leg_edges = []
+    for l, pool in enumerate(pools):
+        for sex in MIXED_RELAY_SEXES:
+            for swimmer, time in pool[sex][:num_per_sex]:
+                if swimmer not in columns:
+                    columns[swimmer] = len(swimmers)
+                    swimmers.append(swimmer)
+                leg_edges.append((l, columns[swimmer], time.get_total_hundredths()))
+
+    # Nodes: source, 4 legs, swimmers, one node per sex, sink
+    source, sink = 0, len(swimmers) + 7
+    sex_nodes = {
+        sex: len(swimmers) + 5 + i for i, sex in enumerate(MIXED_RELAY_SEXES)
+    }
+    edges = [(source, 1 + l, num_relays, 0) for l in range(4)]
+    edges += [(1 + l, 5 + j, 1, time) for l, j, time in leg_edges]
+    edges += [(5 + j, sex_nodes[s.get_sex()], 1, 0) for j, s in enumerate(swimmers)]
+    edges += [(node, sink, num_per_sex, 0) for node in sex_nodes.values()]
+    flow = min_cost_flow(sink + 1, edges, source, sink, 4 * num_relays)
+    if flow is None:
+        return None
+
+    chosen: dict[database.sdif.Sex, list[list[database.swim.Swimmer]]] = {
+        sex: [[] for _ in pools] for sex in MIXED_RELAY_SEXES
+    }
+    # Leg edges are listed fastest first within each leg and sex
+    for (l, j, _), amount in zip(leg_edges, flow[4:]):
+        if amount:
+            chosen[swimmers[j].get_sex()][l].append(swimmers[j])
+    return chosen
+
+
+def group_mixed_relays(
+    males: list[list[database.swim.Swimmer]],
+    females: list[list[database.swim.Swimmer]],
+) -> list[list[database.swim.Swimmer]]:
+    """
+    Split the chosen male and female swimmers for each leg (fastest first) into
+    relays with two males and two females each.
+    """
+    males = [list(leg) for leg in males]
+    females = [list(leg) for leg in females]
+    relays = []
+    for _ in range(len(males[0]) + len(females[0])):
+        # Giving the male legs to the two legs with the most males left keeps the
+        # rest splittable: no leg ever has more males left than relays left.
+        male_legs = sorted(range(4), key=lambda l: -len(males[l]))[:2]
+        relays.append(
+            [
+                males[l].pop(0) if l in male_legs else females[l].pop(0)
+                for l in range(4)
+            ]
+        )
+    return relays
+
+
+def solve_mixed_total_time(
+    pools: MixedPools, num_relays: int
+) -> Optional[list[list[database.swim.Swimmer]]]:
+    """
+    Return exactly num_relays mixed relays with the lowest combined time, fastest
+    first, or None if they cannot be filled.
+    """
+    chosen = choose_mixed_leg_swimmers(pools, num_relays)
+    if chosen is None:
+        return None
+    leg_times = [
+        {s: t.get_total_hundredths() for sex_pool in pool.values() for s, t in sex_pool}
+        for pool in pools
+    ]
+    relays = group_mixed_relays(
+        chosen[database.sdif.Sex.MALE], chosen[database.sdif.Sex.FEMALE]
+    )
+    relays.sort(key=lambda relay: sum(t[s] for t, s in zip(leg_times, relay)))
+    return relays
+
+
+def mixed_relays_feasible(pools: MixedPools, num_relays: int) -> bool:
+    """
+    Return whether pools can fill num_relays mixed relays.
+    """
+    return num_relays == 0 or choose_mixed_leg_swimmers(pools, num_relays) is not None
+
+
+def solve_mixed_a_first(
+    pools: MixedPools, num_relays: int
+) -> Optional[list[list[database.swim.Swimmer]]]:
+    """
+    Return exactly num_relays mixed relays, making relay A as fast as possible, then
+    relay B, and so on, or None if they cannot be filled.
+    """
+    if not mixed_relays_feasible(pools, num_relays):
+        return None
+    return solve_mixed_a_first_feasible(pools, num_relays)[1]
+
+
+def solve_mixed_a_first_feasible(
+    pools: MixedPools, num_relays: int
+) -> tuple[list[int], list[list[database.swim.Swimmer]]]:
+    """
+    Return the relay times and relays for solve_mixed_a_first, given that pools can
+    fill num_relays relays.
+    """
+    if num_relays == 0:
+        return [], []
+    best = None
+    # Relays tied for fastest can leave different swimmers for later relays.
+    for time, relay in get_fastest_mixed_relays(pools, num_relays - 1):
+        remaining = [
+            {sex: [c for c in leg if c[0] not in relay] for sex, leg in pool.items()}
+            for pool in pools
+        ]
+        times, relays = solve_mixed_a_first_feasible(remaining, num_relays - 1)
+        if best is None or [time] + times < best[0]:
+            best = ([time] + times, [relay] + relays)
+    assert best is not None
+    return best
+
+
+def get_fastest_mixed_relays(
+    pools: MixedPools, num_remaining: int
+) -> list[tuple[int, list[database.swim.Swimmer]]]:
+    """
+    Return the time and swimmers of every fastest mixed relay (one per set of
+    swimmers) that leaves enough swimmers in pools to fill num_remaining more
+    relays.
+
+    Relays are visited in order of time with a best-first search over each leg's
+    swimmers for all six ways of picking the two male legs.
+    """
+    patterns = dict()
+    heap = []
+    for male_legs in itertools.combinations(range(4), 2):
+        sexes = [
+            database.sdif.Sex.MALE if l in male_legs else database.sdif.Sex.FEMALE
+            for l in range(4)
+        ]
+        legs = [
+            [(s, t.get_total_hundredths()) for s, t in pool[sex]]
+            for pool, sex in zip(pools, sexes)
+        ]
+        if all(legs):
+            patterns[male_legs] = legs
+            heap.append((sum(leg[0][1] for leg in legs), male_legs, (0, 0, 0, 0)))
+    heapq.heapify(heap)
+    seen = set((male_legs, index) for _, male_legs, index in heap)
+
+    fastest: dict[frozenset, tuple[int, list[database.swim.Swimmer]]] = dict()
+    while heap:
+        time, male_legs, index = heapq.heappop(heap)
+        if fastest and time > next(iter(fastest.values()))[0]:
+            break
+        legs = patterns[male_legs]
+        relay = [leg[i][0] for leg, i in zip(legs, index)]
+        relay_swimmers = frozenset(relay)
+        if len(relay_swimmers) == 4 and relay_swimmers not in fastest:
+            remaining = [
+                {sex: [c for c in leg if c[0] not in relay] for sex, leg in p.items()}
+                for p in pools
+            ]
+            if mixed_relays_feasible(remaining, num_remaining):
+                fastest[relay_swimmers] = (time, relay)
+        for l, leg in enumerate(legs):
+            if index[l] + 1 < len(leg):
+                next_index = index[:l] + (index[l] + 1,) + index[l + 1 :]
+                if (male_legs, next_index) not in seen:
+                    seen.add((male_legs, next_index))
+                    next_time = time - leg[index[l]][1] + leg[index[l] + 1][1]
+                    heapq.heappush(heap, (next_time, male_legs, next_index))
+    return list(fastest.values())
+
+
+# Relay sex, relay date, and age range a candidate pool was built for, followed by
+# the data version of the database it was built from
+CandidatePoolKey = tuple[database.sdif.Sex, datetime.date, tuple[int, int], int]
+
+
+class CandidatePool:
+    """
+    Swimmers of a club who are eligible for relays of one sex and age range on a
+    relay date. Each leg event is stored as two arrays, fastest first: best times in
+    hundredths and the indices of the swimmers who swam them. A leg is sorted the
+    first time it is requested and reused afterwards. Pools are shared between
+    threads, so legs are filled under the lock of the cache the pool belongs to.
+    """
+
+    def __init__(
+        self, swimmers: list[database.swim.Swimmer], lock: threading.Lock
+    ) -> None:
+        self.swimmers = swimmers
+        self.lock = lock
+        self.legs: dict[database.dutil.Event, tuple[np.ndarray, np.ndarray]] = dict()
+
+    def get_leg(self, leg_event: database.dutil.Event) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return best times of leg_event in hundredths and indices of the swimmers who
+        swam them, fastest first.
+        """
+        leg = self.legs.get(leg_event)
+        if leg is None:
+            with self.lock:
+                leg = self.legs.get(leg_event)
+                if leg is None:
+                    leg = self.sort_leg(leg_event)
+                    self.legs[leg_event] = leg
+        return leg
+
+    def sort_leg(
+        self, leg_event: database.dutil.Event
+    ) -> tuple[np.ndarray, np.ndarray]:
+        times = []
+        indices = []
+        for i, swimmer in enumerate(self.swimmers):
+            best_mr = swimmer.get_best_meet_result(leg_event)
+            if best_mr is not None:
+                times.append(best_mr.get_final_time().get_total_hundredths())
+                indices.append(i)
+        times = np.array(times, dtype=np.int32)
+        indices = np.array(indices, dtype=np.int32)
+        order = np.argsort(times, kind="stable")
+        return times[order], indices[order]
+
+    def get_leg_candidates(
+        self,
+        leg_event: database.dutil.Event,
+        excluded_swimmers: set[database.swim.Swimmer],
+    ) -> LegCandidates:
+        """
+        Return swimmers not in excluded_swimmers and their best times for leg_event,
+        fastest first.
+        """
+        times, indices = self.get_leg(leg_event)
+        leg = []
+        for time, i in zip(times.tolist(), indices.tolist()):
+            swimmer = self.swimmers[i]
+            if swimmer not in excluded_swimmers:
+                leg.append((swimmer, database.stime.Time.from_hundredths(time)))
+        return leg
+
+
+class CandidatePoolCache:
+    """
+    Least recently used candidate pools, at most max_pools of them. Pools are keyed
+    by the club's LSC and team code rather than the club object: each pool refers to
+    its club through its swimmers, so keying by object would keep every club alive.
+    A club loaded again as a new object (as the SQLite backend does for every
+    request) replaces the pools of the old object instead of adding to them.
+    """
+
+    def __init__(self, max_pools: int = 256) -> None:
+        assert type(max_pools) == int and max_pools > 0
+        self.max_pools = max_pools
+        self.lock = threading.Lock()
+        self.pools: collections.OrderedDict[
+            tuple, tuple[database.swim.Club, CandidatePool]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+    def get_pool(
+        self, club: database.swim.Club, key: CandidatePoolKey
+    ) -> CandidatePool:
+        """
+        Return the candidate pool of club for key, building it if it is not cached.
+        """
+        cache_key = (club.get_lsc(), club.get_team_code()) + key
+        with self.lock:
+            entry = self.pools.get(cache_key)
+            # Swimmers are compared by identity (e.g. exclusions), so pools built
+            # from another object for the same club cannot be reused
+            if entry is not None and entry[0] is club:
+                self.pools.move_to_end(cache_key)
+                return entry[1]
+
+        pool = CandidatePool(get_eligible_swimmers(club, *key[:3]), self.lock)
+        with self.lock:
+            entry = self.pools.get(cache_key)
+            if entry is not None and entry[0] is club:
+                pool = entry[1]
+            else:
+                self.pools[cache_key] = (club, pool)
+            self.pools.move_to_end(cache_key)
+            while len(self.pools) > self.max_pools:
+                self.pools.popitem(last=False)
+        return pool
+
+    def clear(self) -> None:
+        with self.lock:
+            self.pools.clear()
+
+
+def get_eligible_swimmers(
+    club: database.swim.Club,
+    relay_sex: database.sdif.Sex,
+    relay_date: datetime.date,
+    age_range: tuple[int, int],
+) -> list[database.swim.Swimmer]:
+    """
+    Return swimmers of club who may swim relays of relay_sex in age_range on
+    relay_date, in roster order.
+    """
+    min_age, max_age = age_range
+    eligible_swimmers = []
+    for swimmer in club.get_swimmers():
+        if relay_sex != database.sdif.Sex.MIXED and swimmer.get_sex() != relay_sex:
+            continue
+        s_min_age, s_max_age = swimmer.get_age_range(relay_date)
+        if not s_min_age > max_age and not s_max_age < min_age:
+            eligible_swimmers.append(swimmer)
+    return eligible_swimmers
+
+
+CANDIDATE_POOLS = CandidatePoolCache()
+
+
 class RelayGenerator:
     """
     Generate optimal relay assignments and maintain settings.
@@ -74,6 +668,7 @@ class RelayGenerator:
         sex: database.sdif.Sex = database.sdif.Sex.FEMALE,
         course: database.sdif.Course = database.sdif.Course.LCM,
         age_range: tuple[int, int] = (1, 10),
+        objective: RelayObjective = RelayObjective.GREEDY,
     ) -> None:
         self.set_database(db)
         self.set_club(club)
@@ -83,9 +678,12 @@ class RelayGenerator:
         self.set_course(course)
         self.set_age_range(age_range)
         self.set_excluded_swimmers(set())
+        self.set_objective(objective)
 
-    def set_database(self, db: database.Database) -> None:
-        assert type(db) == database.Database
+    def set_database(
+        self, db: database.Database | database.sqlstore.SqliteDatabase
+    ) -> None:
+        assert type(db) in (database.Database, database.sqlstore.SqliteDatabase)
         self.db = db
 
     def set_club(self, club: database.swim.Club) -> None:
@@ -124,6 +722,10 @@ class RelayGenerator:
             assert type(s) == database.swim.Swimmer
         self.excluded_swimmers = excluded_swimmers
 
+    def set_objective(self, objective: RelayObjective) -> None:
+        assert type(objective) == RelayObjective
+        self.objective = objective
+
     def get_database(self) -> database.Database:
         return self.db
 
@@ -148,6 +750,9 @@ class RelayGenerator:
     def get_excluded_swimmers(self) -> set[database.swim.Swimmer]:
         return self.excluded_swimmers
 
+    def get_objective(self) -> RelayObjective:
+        return self.objective
+
     def exclude_swimmer(self, swimmer: database.swim.Swimmer):
         """
         Exclude swimmer from generated relays. If swimmer was already
@@ -170,54 +775,53 @@ class RelayGenerator:
         """
         Generate relays for given event.
         """
+        leg_candidates = self.get_leg_candidates(event)
+        objective = self.get_objective()
+        if self.get_sex() == database.sdif.Sex.MIXED:
+            # Mixed relays are always solved exactly: picking from each leg's top
+            # swimmers of each sex can use up the swimmers later relays need. Greedy
+            # keeps its meaning of filling relay A first.
+            if objective == RelayObjective.GREEDY:
+                objective = RelayObjective.A_FIRST
+            return solve_mixed_relays(leg_candidates, self.get_num_relays(), objective)
+        if objective == RelayObjective.GREEDY:
+            return self.generate_greedy_relays(leg_candidates)
+        return solve_relays(leg_candidates, self.get_num_relays(), objective)
+
+    def get_leg_candidates(self, event: database.dutil.Event) -> list[LegCandidates]:
+        """
+        Return eligible swimmers and their best times for each leg of event, fastest
+        first.
+        """
         is_free_relay = event.get_stroke() == database.sdif.Stroke.FREESTYLE_RELAY
         is_medley_relay = event.get_stroke() == database.sdif.Stroke.MEDLEY_RELAY
         assert is_free_relay or is_medley_relay
 
-        # Get leg information, min/max age, and eligible swimmers
-        leg_events = get_relay_leg_events(event)
-        min_age, max_age = self.get_age_range()
-        eligible_swimmers = self.get_club().get_swimmers()
-
-        # Find valid swimmers for each leg
-        best_le1: list[tuple[database.swim.Swimmer, database.stime.Time]] = []
-        best_le2: list[tuple[database.swim.Swimmer, database.stime.Time]] = []
-        best_le3: list[tuple[database.swim.Swimmer, database.stime.Time]] = []
-        best_le4: list[tuple[database.swim.Swimmer, database.stime.Time]] = []
-
-        for swimmer in eligible_swimmers:
-            # Continue if swimmer is wrong sex or should be excluded
-            relay_sex = self.get_sex()
-            if relay_sex != database.sdif.Sex.MIXED and swimmer.get_sex() != relay_sex:
-                continue
-            if swimmer in self.get_excluded_swimmers():
-                continue
-
-            # Get swimmer min/max age.
-            s_min_age, s_max_age = swimmer.get_age_range(self.get_relay_date())
-
-            # If swimmer is the right age and has a meet result for the given leg
-            # event, add them to the list of eligible swimmers.
-            if not s_min_age > max_age and not s_max_age < min_age:
-                le1, le2, le3, le4 = leg_events
-                best_le1_mr = swimmer.get_best_meet_result(le1)
-                best_le2_mr = swimmer.get_best_meet_result(le2)
-                best_le3_mr = swimmer.get_best_meet_result(le3)
-                best_le4_mr = swimmer.get_best_meet_result(le4)
-                if best_le1_mr is not None:
-                    best_le1.append((swimmer, best_le1_mr.get_final_time()))
-                if best_le2_mr is not None:
-                    best_le2.append((swimmer, best_le2_mr.get_final_time()))
-                if best_le3_mr is not None:
-                    best_le3.append((swimmer, best_le3_mr.get_final_time()))
-                if best_le4_mr is not None:
-                    best_le4.append((swimmer, best_le4_mr.get_final_time()))
-
-        # Sort each relay leg by fastest swimmers
-        best_le1.sort(key=lambda x: x[1])
-        best_le2.sort(key=lambda x: x[1])
-        best_le3.sort(key=lambda x: x[1])
-        best_le4.sort(key=lambda x: x[1])
+        # Candidate pools are shared between generators and exclusions are filtered
+        # out of them, so toggling an exclusion does not rebuild anything
+        pool = CANDIDATE_POOLS.get_pool(
+            self.get_club(),
+            (
+                self.get_sex(),
+                self.get_relay_date(),
+                self.get_age_range(),
+                self.get_database().get_data_version(),
+            ),
+        )
+        excluded_swimmers = self.get_excluded_swimmers()
+        return [
+            pool.get_leg_candidates(leg_event, excluded_swimmers)
+            for leg_event in get_relay_leg_events(event)
+        ]
+
+    def generate_greedy_relays(
+        self, leg_candidates: list[LegCandidates]
+    ) -> list[list[database.swim.Swimmer]]:
+        """
+        Generate relays one at a time, taking the best combination of each leg's top
+        four swimmers. Mixed relays are solved exactly instead (see generate_relays).
+        """
+        best_le1, best_le2, best_le3, best_le4 = leg_candidates
 
         # Generate optimal relays
         generated_relays = []
@@ -233,62 +837,10 @@ class RelayGenerator:
                 remaining_relays -= 1
                 continue
 
-            # If relay is mixed, find the top 2 swimmers for each sex.
-            # Otherwise, just take the top 4 for each leg.
-            if relay_sex == database.sdif.Sex.MIXED:
-                top_four_l1 = []
-                num_male, num_female = 0, 0
-                for swimmer, time in best_le1:
-                    if len(top_four_l1) == 4:
-                        break
-                    swimmer_sex = swimmer.get_sex()
-                    if swimmer_sex == database.sdif.Sex.MALE and num_male < 2:
-                        num_male += 1
-                        top_four_l1.append((swimmer, time))
-                    if swimmer_sex == database.sdif.Sex.FEMALE and num_female < 2:
-                        num_female += 1
-                        top_four_l1.append((swimmer, time))
-                top_four_l2 = []
-                num_male, num_female = 0, 0
-                for swimmer, time in best_le2:
-                    if len(top_four_l2) == 4:
-                        break
-                    swimmer_sex = swimmer.get_sex()
-                    if swimmer_sex == database.sdif.Sex.MALE and num_male < 2:
-                        num_male += 1
-                        top_four_l2.append((swimmer, time))
-                    if swimmer_sex == database.sdif.Sex.FEMALE and num_female < 2:
-                        num_female += 1
-                        top_four_l2.append((swimmer, time))
-                top_four_l3 = []
-                num_male, num_female = 0, 0
-                for swimmer, time in best_le3:
-                    if len(top_four_l3) == 4:
-                        break
-                    swimmer_sex = swimmer.get_sex()
-                    if swimmer_sex == database.sdif.Sex.MALE and num_male < 2:
-                        num_male += 1
-                        top_four_l3.append((swimmer, time))
-                    if swimmer_sex == database.sdif.Sex.FEMALE and num_female < 2:
-                        num_female += 1
-                        top_four_l3.append((swimmer, time))
-                top_four_l4 = []
-                num_male, num_female = 0, 0
-                for swimmer, time in best_le4:
-                    if len(top_four_l4) == 4:
-                        break
-                    swimmer_sex = swimmer.get_sex()
-                    if swimmer_sex == database.sdif.Sex.MALE and num_male < 2:
-                        num_male += 1
-                        top_four_l4.append((swimmer, time))
-                    if swimmer_sex == database.sdif.Sex.FEMALE and num_female < 2:
-                        num_female += 1
-                        top_four_l4.append((swimmer, time))
-            else:
-                top_four_l1 = best_le1[:4]
-                top_four_l2 = best_le2[:4]
-                top_four_l3 = best_le3[:4]
-                top_four_l4 = best_le4[:4]
+            top_four_l1 = best_le1[:4]
+            top_four_l2 = best_le2[:4]
+            top_four_l3 = best_le3[:4]
+            top_four_l4 = best_le4[:4]
 
             # Find best combination of 4 unique swimmers
             best_combination = []
@@ -301,16 +853,6 @@ class RelayGenerator:
                 candidate_swimmers = [pair[0] for pair in candidate_combination]
                 if len(set(candidate_swimmers)) != 4:
                     continue
-                if relay_sex == database.sdif.Sex.MIXED:
-                    # Only consider relays with 2 males and 2 females.
-                    num_male, num_female = 0, 0
-                    for swimmer, time in candidate_combination:
-                        if swimmer.get_sex() == database.sdif.Sex.MALE:
-                            num_male += 1
-                        else:
-                            num_female += 1
-                    if not (num_male == 2 and num_female == 2):
-                        continue
                 if best_combination == []:
                     best_combination = candidate_combination
                 else:
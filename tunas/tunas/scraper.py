@@ -59,9 +59,11 @@ def download_zip_files(path: str) -> None:
             file.write(response.content)
 
 
-def download_meet_result_data(path: str) -> None:
+def download_meet_result_data(path: str, extract: bool = False) -> None:
     """
-    Download meet results data into location specified by path.
+    Download meet results data into location specified by path. The parser reads cl2
+    files straight out of the downloaded zip files, so they are only extracted (into
+    a folder called 'pacswim') if extract is true.
     """
     zip_dir_path = os.path.join(path, "pacswim-zip")
     data_dir_path = os.path.join(path, "pacswim")
@@ -70,9 +72,6 @@ def download_meet_result_data(path: str) -> None:
     if os.path.isdir(data_dir_path):
         shutil.rmtree(data_dir_path)
 
-    # Create directory for meet data
-    os.mkdir(data_dir_path)
-
     # First, download zip files
     print("Downloading zip files from pacswim.org...")
     try:
@@ -83,6 +82,12 @@ def download_meet_result_data(path: str) -> None:
     else:
         print("Success! Zip files downloaded.")
 
+    if not extract:
+        return
+
+    # Create directory for meet data
+    os.mkdir(data_dir_path)
+
     # Open zip files into pacswim directory
     print("Opening zip files...")
     for file in os.listdir(zip_dir_path):
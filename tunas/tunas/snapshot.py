@@ -0,0 +1,154 @@
+"""
+On-disk snapshots of a parsed database. A snapshot stores the whole database graph
+(including time standard information) together with a manifest of the files it was
+built from, so it can be reused as long as none of those files have changed.
+"""
+
+from typing import Optional
+import os
+import glob
+import pickle
+import hashlib
+import tempfile
+
+import database
+import parser
+
+# Bump when the snapshot file layout changes. Changes to the database classes are
+# picked up automatically through the source fingerprint in the manifest.
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_MAGIC = b"TUNASDB\n"
+
+# Paths
+TUNAS_DIRECTORY_PATH = os.path.dirname(os.path.realpath(__file__))
+DATABASE_PACKAGE_PATH = os.path.join(TUNAS_DIRECTORY_PATH, "database")
+
+
+def get_source_fingerprint() -> str:
+    """
+    Return a hash of the source code that defines the pickled database objects.
+    """
+    source_paths = sorted(glob.glob(os.path.join(DATABASE_PACKAGE_PATH, "*.py")))
+    source_paths.append(os.path.join(TUNAS_DIRECTORY_PATH, "parser.py"))
+    digest = hashlib.sha256()
+    for path in source_paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def build_manifest(meet_data_path: str) -> dict:
+    """
+    Return manifest describing every input of a database built from meet_data_path:
+    the path, size, and modification time of each cl2, zip, and time standard file.
+    """
+    files = []
+    for full_file_path in parser.find_meet_data_files(meet_data_path):
+        stat = os.stat(full_file_path)
+        relative_path = os.path.relpath(full_file_path, meet_data_path)
+        files.append((relative_path, stat.st_size, stat.st_mtime_ns))
+    files.sort()
+
+    time_standard_files = []
+    for path in database.timestandard.TimeStandardInfo.file_paths.values():
+        stat = os.stat(path)
+        time_standard_files.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+    time_standard_files.sort()
+
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "source": get_source_fingerprint(),
+        "meet_data_path": os.path.abspath(meet_data_path),
+        "meet_data_files": files,
+        "time_standard_files": time_standard_files,
+    }
+
+
+def save_snapshot(db: database.Database, manifest: dict, snapshot_path: str) -> None:
+    """
+    Write db and its manifest to snapshot_path. The snapshot is written to a temporary
+    file in the same directory and renamed into place, so readers never observe a
+    partially written snapshot.
+    """
+    snapshot_directory = os.path.dirname(os.path.abspath(snapshot_path))
+    os.makedirs(snapshot_directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=snapshot_directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(SNAPSHOT_MAGIC)
+            pickle.dump(manifest, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(db, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load_snapshot(snapshot_path: str, manifest: dict) -> Optional[database.Database]:
+    """
+    Return database stored at snapshot_path if it was built from the inputs described
+    by manifest. Return None if the snapshot is missing, stale, or unreadable.
+    """
+    if not os.path.isfile(snapshot_path):
+        return None
+    try:
+        with open(snapshot_path, "rb") as file:
+            if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            if pickle.load(file) != manifest:
+                return None
+            db = pickle.load(file)
+    except Exception:
+        return None
+    if type(db) != database.Database:
+        return None
+    return db
+
+
+def load_database(
+    meet_data_path: str, snapshot_path: str, workers: int = 1
+) -> database.Database:
+    """
+    Return database for meet_data_path, loading it from snapshot_path if the snapshot
+    is up to date. Otherwise, parse the cl2 files and write a new snapshot.
+    """
+    manifest = build_manifest(meet_data_path)
+    db = load_snapshot(snapshot_path, manifest)
+    if db is not None:
+        print(f"Loaded database snapshot: {snapshot_path}")
+        return db
+
+    db = parser.read_cl2(meet_data_path, workers=workers)
+    try:
+        save_snapshot(db, manifest, snapshot_path)
+    except OSError as e:
+        print(f"Could not write database snapshot: {e}")
+    return db
+
+
+def load_sqlite_database(
+    meet_data_path: str,
+    sqlite_path: str,
+    snapshot_path: Optional[str] = None,
+    workers: int = 1,
+) -> database.sqlstore.SqliteDatabase:
+    """
+    Return SQLite-backed database for meet_data_path stored at sqlite_path. If the
+    SQLite file is missing or out of date, it is rebuilt from the parsed database
+    (loaded through snapshot_path if given).
+    """
+    manifest = build_manifest(meet_data_path)
+    encoded_manifest = database.sqlstore.encode_manifest(manifest)
+    stored_manifest = database.sqlstore.read_manifest(sqlite_path)
+    if database.sqlstore.encode_manifest(stored_manifest) != encoded_manifest:
+        if snapshot_path is not None:
+            db = load_database(meet_data_path, snapshot_path, workers=workers)
+        else:
+            db = parser.read_cl2(meet_data_path, workers=workers)
+        database.sqlstore.write_sqlite(db, sqlite_path, manifest)
+        print(f"Wrote SQLite database: {sqlite_path}")
+    return database.sqlstore.SqliteDatabase(sqlite_path)